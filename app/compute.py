@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+from quantpyml.common import StockChart
+from quantpyml.utils import Returns
+
+# Shared compute layer of the app. Streamlit re-runs main_page.py on every widget interaction and for every session, so
+# everything expensive (downloads, returns, volatility) goes through one ComputeLayer per server process, created with
+# st.cache_resource: results are cached across sessions in a memory-bounded LRU, computed on a worker pool off the script
+# thread, and concurrent requests for the same key (a dozen analysts opening the same symbol) share one computation.
+
+class ComputeLayer:
+    """
+    max_bytes: memory budget of the cached results, least recently used dropped first
+    ttl: seconds a cached result is served before it is recomputed (downloaded charts go stale)
+    workers: threads computing results
+    """
+    def __init__(self, max_bytes: int = 256 << 20, ttl: float = 300.0, workers: int = 4):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='compute')
+        self._lock = threading.Lock()
+        # key -> (created, nbytes, value)
+        self._results = OrderedDict()
+        self._pending = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _sizeof(value) -> int:
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, StockChart):
+            return value.nbytes
+        if isinstance(value, (tuple, list)):
+            return sum(ComputeLayer._sizeof(v) for v in value)
+        if isinstance(value, dict):
+            return sum(ComputeLayer._sizeof(v) for v in value.values())
+        return 64
+
+    def submit(self, key: tuple, function, *args) -> Future:
+        """
+        Returns a future of function(*args), served from the cache, joined to a computation of the same key already
+        running, or started on the pool.
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                self._results.move_to_end(key)
+                self.hits += 1
+                future = Future()
+                future.set_result(cached[2])
+                return future
+            if key in self._pending:
+                self.hits += 1
+                return self._pending[key]
+            self.misses += 1
+            future = self._executor.submit(function, *args)
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._store(key, f))
+        return future
+
+    def get(self, key: tuple, function, *args):
+        return self.submit(key, function, *args).result()
+
+    def _store(self, key: tuple, future: Future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.exception() is not None:
+                return
+            value = future.result()
+            size = self._sizeof(value)
+            if key in self._results:
+                self.nbytes -= self._results.pop(key)[1]
+            self._results[key] = (time.monotonic(), size, value)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and len(self._results) > 1:
+                self.nbytes -= self._results.popitem(last=False)[1][1]
+
+    # cached computations used by the pages
+
+    def chart(self, symbol: str, period: str = '1y', interval: str = '1d') -> StockChart:
+        return self.get(('chart', symbol, period, interval), download_chart, symbol, period, interval)
+
+    def returns_and_volatility(self, symbol: str, period: str = '1y', interval: str = '1d', window: int = 20) -> tuple[np.ndarray, np.ndarray]:
+        chart = self.chart(symbol, period, interval)
+        return self.get(('returns', symbol, period, interval, window, len(chart)), returns_and_volatility, chart, window)
+
+
+def download_chart(symbol: str, period: str, interval: str) -> StockChart:
+    import yfinance as yf
+    data = yf.download(symbol, period=period, interval=interval, progress=False)
+    if data.columns.nlevels > 1:
+        # recent yfinance versions return (field, ticker) columns even for one ticker
+        data.columns = data.columns.get_level_values(0)
+    data = data.rename(columns=str.lower)
+    data.index = data.index.tz_localize(None) if data.index.tz is not None else data.index
+    return StockChart.from_pandas(data, symbol=symbol, interval=interval)
+
+def returns_and_volatility(chart: StockChart, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    One-bar returns and their rolling volatility, aligned with the chart's bars (NaN on the first bar).
+    """
+    returns = np.full(len(chart), np.nan)
+    returns[1:] = Returns.calculate_returns(chart).values
+    volatility = np.full(len(chart), np.nan)
+    volatility[1:] = Returns.rolling_volatility(returns[1:], window).values
+    return returns, volatility
+
+def downsample(x: np.ndarray, y: np.ndarray, points: int = 2000) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces a line to at most about points points for plotting, keeping the minimum and the maximum of every bucket
+    (in time order), so spikes survive and the drawn line looks the same at screen resolution.
+    """
+    n = len(y)
+    if n <= points:
+        return x, y
+    buckets = points // 2
+    starts = np.linspace(0, n, buckets + 1).astype(np.intp)[:-1]
+    filled = np.where(np.isnan(y), np.nanmean(y), y)
+    # index of the min and max inside each bucket, from segment reductions and a match against the bucket values
+    lows, highs = np.minimum.reduceat(filled, starts), np.maximum.reduceat(filled, starts)
+    bucket = np.repeat(np.arange(buckets), np.diff(np.append(starts, n)))
+    keep = np.zeros(n, dtype=bool)
+    for extreme in (lows, highs):
+        hits = np.flatnonzero(filled == extreme[bucket])
+        # first hit of every bucket
+        keep[hits[np.concatenate(([True], bucket[hits][1:] != bucket[hits][:-1]))]] = True
+    return x[keep], y[keep]
+
+def downsample_chart(chart: StockChart, bars: int = 500) -> StockChart:
+    """
+    Merges consecutive bars into at most about bars candles (OHLCV segment reduce), each labelled with its first bar's timestamp.
+    """
+    n = len(chart)
+    if n <= bars:
+        return chart
+    starts = np.arange(0, n, -(-n // bars))
+    ends = np.append(starts[1:], n) - 1
+    return StockChart(**chart.metadata, timestamp=chart.timestamp[starts], volume=np.add.reduceat(chart.volume, starts),
+                      opens=chart.opens[starts], highs=np.maximum.reduceat(chart.highs, starts),
+                      lows=np.minimum.reduceat(chart.lows, starts), closes=chart.closes[ends])
@@ -1,11 +1,15 @@
 import streamlit as st
-import pandas as pd
-import yfinance as yf
 import plotly.graph_objects as go
+from compute import ComputeLayer, downsample, downsample_chart
 
-# Set page config
+# Set page config, it must be the first Streamlit command (the cached compute layer below shows a spinner)
 st.set_page_config(page_title="OpenQuant", layout="wide")
 
+# one compute layer per server process, shared by every session and rerun
+compute = st.cache_resource(ComputeLayer)()
+# points per trace, about the pixel width of a wide chart
+SCREEN_POINTS = 2000
+
 # Title
 st.title("OpenQuant")
 
@@ -20,26 +24,29 @@ asset = st.sidebar.text_input("Enter Asset Symbol (e.g., AAPL for Apple Inc.)")
 time_windows = ["Intraday", "Daily", "Weekly", "Monthly", "Yearly"]
 selected_time_window = st.sidebar.selectbox("Select Time Window", time_windows)
 
-# Fetch data (placeholder - you'd need to implement proper data fetching)
+# Fetch data through the shared cache (placeholder - you'd need to implement proper data fetching)
+chart = None
 if asset:
-    data = yf.download(asset, period="1y")
-else:
-    data = pd.DataFrame()
+    try:
+        chart = compute.chart(asset, "1y")
+    except Exception as e:
+        st.error(f"Could not load {asset}: {e}")
 
 # Main chart
-if not data.empty:
+if chart is not None and len(chart):
     fig = go.Figure()
+    candles = downsample_chart(chart, SCREEN_POINTS // 4)
     
     # Candlestick chart
-    fig.add_trace(go.Candlestick(x=data.index,
-                                 open=data['Open'],
-                                 high=data['High'],
-                                 low=data['Low'],
-                                 close=data['Close'],
+    fig.add_trace(go.Candlestick(x=candles.timestamp,
+                                 open=candles.opens,
+                                 high=candles.highs,
+                                 low=candles.lows,
+                                 close=candles.closes,
                                  name='Price'))
     
     # Volume chart
-    fig.add_trace(go.Bar(x=data.index, y=data['Volume'], name='Volume', yaxis='y2'))
+    fig.add_trace(go.Bar(x=candles.timestamp, y=candles.volume, name='Volume', yaxis='y2'))
     
     # Update layout
     fig.update_layout(
@@ -52,12 +59,11 @@ if not data.empty:
     st.plotly_chart(fig, use_container_width=True)
     
     # Returns and Volatility chart
-    returns = data['Close'].pct_change()
-    volatility = returns.rolling(window=20).std()
+    returns, volatility = compute.returns_and_volatility(asset, "1y", window=20)
     
     fig2 = go.Figure()
-    fig2.add_trace(go.Scatter(x=data.index, y=returns, name='Returns'))
-    fig2.add_trace(go.Scatter(x=data.index, y=volatility, name='Volatility', yaxis='y2'))
+    fig2.add_trace(go.Scatter(*downsample(chart.timestamp, returns, SCREEN_POINTS), name='Returns'))
+    fig2.add_trace(go.Scatter(*downsample(chart.timestamp, volatility, SCREEN_POINTS), name='Volatility', yaxis='y2'))
     
     fig2.update_layout(
         title='Returns and Volatility',
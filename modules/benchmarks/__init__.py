@@ -0,0 +1,4 @@
+from .harness import BENCHMARKS, Benchmark, Measurement, Comparison, benchmark, measure, run, save, load, compare
+from . import cases
+
+__all__ = ['BENCHMARKS', 'Benchmark', 'Measurement', 'Comparison', 'benchmark', 'measure', 'run', 'save', 'load', 'compare']
@@ -0,0 +1,73 @@
+import argparse
+import sys
+from benchmarks.harness import BENCHMARKS, REGRESSIONS, run, save, load, compare, format_comparison
+import benchmarks.cases  # registers the benchmarks
+from benchmarks.imports import check_all
+
+# Command line of the benchmark suite, run from the modules directory:
+#   python -m benchmarks list
+#   python -m benchmarks run [--quick] [--only black_scholes efficient_frontier] [--output baseline.json]
+#   python -m benchmarks compare baseline.json [current.json] [--threshold 0.1]
+#   python -m benchmarks imports
+# compare runs the benchmarks of the baseline when no current results are given, and exits with status 1 if any got slower,
+# used more memory, now fails, or is gone.
+# imports checks the import time budget (benchmarks/imports.py), exiting with status 1 if a statement is over it.
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='quantpyml performance benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='list the benchmarks and their sweeps')
+    commands.add_parser('imports', help='check the import time budget')
+
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    compare_parser = commands.add_parser('compare', help='compare results against a baseline')
+    compare_parser.add_argument('baseline', help='baseline results (JSON from run --output)')
+    compare_parser.add_argument('current', nargs='?', help='current results, run now when omitted')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='relative time change flagged (default 0.1 = 10%%)')
+    compare_parser.add_argument('--memory-threshold', type=float, default=0.25, help='relative peak memory growth flagged (default 0.25)')
+    run_parser.add_argument('--quick', action='store_true', help='the small sizes of every sweep only')
+    for command in (run_parser, compare_parser):
+        command.add_argument('--only', nargs='*', help='benchmark name prefixes to run')
+        command.add_argument('--min-time', type=float, default=0.5, help='seconds spent timing each size (default 0.5)')
+        command.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for bench in BENCHMARKS.values():
+            print(f'{bench.name:<40} {bench.sweep:<10} {bench.sizes}')
+        return 0
+
+    if args.command == 'imports':
+        return 0 if all(result.passed for result in check_all()) else 1
+
+    if args.command == 'run':
+        measurements = run(args.only, quick=args.quick, min_time=args.min_time)
+        if args.output:
+            save(args.output, measurements)
+        return 0
+
+    environment, baseline = load(args.baseline)
+    if args.only:
+        baseline = [m for m in baseline if any(m.name.startswith(prefix) for prefix in args.only)]
+    if args.current:
+        current = load(args.current)[1]
+    else:
+        # the baseline's own benchmarks and sizes
+        sizes = {}
+        for m in baseline:
+            sizes.setdefault(m.name, []).append(m.size)
+        current = run(sizes=sizes, min_time=args.min_time)
+        if args.output:
+            save(args.output, current)
+    print(f'baseline: python {environment["python"]}, {environment["cpus"]} cpus, {environment["created"]}')
+    comparisons = compare(baseline, current, args.threshold, args.memory_threshold)
+    for comparison in comparisons:
+        print(format_comparison(comparison))
+    regressions = [c for c in comparisons if c.status in REGRESSIONS]
+    if regressions:
+        print(f'{len(regressions)} regression(s): {", ".join(sorted({c.status for c in regressions}))}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from benchmarks.data import price_panel, stock_chart, returns_matrix, option_chain
+from benchmarks.harness import benchmark
+from quantpyml.common import Resampler, Interval
+from quantpyml.clients import BarArchive
+from quantpyml.models import (EfficientFrontier, BatchOptimizer, LedoitWolfCovariance, EWMACovariance, PCAFactorCovariance,
+                              BlackScholes, OptionsStrategy, BrownianMotion, CorrelatedBrownianMotion, MonteCarlo, Indicators,
+                              BatchIndicators, IndicatorGraph, StreamingSMA, StreamingBollingerBands, Backtest, Costs)
+from quantpyml.utils import Returns
+
+# The benchmarks of every public model entry point. Models that cache their results (EfficientFrontier solutions,
+# fitted covariance windows, the indicator graph) are rebuilt inside the timed call, so every call does the full work.
+
+# options
+
+@benchmark('black_scholes.chain', 'contracts', (1_000, 10_000, 100_000, 1_000_000), quick=(1_000, 100_000))
+def black_scholes_chain(size):
+    chain = option_chain(size)
+    return lambda: BlackScholes.chain(chain['price'], chain['strike'], chain['expiration'], chain['vol']), size
+
+@benchmark('black_scholes.chain_float32', 'contracts', (100_000, 1_000_000), quick=(100_000,))
+def black_scholes_chain_float32(size):
+    chain = option_chain(size)
+    return lambda: BlackScholes.chain(chain['price'], chain['strike'], chain['expiration'], chain['vol'], dtype=np.float32), size
+
+@benchmark('black_scholes.contract', 'contracts', (100, 1_000), quick=(100,))
+def black_scholes_contract(size):
+    # the per-contract object API, one BlackScholes per option
+    chain = option_chain(size)
+    def price():
+        for S, K, T, vol in zip(chain['price'], chain['strike'], chain['expiration'], chain['vol']):
+            BlackScholes(S, K, T, vol).price('B')
+    return price, size
+
+@benchmark('black_scholes.implied_volatility', 'contracts', (1_000, 10_000, 100_000), quick=(1_000, 10_000))
+def implied_volatility(size):
+    chain = option_chain(size)
+    return lambda: BlackScholes.implied_volatility(chain['quote'], chain['price'], chain['strike'], chain['expiration'], type_=chain['type_']), size
+
+@benchmark('options_strategy.surface', 'prices', (50, 200, 800), quick=(200,))
+def options_strategy_surface(size):
+    # price x 60 days x 10 vol shifts grid of a four-leg strategy
+    strategy = OptionsStrategy.iron_condor(100, 0.25, 60, (85, 95, 105, 115))
+    prices, days, shifts = np.linspace(50, 150, size), np.linspace(0, 60, 60), np.linspace(-0.1, 0.1, 10)
+    return lambda: strategy.surface(prices, days, shifts), size*60*10
+
+# simulation
+
+@benchmark('brownian_motion.geometric_chunks', 'paths', (1_000, 10_000, 100_000), quick=(1_000, 10_000))
+def geometric_brownian_motion(size):
+    def simulate():
+        for paths in BrownianMotion.geometric_brownian_motion_chunks(100.0, 0.0005, 0.01, N=size, T=252, seed=0):
+            paths[:, -1].mean()
+    return simulate, size*252
+
+@benchmark('brownian_motion.path_statistics', 'paths', (1_000, 10_000, 100_000), quick=(1_000, 10_000))
+def path_statistics(size):
+    return lambda: BrownianMotion.path_statistics(100.0, 0.0005, 0.01, N=size, T=252, seed=0), size*252
+
+@benchmark('correlated_brownian_motion.portfolio', 'assets', (10, 100, 500), quick=(10, 100))
+def correlated_portfolio(size):
+    returns = returns_matrix(size, 500)
+    model = CorrelatedBrownianMotion(100.0, returns.mean(axis=1), np.cov(returns))
+    weights = np.full(size, 1/size)
+    return lambda: model.portfolio(weights, N=20_000, T=10, seed=0), 20_000*size
+
+@benchmark('monte_carlo.european', 'paths', (10_000, 100_000), quick=(10_000,))
+def monte_carlo_european(size):
+    return lambda: MonteCarlo(100, 30, 0.2, paths=size, antithetic=True, control_variate=True, seed=0).european(100), size
+
+@benchmark('monte_carlo.asian_sobol', 'paths', (10_000, 100_000), quick=(10_000,))
+def monte_carlo_asian(size):
+    return lambda: MonteCarlo(100, 30, 0.2, paths=size, sobol=True, replications=8, seed=0).asian(100), size
+
+# portfolio optimization
+
+@benchmark('efficient_frontier.max_sharpe', 'assets', (10, 50, 200), quick=(10, 50))
+def max_sharpe(size):
+    returns = returns_matrix(size, 504)
+    tickers = [f'A{i}' for i in range(size)]
+    return lambda: EfficientFrontier(tickers, returns, 252).max_sharpe(), size
+
+@benchmark('efficient_frontier.max_sharpe_qp', 'assets', (100, 500, 2_000), quick=(100, 500))
+def max_sharpe_qp(size):
+    returns = returns_matrix(size, 504)
+    tickers = [f'A{i}' for i in range(size)]
+    return lambda: EfficientFrontier(tickers, returns, 252, backend='qp').max_sharpe(), size
+
+@benchmark('efficient_frontier.frontier', 'assets', (10, 50, 200), quick=(10, 50))
+def frontier(size):
+    returns = returns_matrix(size, 504)
+    tickers = [f'A{i}' for i in range(size)]
+    return lambda: EfficientFrontier(tickers, returns, 252).frontier(points=25), size*25
+
+@benchmark('batch_optimizer.run', 'scenarios', (8, 32), quick=(8,))
+def batch_optimizer(size):
+    returns = returns_matrix(20, 756)
+    optimizer = BatchOptimizer([f'A{i}' for i in range(20)], returns, 252, workers=1)
+    windows = [(start, start + 252) for start in range(0, 504, 504//size)][:size]
+    scenarios = BatchOptimizer.scenarios(windows=windows)
+    return lambda: optimizer.run(scenarios), len(scenarios)
+
+@benchmark('covariance.ledoit_wolf', 'assets', (50, 200, 1_000), quick=(50, 200))
+def ledoit_wolf(size):
+    returns = returns_matrix(size, 504)
+    return lambda: LedoitWolfCovariance().fit(returns).covariance, size
+
+@benchmark('covariance.ewma', 'assets', (50, 200, 1_000), quick=(50, 200))
+def ewma_covariance(size):
+    returns = returns_matrix(size, 504)
+    return lambda: EWMACovariance().fit(returns).covariance, size
+
+@benchmark('covariance.pca_factor', 'assets', (50, 200, 1_000), quick=(50, 200))
+def pca_factor_covariance(size):
+    returns = returns_matrix(size, 504)
+    return lambda: PCAFactorCovariance(factors=5).fit(returns).covariance, size
+
+# indicators
+
+@benchmark('indicators.sma', 'bars', (1_000, 10_000, 100_000), quick=(1_000, 10_000))
+def indicators_sma(size):
+    closes = list(price_panel(1, size)[0])
+    return lambda: Indicators.SMA(closes, 20), size
+
+@benchmark('indicators.rsi', 'bars', (1_000, 10_000, 100_000), quick=(1_000, 10_000))
+def indicators_rsi(size):
+    closes = list(price_panel(1, size)[0])
+    return lambda: Indicators.RSI(closes, 14), size
+
+@benchmark('indicators.ichimoku', 'bars', (1_000, 10_000), quick=(1_000,))
+def indicators_ichimoku(size):
+    chart = stock_chart(size)
+    return lambda: Indicators.Ichimoku(chart), size
+
+@benchmark('batch_indicators.dashboard', 'bars', (10_000, 100_000, 1_000_000), quick=(10_000, 100_000))
+def batch_indicators(size):
+    closes = price_panel(1, size)[0]
+    def dashboard():
+        BatchIndicators.SMA(closes, 20)
+        BatchIndicators.EMA(closes, 20)
+        BatchIndicators.HMA(closes, 20)
+        BatchIndicators.BollingerBands(closes, 20)
+        BatchIndicators.RSI(closes, 14)
+    return dashboard, size
+
+@benchmark('batch_indicators.panel_sma', 'symbols', (10, 100, 1_000), quick=(10, 100))
+def batch_indicators_panel(size):
+    panel = price_panel(size, 2_520)
+    return lambda: BatchIndicators.SMA(panel, 20), size*2_520
+
+@benchmark('indicator_graph.dashboard', 'bars', (10_000, 100_000, 1_000_000), quick=(10_000, 100_000))
+def indicator_graph(size):
+    # the same overlays as batch_indicators.dashboard plus Ichimoku, through the shared graph with a cold cache
+    chart = stock_chart(size)
+    requests = [('SMA', 20), ('EMA', 20), ('HMA', 20), ('BollingerBands', 20), ('RSI', 14), 'Ichimoku']
+    return lambda: IndicatorGraph(max_bytes=1 << 30).evaluate(chart, requests), size
+
+@benchmark('streaming_indicators.update', 'bars', (10_000, 100_000), quick=(10_000,))
+def streaming_indicators(size):
+    closes = price_panel(1, size)[0].tolist()
+    def stream():
+        sma, bands = StreamingSMA(20), StreamingBollingerBands(20)
+        for close in closes:
+            sma.update(close)
+            bands.update(close)
+    return stream, size
+
+# returns, backtests and bars
+
+@benchmark('returns.risk_statistics', 'bars', (10_000, 100_000, 1_000_000), quick=(10_000, 100_000))
+def returns_statistics(size):
+    closes = price_panel(1, size)[0]
+    def statistics():
+        returns = Returns.calculate_returns(closes).values
+        Returns.rolling_volatility(returns, 20)
+        Returns.ewma_volatility(returns)
+        Returns.rolling_sharpe(returns, 252)
+        Returns.drawdowns(closes)
+    return statistics, size
+
+@benchmark('backtest.sweep', 'bars', (1_000, 10_000), quick=(1_000,))
+def backtest_sweep(size):
+    # SMA crossover over a 10 x 10 grid on 10 symbols
+    backtest = Backtest(price_panel(10, size), Costs(commission=0.0005))
+    grid = {'fast': list(range(5, 55, 5)), 'slow': list(range(60, 260, 20))}
+    strategy = lambda ind, fast, slow: Backtest.crossover(ind.SMA(fast), ind.SMA(slow))
+    def sweep():
+        backtest.indicators._values.clear()
+        backtest.sweep(strategy, grid)
+    return sweep, size*10*100
+
+@benchmark('resampler.resample', 'bars', (100_000, 1_000_000, 5_000_000), quick=(100_000, 1_000_000))
+def resample(size):
+    chart = stock_chart(size)
+    resampler = Resampler(Interval.HOURLY)
+    return lambda: resampler.resample(chart), size
+
+@benchmark('stock_chart.append', 'bars', (10_000, 100_000), quick=(10_000,))
+def stock_chart_append(size):
+    source = stock_chart(size)
+    bars = [source.bar(i) for i in range(size)]
+    def append():
+        chart = source[:0]
+        for bar in bars:
+            chart.append(bar)
+    return append, size
+
+@benchmark('bar_archive.append_read', 'bars', (10_000, 100_000, 1_000_000), quick=(10_000, 100_000))
+def bar_archive(size):
+    chart = stock_chart(size)
+    root = tempfile.mkdtemp(prefix='quantpyml-bench-')
+    middle = chart.timestamp[size//2]
+    def append_read():
+        shutil.rmtree(root, ignore_errors=True)
+        archive = BarArchive(os.path.join(root, 'archive'))
+        archive.append('SYN', 'SYN', '1min', chart)
+        archive.read('SYN', 'SYN', '1min', start=middle).closes.sum()
+    return append_read, size
@@ -0,0 +1,59 @@
+import numpy as np
+from quantpyml.common import StockChart
+
+# Synthetic, seeded inputs of any size for the benchmarks: GBM price charts and panels, factor-structured return
+# matrices, and option chains with their market prices. The same seed and size always give the same data.
+
+def price_panel(symbols: int, bars: int, vol: float = 0.01, seed: int = 0) -> np.ndarray:
+    """
+    (symbols, bars) GBM closes starting at 100, vol per bar.
+    """
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(0.0, vol, (symbols, bars))
+    return 100*np.exp(np.cumsum(log_returns, axis=1))
+
+def stock_chart(bars: int, interval: str = '1min', vol: float = 0.001, seed: int = 0) -> StockChart:
+    """
+    A chart of bars regular bars from 2024-01-02 (around the clock, no sessions), with consistent OHLC and volume.
+    """
+    rng = np.random.default_rng(seed)
+    closes = price_panel(1, bars, vol, seed)[0]
+    opens = np.concatenate(([100.0], closes[:-1]))
+    wick = np.abs(rng.normal(0.0, vol, (2, bars)))
+    step = {'1min': 1, '5min': 5, '15min': 15, '1h': 60, '1day': 1440}[interval]
+    timestamp = np.datetime64('2024-01-02T00:00', 'ns') + np.arange(bars)*np.timedelta64(step, 'm')
+    return StockChart('SYN', interval, 'USD', 'UTC', 'SYN', 'SYN', 'Common Stock',
+                      timestamp=timestamp, volume=rng.integers(100, 10_000, bars).astype(np.float64),
+                      opens=opens, highs=np.maximum(opens, closes)*(1 + wick[0]), lows=np.minimum(opens, closes)*(1 - wick[1]), closes=closes)
+
+def returns_matrix(assets: int, periods: int, factors: int = 3, seed: int = 0) -> np.ndarray:
+    """
+    (assets, periods) daily returns driven by a few common factors plus specific noise, with positive average returns
+    so max Sharpe problems are feasible.
+    """
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(1.0, 0.3, (assets, factors))
+    factor_returns = rng.normal(0.0, 0.006, (factors, periods))
+    drift = rng.uniform(0.0001, 0.001, (assets, 1))
+    return drift + loadings @ factor_returns + rng.normal(0.0, 0.01, (assets, periods))
+
+def option_chain(contracts: int, price: float = 100.0, seed: int = 0) -> dict[str, np.ndarray]:
+    """
+    contracts options on one underlying: strikes from 50% to 150% of the price, 7 to 365 days, a vol smile, and their
+    BlackScholes prices as market quotes (calls above the price, puts below, as out of the money quotes are).
+    """
+    from quantpyml.models.black_scholes import BlackScholes
+    rng = np.random.default_rng(seed)
+    strike = price*rng.uniform(0.5, 1.5, contracts)
+    expiration = rng.uniform(7, 365, contracts)
+    vol = 0.2 + 0.3*(np.log(strike/price))**2
+    chain = BlackScholes.chain(price, strike, expiration, vol)
+    call = strike >= price
+    return {
+        'price': np.full(contracts, price),
+        'strike': strike,
+        'expiration': expiration,
+        'vol': vol,
+        'type_': np.where(call, 'C', 'P'),
+        'quote': np.where(call, chain.call, chain.put),
+    }
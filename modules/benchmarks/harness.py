@@ -0,0 +1,208 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Callable
+
+# Registry, timer and baseline comparison of the benchmark suite. A benchmark is a setup function registered with
+# @benchmark: called with one size of its sweep, it builds the inputs (untimed) and returns the callable to time and
+# the number of items (bars, paths, contracts, ...) one call processes. Each size is timed over several calls after a
+# warm-up call, then called once more under tracemalloc for the peak memory.
+
+BENCHMARKS = {}
+# comparison statuses that fail python -m benchmarks compare, a benchmark that now raises or is gone is as bad as a slower one
+REGRESSIONS = ('slower', 'more memory', 'error', 'missing')
+
+@dataclass
+class Benchmark:
+    """
+    name: 'module.entry_point', what the results are keyed by
+    sweep: what the size counts (assets, paths, bars, strikes, ...)
+    sizes: the scaling sweep of a full run, quick: the sizes of a quick run
+    """
+    name: str
+    setup: Callable
+    sweep: str
+    sizes: tuple
+    quick: tuple
+
+
+@dataclass
+class Measurement:
+    """
+    One benchmark at one size. Times are seconds per call, throughput items per second at the best time.
+    peak_bytes: peak traced allocation of one call (numpy and Python objects, torch tensors are not traced)
+    error: the exception, when the benchmark could not run (e.g. a missing optional dependency)
+    """
+    name: str
+    sweep: str
+    size: int
+    items: int = 0
+    repeats: int = 0
+    best: float | None = None
+    median: float | None = None
+    throughput: float | None = None
+    peak_bytes: int | None = None
+    error: str | None = None
+
+
+@dataclass
+class Comparison:
+    """
+    A measurement against its baseline. ratio is current/baseline best time (above 1 is slower).
+    """
+    name: str
+    size: int
+    baseline: float | None
+    current: float | None
+    ratio: float | None
+    memory_ratio: float | None
+    status: str
+
+
+def benchmark(name: str, sweep: str, sizes: tuple, quick: tuple | None = None):
+    """
+    Registers a setup function, see the module comment.
+    """
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, sweep, tuple(sizes), tuple(quick or sizes[:2]))
+        return setup
+    return register
+
+def measure(bench: Benchmark, size: int, min_time: float = 0.5, max_repeats: int = 50, min_repeats: int = 3) -> Measurement:
+    """
+    Times one size: at least min_repeats calls, more until min_time seconds were spent (at most max_repeats).
+    """
+    measurement = Measurement(bench.name, bench.sweep, size)
+    try:
+        function, items = bench.setup(size)
+        function()
+        times = []
+        gc.collect()
+        while len(times) < min_repeats or (sum(times) < min_time and len(times) < max_repeats):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            function()
+            measurement.peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        measurement.error = f'{type(e).__name__}: {e}'
+        return measurement
+    measurement.items = items
+    measurement.repeats = len(times)
+    measurement.best = min(times)
+    measurement.median = statistics.median(times)
+    measurement.throughput = items/measurement.best if measurement.best > 0 else None
+    return measurement
+
+def environment() -> dict:
+    """
+    What the numbers depend on besides the code, stored with every baseline.
+    """
+    versions = {}
+    for module in ('numpy', 'scipy', 'pandas', 'torch', 'talipp'):
+        try:
+            versions[module] = __import__(module).__version__
+        except Exception:
+            versions[module] = None
+    return {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'versions': versions,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+def run(names: list[str] | None = None, quick: bool = False, sizes: dict | None = None, min_time: float = 0.5, log=print) -> list[Measurement]:
+    """
+    Runs the registered benchmarks (every one, or those whose name starts with one of names) over their sweeps.
+    sizes: name -> sizes overriding a benchmark's sweep, when given only these benchmarks run (names then narrows them down)
+    log: called with a line per measurement, None for silence
+    """
+    measurements = []
+    for bench in BENCHMARKS.values():
+        if names and not any(bench.name.startswith(prefix) for prefix in names):
+            continue
+        if sizes is not None and bench.name not in sizes:
+            continue
+        for size in sizes[bench.name] if sizes is not None else bench.quick if quick else bench.sizes:
+            measurement = measure(bench, size, min_time=min_time)
+            measurements.append(measurement)
+            if log is not None:
+                log(format_measurement(measurement))
+    return measurements
+
+def format_measurement(m: Measurement) -> str:
+    if m.error is not None:
+        return f'{m.name:<40} {m.sweep}={m.size:<10} ERROR {m.error}'
+    return (f'{m.name:<40} {m.sweep}={m.size:<10} {m.best*1e3:>10.3f} ms  {m.throughput or 0:>12.4g} items/s'
+            f'  {m.peak_bytes/2**20:>9.2f} MiB  ({m.repeats} runs)')
+
+def save(path: str, measurements: list[Measurement]):
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': [asdict(m) for m in measurements]}, f, indent=1)
+
+def load(path: str) -> tuple[dict, list[Measurement]]:
+    with open(path) as f:
+        data = json.load(f)
+    return data['environment'], [Measurement(**m) for m in data['results']]
+
+def compare(baseline: list[Measurement], current: list[Measurement], threshold: float = 0.1, memory_threshold: float = 0.25) -> list[Comparison]:
+    """
+    Matches the measurements by (name, size). status: 'slower' or 'faster' when the best time moved by more than threshold
+    (0.1 = 10%), 'more memory' when only the peak memory grew by more than memory_threshold, 'ok', 'new', 'missing',
+    'error' (fails now but did not in the baseline) or 'still failing'.
+    """
+    before = {(m.name, m.size): m for m in baseline}
+    after = {(m.name, m.size): m for m in current}
+    comparisons = []
+    for key in list(before) + [key for key in after if key not in before]:
+        old, new = before.get(key), after.get(key)
+        ratio = memory_ratio = None
+        if old is None:
+            status = 'new'
+        elif new is None:
+            status = 'missing'
+        elif new.error is not None:
+            # failing in both runs (e.g. a missing optional dependency) is not a regression of this change
+            status = 'error' if old.error is None else 'still failing'
+        elif old.error is not None:
+            status = 'new'
+        else:
+            ratio = new.best/old.best
+            if old.peak_bytes and new.peak_bytes is not None:
+                memory_ratio = new.peak_bytes/old.peak_bytes
+            if ratio > 1 + threshold:
+                status = 'slower'
+            elif ratio < 1 - threshold:
+                status = 'faster'
+            elif memory_ratio is not None and memory_ratio > 1 + memory_threshold:
+                status = 'more memory'
+            else:
+                status = 'ok'
+        comparisons.append(Comparison(
+            name=key[0],
+            size=key[1],
+            baseline=None if old is None else old.best,
+            current=None if new is None else new.best,
+            ratio=ratio,
+            memory_ratio=memory_ratio,
+            status=status
+        ))
+    return comparisons
+
+def format_comparison(c: Comparison) -> str:
+    time_ms = lambda t: '-' if t is None else f'{t*1e3:.3f}'
+    ratio = '-' if c.ratio is None else f'{c.ratio:.2f}x'
+    memory = '-' if c.memory_ratio is None else f'{c.memory_ratio:.2f}x'
+    return f'{c.name:<40} {c.size:<10} {time_ms(c.baseline):>12} {time_ms(c.current):>12} ms  {ratio:>7}  mem {memory:>7}  {c.status}'
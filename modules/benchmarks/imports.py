@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+# Import time budget of the package. Every statement runs in a fresh interpreter (nothing cached from an earlier import),
+# must finish within its budget, and must not import the heavy libraries it has no use for. The budgets leave room for
+# slower machines, the forbidden modules are what actually keeps startup fast: one eager import of torch, pandas or
+# scipy.stats from a package __init__ costs a second or more. Check with python -m benchmarks imports.
+
+# the modules directory, the probes run from it so they import this checkout of quantpyml wherever they are started from
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ('torch', 'pandas', 'matplotlib', 'talipp', 'requests', 'dotenv', 'scipy.stats', 'scipy.optimize', 'scipy.signal')
+
+@dataclass
+class ImportBudget:
+    statement: str
+    seconds: float
+    forbidden: tuple = HEAVY
+
+
+@dataclass
+class ImportCheck:
+    statement: str
+    seconds: float
+    budget: float
+    loaded: list[str]
+
+    @property
+    def passed(self) -> bool:
+        return self.seconds <= self.budget and not self.loaded
+
+
+BUDGETS = [
+    ImportBudget('import quantpyml', 0.05),
+    ImportBudget('import quantpyml.models', 0.05),
+    ImportBudget('import quantpyml.clients', 0.05),
+    ImportBudget('import quantpyml.common', 0.3),
+    ImportBudget('from quantpyml.utils import Returns', 0.3),
+    ImportBudget('from quantpyml.models import BlackScholes', 0.5),
+    ImportBudget('from quantpyml.models import OptionsStrategy', 0.5),
+    ImportBudget('from quantpyml.clients import BarArchive, BarCache', 0.3),
+    ImportBudget('from quantpyml.models import StreamingSMA, StreamingRSI', 0.3),
+    ImportBudget('from quantpyml.models import EfficientFrontier', 1.0, ('torch', 'pandas', 'matplotlib', 'talipp', 'scipy.stats')),
+    ImportBudget('from quantpyml.clients import Market', 0.5, ('torch', 'pandas', 'matplotlib', 'talipp', 'scipy.stats')),
+    ImportBudget('from quantpyml.models import BrownianMotion', 5.0, ('pandas', 'matplotlib', 'talipp', 'scipy.sparse', 'scipy.stats')),
+]
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+print(json.dumps([time.perf_counter() - start, [name for name in {forbidden!r} if name in sys.modules]]))
+'''
+
+def check(budget: ImportBudget, repeats: int = 3) -> ImportCheck:
+    """
+    Best of repeats fresh-interpreter imports (the first also warms the OS file cache).
+    """
+    times, loaded = [], []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', _PROBE.format(statement=budget.statement, forbidden=budget.forbidden)],
+                                capture_output=True, text=True, check=True, cwd=ROOT).stdout
+        seconds, loaded = json.loads(output.splitlines()[-1])
+        times.append(seconds)
+    return ImportCheck(budget.statement, min(times), budget.seconds, loaded)
+
+def check_all(budgets: list[ImportBudget] = BUDGETS, log=print) -> list[ImportCheck]:
+    checks = []
+    for budget in budgets:
+        result = check(budget)
+        checks.append(result)
+        if log is not None:
+            loaded = f'  imports {", ".join(result.loaded)}' if result.loaded else ''
+            log(f'{result.statement:<60} {result.seconds*1e3:>8.1f} ms / {result.budget*1e3:>6.0f} ms  {"ok" if result.passed else "OVER"}{loaded}')
+    return checks
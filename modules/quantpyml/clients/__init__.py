@@ -1,3 +1,34 @@
-from .market import Market
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = ['Market']
\ No newline at end of file
+# Imported on first use like quantpyml.models: the bar stores do not import requests, pandas or python-dotenv,
+# only Market does (it loads the .env file and builds its pooled HTTP transport when its module is imported).
+_SUBMODULES = {
+    'Market': 'market',
+    'ChartResult': 'market',
+    'BarCache': 'cache',
+    'BarArchive': 'archive',
+    'Transport': 'transport',
+    'TransportError': 'transport',
+    'RequestsTransport': 'transport',
+    'TokenBucket': 'rate_limit',
+}
+
+if TYPE_CHECKING:
+    from .market import Market, ChartResult
+    from .cache import BarCache
+    from .archive import BarArchive
+    from .transport import Transport, TransportError, RequestsTransport
+    from .rate_limit import TokenBucket
+
+__all__ = list(_SUBMODULES)
+
+def __getattr__(name: str):
+    if name not in _SUBMODULES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{_SUBMODULES[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+from urllib.parse import quote
+import numpy as np
+from quantpyml.common import StockChart
+from quantpyml.common.stock_chart import COLUMNS, METADATA
+
+try:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f, fcntl.LOCK_EX)
+except ImportError:
+    # Windows, lock the first byte of the lock file (msvcrt retries for about 10 seconds, then raises OSError)
+    import msvcrt
+
+    def _lock_file(f):
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+DEFAULT_ROOT = os.environ.get('QUANTPYML_ARCHIVE', os.path.join(os.path.expanduser('~'), '.cache', 'quantpyml', 'archive'))
+
+class BarArchive:
+    """
+    Append-only historical bar archive keyed by (symbol, exchange, interval), unlike BarCache it is never rewritten or evicted.
+    Each entry is a directory holding one raw little-endian column file per column (int64 nanosecond timestamps, float64
+    prices and volume) and a meta.json with the metadata and the committed number of rows.
+
+    Readers memory-map the columns (only the pages they touch are read from disk) and binary search the sorted timestamp
+    column, so a range query costs O(log n) page reads plus the range itself. One writer at a time (a file lock per entry,
+    across processes) appends the new rows to the column files, then atomically replaces meta.json with the new row count.
+    Readers only ever look at the committed rows, so they can read while the writer appends; bytes past the committed count
+    (an append in progress, or one that crashed) are ignored, and truncated by the next append.
+
+    root: directory of the archive
+    durable: fsync the columns before committing an append, so a crash never loses committed rows
+    """
+    META = 'meta.json'
+    LOCK = '.lock'
+    DTYPES = {'timestamp': np.dtype('<i8'), **{name: np.dtype('<f8') for name in COLUMNS}}
+
+    def __init__(self, root: str = DEFAULT_ROOT, durable: bool = False):
+        self.root = root
+        self.durable = durable
+        self._lock = threading.Lock()
+        # path -> (length, {column: mapped array}) of the last read, remapped when the entry grows
+        self._maps = {}
+        self._maps_lock = threading.Lock()
+
+    def _path(self, symbol: str, exchange: str, interval: str) -> str:
+        return os.path.join(self.root, quote(f'{symbol}@{exchange}@{interval}', safe='@'))
+
+    def _read_meta(self, path: str) -> dict | None:
+        try:
+            with open(os.path.join(path, self.META)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def keys(self) -> list[tuple[str, str, str]]:
+        """
+        Returns the (symbol, exchange, interval) of every entry.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        return [tuple(meta['key']) for meta in (self._read_meta(entry.path) for entry in os.scandir(self.root)) if meta is not None]
+
+    def length(self, symbol: str, exchange: str, interval: str) -> int:
+        meta = self._read_meta(self._path(symbol, exchange, interval))
+        return 0 if meta is None else meta['length']
+
+    def append(self, symbol: str, exchange: str, interval: str, chart: StockChart) -> int:
+        """
+        Appends the bars of chart after the last archived bar and returns how many were appended. Bars at or before the last
+        archived timestamp are already archived and skipped, so overlapping downloads can be appended as they come.
+        Append completed bars only, an archived bar is never rewritten.
+        """
+        path = self._path(symbol, exchange, interval)
+        os.makedirs(path, exist_ok=True)
+        with self._lock, open(os.path.join(path, self.LOCK), 'w') as lock:
+            _lock_file(lock)
+            meta = self._read_meta(path) or {'key': [symbol, exchange, interval], 'chart': {name: getattr(chart, name) for name in METADATA}, 'length': 0, 'last': None}
+            length = meta['length']
+            timestamp = chart.timestamp.view(np.int64)
+            first = 0 if meta['last'] is None else np.searchsorted(timestamp, meta['last'], side='right')
+            if first == len(chart):
+                return 0
+            for name, dtype in self.DTYPES.items():
+                values = timestamp if name == 'timestamp' else getattr(chart, name)
+                with open(os.path.join(path, f'{name}.bin'), 'ab') as f:
+                    # drop whatever an interrupted append left past the committed rows
+                    f.truncate(length*dtype.itemsize)
+                    f.write(np.ascontiguousarray(values[first:], dtype=dtype).tobytes())
+                    if self.durable:
+                        f.flush()
+                        os.fsync(f.fileno())
+            meta.update(length=length + len(chart) - int(first), last=int(timestamp[-1]))
+            tmp = os.path.join(path, f'{self.META}.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmp, os.path.join(path, self.META))
+            return len(chart) - int(first)
+
+    def _columns(self, path: str, length: int, names) -> dict[str, np.ndarray]:
+        """
+        Returns read-only maps of the first length rows of the named columns, reusing the maps of the previous read.
+        """
+        with self._maps_lock:
+            cached_length, maps = self._maps.get(path, (None, {}))
+            if cached_length != length:
+                maps = {}
+            for name in names:
+                if name not in maps:
+                    if length:
+                        maps[name] = np.memmap(os.path.join(path, f'{name}.bin'), dtype=self.DTYPES[name], mode='r', shape=(length,))
+                    else:
+                        maps[name] = np.empty(0, dtype=self.DTYPES[name])
+            self._maps[path] = (length, maps)
+            return {name: maps[name] for name in names}
+
+    def _range(self, timestamp: np.ndarray, start, end) -> slice:
+        lo = 0 if start is None else np.searchsorted(timestamp, np.datetime64(start, 'ns').astype(np.int64), side='left')
+        hi = len(timestamp) if end is None else np.searchsorted(timestamp, np.datetime64(end, 'ns').astype(np.int64), side='right')
+        return slice(lo, hi)
+
+    def read_columns(self, symbol: str, exchange: str, interval: str, columns: tuple = ('closes',), start=None, end=None) -> dict[str, np.ndarray] | None:
+        """
+        Returns only the requested columns (plus timestamp) of the bars with start <= timestamp <= end, as zero-copy views of
+        the mapped files. None if the key is not archived.
+        columns: names as on StockChart ('opens', 'highs', 'lows', 'closes', 'volume')
+        """
+        path = self._path(symbol, exchange, interval)
+        meta = self._read_meta(path)
+        if meta is None:
+            return None
+        maps = self._columns(path, meta['length'], ('timestamp', *columns))
+        rows = self._range(maps['timestamp'], start, end)
+        result = {name: values[rows] for name, values in maps.items()}
+        result['timestamp'] = result['timestamp'].view('datetime64[ns]')
+        return result
+
+    def read(self, symbol: str, exchange: str, interval: str, start=None, end=None) -> StockChart | None:
+        """
+        Returns the bars with start <= timestamp <= end as a StockChart over the mapped columns (nothing is read from disk
+        until the columns are used). None if the key is not archived.
+        """
+        path = self._path(symbol, exchange, interval)
+        meta = self._read_meta(path)
+        if meta is None:
+            return None
+        maps = self._columns(path, meta['length'], tuple(self.DTYPES))
+        rows = self._range(maps['timestamp'], start, end)
+        columns = {name: np.asarray(values[rows]) for name, values in maps.items()}
+        columns['timestamp'] = columns['timestamp'].view('datetime64[ns]')
+        return StockChart(**meta['chart'], **columns)
+
+    def import_json(self, path: str) -> int:
+        """
+        Archives a chart saved as JSON, either a StockChart's fields (clients/data.json) or a raw Twelve Data time_series
+        response (clients/raw_data.json). Returns the bars appended.
+        """
+        from quantpyml.clients.market import Market
+        with open(path) as f:
+            data = json.load(f)
+        chart = Market._parse_stock_chart(data) if 'meta' in data else StockChart(**data)
+        return self.append(chart.symbol, chart.exchange, chart.interval, chart)
@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import threading
+import time
+from urllib.parse import quote
+import numpy as np
+from quantpyml.common import StockChart
+from quantpyml.common.stock_chart import COLUMNS, METADATA
+
+DEFAULT_ROOT = os.environ.get('QUANTPYML_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'quantpyml', 'bars'))
+
+class BarCache:
+    """
+    Persistent bar store keyed by (symbol, exchange, interval).
+    Each entry is a directory holding one .npy file per column and a meta.json, columns are loaded memory-mapped.
+
+    root: directory of the store
+    ttl: seconds a stored entry is served without asking the provider for newer bars
+    max_bytes: total size of the store, least recently used entries are evicted past it
+    """
+    META = 'meta.json'
+
+    def __init__(self, root: str = DEFAULT_ROOT, ttl: float = 60.0, max_bytes: int = 1 << 30):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+
+    def _path(self, symbol: str, exchange: str, interval: str) -> str:
+        return os.path.join(self.root, quote(f'{symbol}@{exchange}@{interval}', safe='@'))
+
+    def _read_meta(self, path: str) -> dict | None:
+        try:
+            with open(os.path.join(path, self.META)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def get(self, symbol: str, exchange: str, interval: str) -> StockChart | None:
+        """
+        Returns the stored chart with memory-mapped columns, or None if the key is not stored.
+        """
+        path = self._path(symbol, exchange, interval)
+        with self._lock:
+            meta = self._read_meta(path)
+            if meta is None:
+                return None
+            columns = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in ('timestamp', *COLUMNS)}
+            # touch the entry so eviction sees it as recently used
+            os.utime(os.path.join(path, self.META))
+        return StockChart(**meta['chart'], **columns)
+
+    def is_fresh(self, symbol: str, exchange: str, interval: str) -> bool:
+        """
+        Returns True if the entry was refreshed from the provider less than ttl seconds ago.
+        """
+        meta = self._read_meta(self._path(symbol, exchange, interval))
+        return meta is not None and time.time() - meta['fetched_at'] < self.ttl
+
+    def put(self, symbol: str, exchange: str, interval: str, chart: StockChart, merge: bool = True) -> StockChart:
+        """
+        Stores a chart and returns the stored version.
+        With merge, bars already stored from before the first bar of chart are kept and the rest are replaced by chart.
+        """
+        path = self._path(symbol, exchange, interval)
+        with self._lock:
+            cached = self.get(symbol, exchange, interval) if merge else None
+            if cached is not None and len(cached) and len(chart):
+                keep = np.searchsorted(cached.timestamp, chart.timestamp[0], side='left')
+                columns = {name: np.concatenate((getattr(cached, name)[:keep], getattr(chart, name))) for name in ('timestamp', *COLUMNS)}
+            elif cached is not None and not len(chart):
+                columns = {name: getattr(cached, name) for name in ('timestamp', *COLUMNS)}
+            else:
+                columns = {name: getattr(chart, name) for name in ('timestamp', *COLUMNS)}
+
+            # write into a sibling directory and swap it in, so readers never see a half written entry
+            tmp = f'{path}.tmp{os.getpid()}.{threading.get_ident()}'
+            os.makedirs(tmp, exist_ok=True)
+            for name, values in columns.items():
+                np.save(os.path.join(tmp, f'{name}.npy'), np.ascontiguousarray(values))
+            with open(os.path.join(tmp, self.META), 'w') as f:
+                json.dump({'chart': {name: getattr(chart, name) for name in METADATA}, 'fetched_at': time.time()}, f)
+            old = f'{path}.old{os.getpid()}.{threading.get_ident()}'
+            if os.path.exists(path):
+                os.replace(path, old)
+            os.replace(tmp, path)
+            shutil.rmtree(old, ignore_errors=True)
+
+            self._evict(keep=path)
+            return self.get(symbol, exchange, interval)
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if '.tmp' in name or '.old' in name:
+                continue
+            meta = os.path.join(path, self.META)
+            if not os.path.isfile(meta):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path))
+            entries.append((os.path.getmtime(meta), size, path))
+        return entries
+
+    def _evict(self, keep: str | None = None):
+        """
+        Removes least recently used entries until the store fits in max_bytes.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def invalidate(self, symbol: str, exchange: str, interval: str):
+        with self._lock:
+            shutil.rmtree(self._path(symbol, exchange, interval), ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
@@ -1,32 +1,158 @@
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterable, Iterator, TYPE_CHECKING
 import os
-import requests
-from pandas import DataFrame
-import json
+import random
+import time
+import numpy as np
 from quantpyml.common import StockChart, Interval
+from quantpyml.clients.cache import BarCache
+from quantpyml.clients.transport import Transport, TransportError, RequestsTransport
+from quantpyml.clients.rate_limit import TokenBucket
+from quantpyml.utils import profiling
+
+if TYPE_CHECKING:
+    # only the annotation, BarArchive is imported by whoever creates one
+    from quantpyml.clients.archive import BarArchive
 
 load_dotenv()
 ALPHA_VANTAGE_KEY = os.environ.get('ALPHA_VANTAGE_KEY') # options, longterm historical data
 TWELVE_DATA_KEY = os.environ.get('TWELVE_DATA_KEY') # stocks, etfs, forex, crypto
+TWELVE_DATA_RATE_LIMIT = float(os.environ.get('TWELVE_DATA_RATE_LIMIT', 8)) # requests per minute allowed by the plan
+
+@dataclass
+class ChartResult:
+    symbol: str
+    chart: StockChart | None = None
+    error: Exception | None = None
 
 class Market:
     EXCHANGES = ('BVC', 'XETR', 'NZX', 'JSE', 'OTC', 'FSX', 'NSE', 'BCBA', 'BME', 'XBER', 'BVS', 'LSE', 'JPX', 'EGX', 'MYX', 'MTA', 'KOSDAQ', 'OMX', 'ISE', 'SSME', 'ICEX', 'PSX', 'BSE', 'PSE', 'IDX', 'XKUW', 'Tadawul', 'DFM', 'Euronext', 'KONEX', 'TSX', 'TPEX', 'NASDAQ', 'QE', 'OSE', 'SSE', 'CBOE', 'BVL', 'VSE', 'SET', 'ADX', 'OMXV', 'OMXC', 'XESM', 'BVCC', 'Bovespa', 'TASE', 'ASE', 'XHAN', 'SGX', 'BIST', 'SZSE', 'BVB', 'NYSE', 'OMXT', 'Spotlight Stock Market', 'KRX', 'MOEX', 'TWSE', 'XDUS', 'NEO', 'XSAP', 'ICE', 'HKEX', 'XSTU', 'ASX', 'XHAM', 'XMSM', 'BMV', 'OMXH', 'CSE', 'SIX', 'GPW', 'TSXV', 'CXA', 'Munich', 'OMXR')
 
+    BASE_URL = 'https://api.twelvedata.com'
+    OUTPUT_SIZE = 5000
+    RETRIES = 3
+    BACKOFF = 1.0 # seconds before the first retry, doubled on every attempt
+    # swap these out to run against a local stand-in server, another store, or no store at all (cache = None)
+    transport: Transport = RequestsTransport()
+    cache: BarCache | None = BarCache()
+    # set to a BarArchive to keep every completed bar fetched, for get_history
+    archive: 'BarArchive | None' = None
+    rate_limit: TokenBucket | None = TokenBucket.per_minute(TWELVE_DATA_RATE_LIMIT)
+
+    @classmethod
+    def get_stock_chart(cls, symbol: str, interval: Interval = Interval.DAILY, exchange: str = '', refresh: bool = False, source: Interval | None = None, session: tuple[str, str] | None = None) -> StockChart:
+        """
+        Returns the stock chart, served from the local bar store when possible.
+        A stored chart younger than the store's ttl is returned as is, otherwise only bars from the last stored timestamp on are requested and merged in.
+        refresh: ignore the ttl and always ask the provider for newer bars
+        source: derive the bars on-box from this finer interval's chart (e.g. 1h and 1day from one cached 1min download) instead of requesting them
+        session: (open, close) local times passed to the Resampler when deriving from source
+        """
+        if source is not None and source != interval:
+            return cls.get_stock_chart(symbol, source, exchange, refresh).resample(interval, session)
+        cache = cls.cache
+        if cache is None:
+            chart = cls._fetch_stock_chart(symbol, interval, exchange)
+            cls._archive(symbol, exchange, interval, chart)
+            return chart
+
+        cached = cache.get(symbol, exchange, interval.value)
+        if cached is not None and not refresh and cache.is_fresh(symbol, exchange, interval.value):
+            profiling.count('market.cache_hits')
+            return cached
+        profiling.count('market.cache_misses')
+
+        # the last stored bar may still have been forming, so request it again along with everything after it
+        start_date = cached.timestamp[-1] if cached is not None and len(cached) else None
+        chart = cls._fetch_stock_chart(symbol, interval, exchange, start_date)
+        cls._archive(symbol, exchange, interval, chart)
+        # a full page that does not reach back to the stored bars leaves a gap, store the new page on its own
+        merge = start_date is None or len(chart) < cls.OUTPUT_SIZE or (len(chart) > 0 and chart.timestamp[0] <= start_date)
+        return cache.put(symbol, exchange, interval.value, chart, merge=merge)
+
+    @classmethod
+    def get_history(cls, symbol: str, interval: Interval = Interval.DAILY, exchange: str = '', start=None, end=None) -> StockChart | None:
+        """
+        Returns the archived bars with start <= timestamp <= end, memory-mapped from the archive without a request.
+        None if nothing is archived for the symbol (or no archive is set).
+        """
+        if cls.archive is None:
+            return None
+        return cls.archive.read(symbol, exchange, interval.value, start, end)
+
     @classmethod
-    def get_stock_chart(cls, symbol: str, interval: Interval = Interval.DAILY, exchange: str = '') -> StockChart:
-        # mock while testing:
-        with open('data.json') as f:
-            stock_chart = StockChart(**json.load(f))
-        return stock_chart
-    
-        url = f'https://api.twelvedata.com/time_series?symbol={symbol}:{exchange}&interval={interval.value}&apikey={TWELVE_DATA_KEY}&outputsize=5000'
+    def _archive(cls, symbol: str, exchange: str, interval: Interval, chart: StockChart):
+        # the last bar may still be forming, and archived bars are never rewritten
+        if cls.archive is not None and len(chart) > 1:
+            cls.archive.append(symbol, exchange, interval.value, chart[:-1])
+
+    @classmethod
+    def get_stock_charts(cls, symbols: Iterable[str], interval: Interval = Interval.DAILY, exchange: str = '', max_workers: int = 8, refresh: bool = False) -> Iterator[ChartResult]:
+        """
+        Fetches many stock charts concurrently on a bounded thread pool sharing the pooled transport and the rate limit.
+        Yields a ChartResult per symbol as soon as it completes (not in input order). A failed symbol yields its error
+        instead of a chart and does not stop the rest of the batch.
+        """
+        def fetch(symbol):
+            try:
+                return ChartResult(symbol, chart=cls.get_stock_chart(symbol, interval, exchange, refresh))
+            except Exception as e:
+                return ChartResult(symbol, error=e)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
         try:
-            response = requests.get(url).json()
+            futures = [executor.submit(fetch, symbol) for symbol in dict.fromkeys(symbols)]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # stop queued fetches if the caller stops consuming early
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    @profiling.timed('market.request')
+    def _request(cls, path: str, params: dict) -> dict:
+        """
+        Rate limited GET with exponential backoff on rate limiting, server and connection errors.
+        """
+        for attempt in range(cls.RETRIES + 1):
+            if cls.rate_limit is not None:
+                cls.rate_limit.acquire()
+            try:
+                response = cls.transport.get_json(f'{cls.BASE_URL}/{path}', params)
+                # the provider reports most errors in the body with a 200 status
+                if response.get('status') == 'error':
+                    raise TransportError(response.get('message', 'unknown error'), response.get('code'))
+                return response
+            except TransportError as e:
+                if not e.retryable or attempt == cls.RETRIES:
+                    raise
+                profiling.count('market.retries')
+            time.sleep(cls.BACKOFF * 2**attempt * (1 + random.random()))
+
+    @classmethod
+    def _fetch_stock_chart(cls, symbol: str, interval: Interval, exchange: str, start_date=None) -> StockChart:
+        params = {
+            'symbol': f'{symbol}:{exchange}' if exchange else symbol,
+            'interval': interval.value,
+            'apikey': TWELVE_DATA_KEY,
+            'outputsize': cls.OUTPUT_SIZE,
+        }
+        if start_date is not None:
+            params['start_date'] = np.datetime_as_string(np.datetime64(start_date, 's')).replace('T', ' ')
+        try:
+            response = cls._request('time_series', params)
         except Exception as e:
             raise Exception(f'Error fetching stock chart data: {e}. Exchange may be incorrect, supported exchanges:{cls.EXCHANGES}')
-        
+        return cls._parse_stock_chart(response)
+
+    @staticmethod
+    def _parse_stock_chart(response: dict) -> StockChart:
+        from pandas import DataFrame
         metadata = response["meta"]
-        values = DataFrame(response["values"])
+        # the API returns newest first, reverse the rows before parsing so the columns come out contiguous
+        values = DataFrame(response["values"][::-1], columns=["datetime", "open", "high", "low", "close", "volume"])
 
         return StockChart(
             symbol=metadata["symbol"],
@@ -36,10 +162,10 @@ class Market:
             exchange=metadata["exchange"],
             mic=metadata["mic_code"],
             asset_type=metadata["type"],
-            timestamp=values["datetime"].tolist()[::-1],
-            volume=values["volume"].astype(float).tolist()[::-1],
-            opens=values["open"].astype(float).tolist()[::-1],
-            highs=values["high"].astype(float).tolist()[::-1],
-            lows=values["low"].astype(float).tolist()[::-1],
-            closes=values["close"].astype(float).tolist()[::-1]
+            timestamp=values["datetime"].to_numpy(dtype='datetime64[ns]'),
+            volume=values["volume"].to_numpy(dtype=float),
+            opens=values["open"].to_numpy(dtype=float),
+            highs=values["high"].to_numpy(dtype=float),
+            lows=values["low"].to_numpy(dtype=float),
+            closes=values["close"].to_numpy(dtype=float)
         )
@@ -0,0 +1,56 @@
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    rate: tokens added per second
+    capacity: maximum number of tokens (burst size), the bucket starts full
+    """
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError(f'rate must be positive, got {rate}')
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests: float, burst: float = 1.0) -> 'TokenBucket':
+        """
+        Spaces requests evenly at the plan's per-minute quota.
+        burst: requests allowed back to back. A full-quota burst plus the refill would send up to twice the quota in the first minute.
+               At least 1, a bucket that cannot hold a whole token never lets a request through.
+        """
+        return cls(rate=requests / 60, capacity=max(1.0, min(burst, requests)))
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Takes tokens if available without blocking, returns whether it did.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0):
+        """
+        Blocks until tokens are available and takes them.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
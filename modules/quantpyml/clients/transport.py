@@ -0,0 +1,47 @@
+import requests
+from requests.adapters import HTTPAdapter
+from quantpyml.utils import profiling
+
+class TransportError(Exception):
+    """
+    Raised by transports for HTTP error statuses. retryable is set for rate limiting and server errors.
+    """
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status == 429 or self.status >= 500
+
+
+class Transport:
+    """
+    Minimal HTTP interface used by the clients. Swap in a different implementation (or point the default one at a
+    local stand-in server through Market.BASE_URL) to run without hitting the real provider.
+    """
+    def get_json(self, url: str, params: dict | None = None) -> dict:
+        raise NotImplementedError
+
+
+class RequestsTransport(Transport):
+    """
+    Transport backed by a pooled requests.Session, so repeated calls reuse connections.
+    pool_size: connections kept per host, should be at least the number of threads sharing the transport
+    """
+    def __init__(self, timeout: float = 30.0, pool_size: int = 16):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get_json(self, url: str, params: dict | None = None) -> dict:
+        try:
+            response = self.session.get(url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise TransportError(str(e)) from e
+        profiling.count('market.bytes_fetched', len(response.content))
+        if response.status_code >= 400:
+            raise TransportError(f'HTTP {response.status_code}: {response.text[:200]}', response.status_code)
+        return response.json()
@@ -1,5 +1,6 @@
-from .line import Line
-from .stock_chart import StockChart
+from .line import Line, check_period
+from .stock_chart import StockChart, Bar
 from .interval import Interval
+from .resample import Resampler
 
-__all__ = ['Line', 'StockChart', 'Interval']
+__all__ = ['Line', 'check_period', 'StockChart', 'Bar', 'Interval', 'Resampler']
@@ -1,6 +1,15 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass
 class Line:
     period: int | None = None
-    values: list[float]
+    values: list[float] = field(default_factory=list)
+
+
+def check_period(indicator: str, period: int, minimum: int = 1) -> int:
+    """
+    Returns period, raising ValueError if it is below the smallest window the indicator is defined for.
+    """
+    if period < minimum:
+        raise ValueError(f'{indicator} period must be at least {minimum}, got {period}')
+    return period
@@ -0,0 +1,179 @@
+from dataclasses import replace
+import numpy as np
+from quantpyml.common.interval import Interval
+from quantpyml.common.stock_chart import StockChart, Bar, COLUMNS
+
+# Derives coarser bars from finer ones (5min/1h/1day from 1min, 1week/1month from 1day) on the columnar data.
+# Every bar gets an integer bucket key, and as the timestamps are sorted the buckets are contiguous segments, reduced
+# in one pass each with np.maximum/minimum/add.reduceat. Bars are labelled with the start of their bucket, like the provider does.
+# Timestamps are naive wall clock times in the chart's timezone (the exchange timezone for Twelve Data charts).
+
+MINUTES = {
+    Interval.MINUTELY: 1,
+    Interval.FIVE_MINUTELY: 5,
+    Interval.FIFTEEN_MINUTELY: 15,
+    Interval.THIRTY_MINUTELY: 30,
+    Interval.FORTY_FIVE_MINUTELY: 45,
+    Interval.HOURLY: 60,
+    Interval.TWO_HOURLY: 120,
+    Interval.FOUR_HOURLY: 240,
+    Interval.DAILY: 1440,
+    Interval.WEEKLY: 7*1440,
+    Interval.MONTHLY: 31*1440, # only used to order the intervals
+}
+NS_PER_MINUTE = 60*10**9
+NS_PER_DAY = 1440*NS_PER_MINUTE
+
+class Resampler:
+    """
+    Aggregates bars into interval bars: first open, highest high, lowest low, last close, summed volume.
+
+    interval: the target Interval (or its value, e.g. '1h')
+    session: (open, close) local times such as ('09:30', '16:00'); intraday bars outside the session are dropped and intraday buckets
+             start at the session open (9:30-10:30, 10:30-11:30, ...). None keeps every bar and aligns buckets to midnight.
+             Daily and coarser source bars (stamped at midnight) are never filtered by the session.
+    timezone: IANA zone to align the buckets in, the chart's own timezone by default. The output timestamps are in this zone.
+
+    Batch: Resampler(interval).resample(chart), or chart.resample(interval). Streaming: update(bar) per finer bar (or
+    chart.attach(resampler)); completed bars are appended to resampler.chart and the forming one is kept in partial.
+    """
+    def __init__(self, interval: Interval | str, session: tuple[str, str] | None = None, timezone: str | None = None):
+        self.interval = Interval(interval)
+        self.session = session
+        self.timezone = timezone
+        if session is not None:
+            # session bounds in nanoseconds after midnight
+            self._open, self._close = ((int(h)*60 + int(m))*NS_PER_MINUTE for h, m in (t.split(':') for t in session))
+        else:
+            self._open, self._close = 0, NS_PER_DAY
+        self.chart = None
+        self.partial = None
+        self._partial_key = None
+        self._source_timezone = ''
+        self._source_intraday = True
+
+    def _localize(self, timestamp: np.ndarray, timezone: str) -> np.ndarray:
+        """
+        Converts naive wall clock timestamps from timezone to self.timezone.
+        """
+        if self.timezone is None or self.timezone == timezone or not timezone:
+            return timestamp
+        import pandas as pd
+        index = pd.DatetimeIndex(timestamp)
+        # bars in the repeated hour of a DST change are taken as standard time
+        index = index.tz_localize(timezone, ambiguous=np.zeros(len(index), dtype=bool), nonexistent='shift_forward')
+        return index.tz_convert(self.timezone).tz_localize(None).to_numpy(dtype='datetime64[ns]')
+
+    @staticmethod
+    def _intraday(interval: str) -> bool:
+        """
+        True unless interval is daily or coarser (unknown intervals are taken as intraday).
+        """
+        return interval not in Interval._value2member_map_ or MINUTES[Interval(interval)] < MINUTES[Interval.DAILY]
+
+    def _buckets(self, timestamp: np.ndarray, intraday: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the bucket key and bucket start of every bar, and the mask of bars inside the session (every bar unless the
+        source is intraday). Works on the int64 nanoseconds, the datetime64 arithmetic is several times slower.
+        """
+        ns = timestamp.astype('datetime64[ns]').view(np.int64)
+        days, time_of_day = np.divmod(ns, NS_PER_DAY)
+        if intraday:
+            inside = (time_of_day >= self._open) & (time_of_day < self._close)
+        else:
+            inside = np.ones(len(ns), dtype=bool)
+        if self.interval == Interval.MONTHLY:
+            months = timestamp.astype('datetime64[M]')
+            return months.view(np.int64), months.astype('datetime64[ns]'), inside
+        if self.interval == Interval.WEEKLY:
+            # 1970-01-01 was a Thursday, weeks start on Monday
+            weeks = (days + 3)//7
+            return weeks, ((weeks*7 - 3)*NS_PER_DAY).view('datetime64[ns]'), inside
+        if self.interval == Interval.DAILY:
+            return days, (days*NS_PER_DAY).view('datetime64[ns]'), inside
+        width = MINUTES[self.interval]*NS_PER_MINUTE
+        slot = (time_of_day - self._open)//width
+        start = ns - time_of_day + self._open + slot*width
+        return days*(NS_PER_DAY//width + 1) + slot, start.view('datetime64[ns]'), inside
+
+    def _check_interval(self, interval: str):
+        """
+        Raises ValueError unless every target bucket is a union of whole source bars.
+        """
+        if interval not in Interval._value2member_map_:
+            return
+        source, target = MINUTES[Interval(interval)], MINUTES[self.interval]
+        intraday = target < MINUTES[Interval.DAILY]
+        if source > target or (intraday and target % source) or (source == MINUTES[Interval.WEEKLY] and self.interval == Interval.MONTHLY):
+            raise ValueError(f'Cannot resample {interval} bars to {self.interval.value}')
+
+    def resample(self, chart: StockChart) -> StockChart:
+        """
+        Returns the chart aggregated to the interval. The last bar covers whatever part of its bucket the chart holds.
+        """
+        self._check_interval(chart.interval)
+        timestamp = self._localize(chart.timestamp, chart.timezone)
+        keys, starts, inside = self._buckets(timestamp, self._intraday(chart.interval))
+        if not inside.all():
+            keys, starts = keys[inside], starts[inside]
+            columns = {name: getattr(chart, name)[inside] for name in COLUMNS}
+        else:
+            columns = {name: getattr(chart, name) for name in COLUMNS}
+        if not len(keys):
+            first = ends = np.empty(0, dtype=np.intp)
+        else:
+            first = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+            ends = np.append(first[1:], len(keys)) - 1
+        reduce = lambda ufunc, x: ufunc.reduceat(x, first) if len(first) else x[:0]
+        return replace(chart,
+            interval=self.interval.value,
+            timezone=self.timezone or chart.timezone,
+            timestamp=starts[first],
+            opens=columns['opens'][first],
+            highs=reduce(np.maximum, columns['highs']),
+            lows=reduce(np.minimum, columns['lows']),
+            closes=columns['closes'][ends],
+            volume=reduce(np.add, columns['volume'])
+        )
+
+    def update(self, bar: Bar) -> Bar | None:
+        """
+        Folds a finer bar into the forming bar. Returns the completed bar when bar starts a new bucket (also appended to
+        chart, which pushes it to the chart's listeners), otherwise None. Call start first to carry over the chart's metadata
+        and timezone, otherwise the bars are taken as already in the resampler's timezone.
+        """
+        if self.chart is None:
+            empty = np.empty(0)
+            self.chart = StockChart('', self.interval.value, '', self.timezone or '', '', '', '', timestamp=empty.astype('datetime64[ns]'),
+                                    volume=empty, opens=empty, highs=empty, lows=empty, closes=empty)
+        timestamp = self._localize(np.array([np.datetime64(bar.timestamp, 'ns')]), self._source_timezone)
+        keys, starts, inside = self._buckets(timestamp, self._source_intraday)
+        if not inside[0]:
+            return None
+        completed = None
+        if self.partial is not None and keys[0] != self._partial_key:
+            completed = self.partial
+            self.chart.append(completed)
+        if self.partial is None or completed is not None:
+            self.partial = Bar(starts[0], bar.open, bar.high, bar.low, bar.close, bar.volume)
+            self._partial_key = keys[0]
+        else:
+            p = self.partial
+            p.high, p.low, p.close, p.volume = max(p.high, bar.high), min(p.low, bar.low), bar.close, p.volume + bar.volume
+        return completed
+
+    def start(self, chart: StockChart) -> 'Resampler':
+        """
+        Starts streaming from the bars already on chart: the completed buckets go to self.chart, the last one becomes partial.
+        Returns self, ready to be attached with chart.attach(resampler, replay=False).
+        """
+        resampled = self.resample(chart)
+        self._source_timezone = chart.timezone
+        self._source_intraday = self._intraday(chart.interval)
+        if not len(resampled):
+            self.chart = resampled
+            return self
+        self.chart = resampled[:-1]
+        self.partial = resampled.bar(len(resampled) - 1)
+        self._partial_key = self._buckets(resampled.timestamp[-1:])[0][0]
+        return self
@@ -1,8 +1,31 @@
-from dataclasses import dataclass
-from quantpyml.common import Line
+from dataclasses import dataclass, field, replace
+import numpy as np
 
-@dataclass
+# column name on the chart -> column name in pandas/arrow (matches the Twelve Data and talipp naming)
+COLUMNS = {
+    'opens': 'open',
+    'highs': 'high',
+    'lows': 'low',
+    'closes': 'close',
+    'volume': 'volume',
+}
+METADATA = ('symbol', 'interval', 'currency', 'timezone', 'exchange', 'mic', 'asset_type')
+
+@dataclass(slots=True)
+class Bar:
+    timestamp: np.datetime64
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+
+@dataclass(slots=True, eq=False)
 class StockChart:
+    """
+    Columnar OHLCV chart. Every column is a contiguous 1-D numpy array (float64 prices/volume, datetime64[ns] timestamps), oldest bar first.
+    Columns passed in as arrays of the right dtype are stored as-is (no copy), and slicing returns views onto the same buffers.
+    """
     symbol: str
     interval: str
     currency: str
@@ -10,9 +33,150 @@ class StockChart:
     exchange: str
     mic: str
     asset_type: str
-    timestamp: Line
-    volume: Line
-    opens: Line
-    highs: Line
-    lows: Line
-    closes: Line
+    timestamp: np.ndarray
+    volume: np.ndarray
+    opens: np.ndarray
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    # spare-capacity buffers backing the columns once bars are appended, and the objects notified of every new bar
+    _buffers: dict | None = field(default=None, init=False, repr=False)
+    _listeners: list = field(default_factory=list, init=False, repr=False)
+    _version: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self.timestamp = np.asarray(self.timestamp, dtype='datetime64[ns]')
+        for name in COLUMNS:
+            setattr(self, name, np.asarray(getattr(self, name), dtype=np.float64))
+        n = len(self.timestamp)
+        for name in COLUMNS:
+            if getattr(self, name).shape != (n,):
+                raise ValueError(f'Column {name} has shape {getattr(self, name).shape}, expected ({n},)')
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def __getitem__(self, key: slice) -> 'StockChart':
+        """
+        Returns a chart whose columns are views of this chart's columns.
+        """
+        if not isinstance(key, slice):
+            raise TypeError('StockChart only supports slice indexing, use the columns for element access')
+        return replace(self, timestamp=self.timestamp[key], **{name: getattr(self, name)[key] for name in COLUMNS})
+
+    @property
+    def version(self) -> int:
+        """
+        Incremented on every append, lets caches keyed by the chart notice new bars.
+        """
+        return self._version
+
+    def bar(self, i: int) -> Bar:
+        return Bar(self.timestamp[i], *(float(getattr(self, name)[i]) for name in ('opens', 'highs', 'lows', 'closes', 'volume')))
+
+    def append(self, bar: Bar):
+        """
+        Appends a bar in amortized O(1) (columns grow into buffers with spare capacity) and pushes it to every attached listener.
+        Views taken before the append keep pointing at the bars they were taken from.
+        """
+        n = len(self)
+        timestamp = np.datetime64(bar.timestamp, 'ns')
+        if n and timestamp <= self.timestamp[-1]:
+            raise ValueError(f'Bar at {timestamp} is not after the last bar at {self.timestamp[-1]}')
+        if self._buffers is None or n == len(self._buffers['timestamp']):
+            capacity = max(16, 2 * n)
+            self._buffers = {'timestamp': np.empty(capacity, dtype='datetime64[ns]'), **{name: np.empty(capacity) for name in COLUMNS}}
+            for name, buffer in self._buffers.items():
+                buffer[:n] = getattr(self, name)
+        bar = Bar(timestamp, float(bar.open), float(bar.high), float(bar.low), float(bar.close), float(bar.volume))
+        for name, value in (('timestamp', timestamp), ('opens', bar.open), ('highs', bar.high), ('lows', bar.low), ('closes', bar.close), ('volume', bar.volume)):
+            self._buffers[name][n] = value
+            setattr(self, name, self._buffers[name][:n + 1])
+        self._version += 1
+        for listener in self._listeners:
+            listener.update(bar)
+
+    def attach(self, listener, replay: bool = True):
+        """
+        Registers an object with an update(bar) method (e.g. a streaming indicator) to receive every appended bar.
+        replay: first feed it the bars already on the chart
+        """
+        if replay:
+            for i in range(len(self)):
+                listener.update(self.bar(i))
+        self._listeners.append(listener)
+        return listener
+
+    def detach(self, listener):
+        self._listeners.remove(listener)
+
+    @property
+    def metadata(self) -> dict:
+        return {name: getattr(self, name) for name in METADATA}
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamp.nbytes + sum(getattr(self, name).nbytes for name in COLUMNS)
+
+    def between(self, start=None, end=None) -> 'StockChart':
+        """
+        Returns a zero-copy view of the bars with start <= timestamp <= end.
+        start, end: anything np.datetime64 accepts (str, datetime, datetime64), None for an open bound
+        """
+        lo = 0 if start is None else np.searchsorted(self.timestamp, np.datetime64(start, 'ns'), side='left')
+        hi = len(self) if end is None else np.searchsorted(self.timestamp, np.datetime64(end, 'ns'), side='right')
+        return self[lo:hi]
+
+    def resample(self, interval, session: tuple[str, str] | None = None, timezone: str | None = None) -> 'StockChart':
+        """
+        Returns the chart aggregated to a coarser Interval, see Resampler.
+        """
+        from quantpyml.common.resample import Resampler
+        return Resampler(interval, session, timezone).resample(self)
+
+    def to_pandas(self):
+        """
+        Returns a DataFrame indexed by timestamp whose columns share memory with this chart.
+        """
+        import pandas as pd
+        index = pd.DatetimeIndex(self.timestamp, name='datetime', copy=False)
+        df = pd.DataFrame({column: getattr(self, name) for name, column in COLUMNS.items()}, index=index, copy=False)
+        df.attrs.update(self.metadata)
+        return df
+
+    @classmethod
+    def from_pandas(cls, df, **metadata) -> 'StockChart':
+        """
+        Builds a chart from a DataFrame indexed by timestamp with open/high/low/close/volume columns.
+        Metadata missing from the keyword arguments is read from df.attrs. float64 columns are not copied.
+        """
+        metadata = {name: metadata.get(name, df.attrs.get(name, '')) for name in METADATA}
+        columns = {name: df[column].to_numpy(dtype=np.float64, copy=False) for name, column in COLUMNS.items()}
+        return cls(**metadata, timestamp=df.index.to_numpy(dtype='datetime64[ns]'), **columns)
+
+    def to_arrow(self):
+        """
+        Returns a pyarrow Table that wraps this chart's buffers. Metadata is stored in the schema metadata.
+        """
+        import pyarrow as pa
+        arrays = [pa.array(self.timestamp)] + [pa.array(getattr(self, name)) for name in COLUMNS]
+        names = ['datetime'] + list(COLUMNS.values())
+        return pa.Table.from_arrays(arrays, names=names, metadata={k: str(v) for k, v in self.metadata.items()})
+
+    @classmethod
+    def from_arrow(cls, table, **metadata) -> 'StockChart':
+        """
+        Builds a chart from a pyarrow Table produced by to_arrow (or with the same column names).
+        Single-chunk columns without nulls are not copied.
+        """
+        schema_metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        metadata = {name: metadata.get(name, schema_metadata.get(name, '')) for name in METADATA}
+
+        def column(name):
+            chunked = table.column(name)
+            if chunked.num_chunks == 1 and chunked.null_count == 0:
+                return chunked.chunk(0).to_numpy(zero_copy_only=True)
+            return chunked.to_numpy()
+
+        columns = {name: column(col) for name, col in COLUMNS.items()}
+        return cls(**metadata, timestamp=column('datetime'), **columns)
@@ -1,6 +1,66 @@
-from .efficient_frontier import EfficientFrontier
-from .black_scholes import BlackScholes
-from .brownian_motion import BrownianMotion
-from .indicators import Indicators
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = ['EfficientFrontier', 'BlackScholes', 'BrownianMotion', 'Indicators']
+# The models are imported on first use (PEP 562 module __getattr__): `from quantpyml.models import BlackScholes` only
+# imports black_scholes, so a job that prices options does not pay for torch, pandas, matplotlib or talipp.
+_SUBMODULES = {
+    'EfficientFrontier': 'efficient_frontier',
+    'BatchOptimizer': 'batch_optimization',
+    'Scenario': 'batch_optimization',
+    'QPSolver': 'qp',
+    'PortfolioQP': 'qp',
+    'PortfolioConstraints': 'qp',
+    'FactorCovariance': 'qp',
+    'CovarianceEstimator': 'covariance',
+    'SampleCovariance': 'covariance',
+    'LedoitWolfCovariance': 'covariance',
+    'EWMACovariance': 'covariance',
+    'PCAFactorCovariance': 'covariance',
+    'BlackScholes': 'black_scholes',
+    'OptionsStrategy': 'options_strategy',
+    'Leg': 'options_strategy',
+    'BrownianMotion': 'brownian_motion',
+    'CorrelatedBrownianMotion': 'brownian_motion',
+    'MonteCarlo': 'monte_carlo',
+    'Indicators': 'indicators',
+    'BatchIndicators': 'batch_indicators',
+    'IndicatorGraph': 'indicator_graph',
+    'Backtest': 'backtest',
+    'Costs': 'backtest',
+    'IndicatorCache': 'backtest',
+    'StreamingSMA': 'streaming_indicators',
+    'StreamingEMA': 'streaming_indicators',
+    'StreamingWMA': 'streaming_indicators',
+    'StreamingHMA': 'streaming_indicators',
+    'StreamingRSI': 'streaming_indicators',
+    'StreamingBollingerBands': 'streaming_indicators',
+    'StreamingIchimoku': 'streaming_indicators',
+}
+
+if TYPE_CHECKING:
+    from .efficient_frontier import EfficientFrontier
+    from .batch_optimization import BatchOptimizer, Scenario
+    from .qp import QPSolver, PortfolioQP, PortfolioConstraints, FactorCovariance
+    from .covariance import CovarianceEstimator, SampleCovariance, LedoitWolfCovariance, EWMACovariance, PCAFactorCovariance
+    from .black_scholes import BlackScholes
+    from .options_strategy import OptionsStrategy, Leg
+    from .brownian_motion import BrownianMotion, CorrelatedBrownianMotion
+    from .monte_carlo import MonteCarlo
+    from .indicators import Indicators
+    from .batch_indicators import BatchIndicators
+    from .indicator_graph import IndicatorGraph
+    from .backtest import Backtest, Costs, IndicatorCache
+    from .streaming_indicators import StreamingSMA, StreamingEMA, StreamingWMA, StreamingHMA, StreamingRSI, StreamingBollingerBands, StreamingIchimoku
+
+__all__ = list(_SUBMODULES)
+
+def __getattr__(name: str):
+    if name not in _SUBMODULES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{_SUBMODULES[name]}', __name__), name)
+    # cache it, later lookups do not come back here
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,204 @@
+import itertools
+from dataclasses import dataclass
+from typing import Callable
+import numpy as np
+import pandas as pd
+from quantpyml.common import Line, StockChart
+from quantpyml.models.batch_indicators import BatchIndicators
+from quantpyml.utils.returns import Returns
+
+# Vectorized (event-free) backtests. A signal is the target position of every bar, as a fraction of the capital allocated
+# to the symbol (1 long, -1 short, 0 flat, NaN during indicator warm-up counts as flat), decided on the bar's close.
+# Signals broadcast as (..., symbols, time) arrays, so leading axes run many parameter sets in the same array operations.
+# Capital is split equally between the symbols and rebalanced every bar.
+
+@dataclass
+class Costs:
+    """
+    Proportional transaction costs, as fractions of the traded notional (0.0005 = 5 bps).
+    commission: broker fees
+    slippage: fills are this much worse than the reference close (buys above it, sells below it)
+    """
+    commission: float = 0.0
+    slippage: float = 0.0
+
+    def fill_prices(self, prices: np.ndarray, trades: np.ndarray) -> np.ndarray:
+        return prices*(1 + np.sign(trades)*self.slippage)
+
+    def __call__(self, trades: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        """
+        Returns the cost of the trades (changes in position) as a fraction of the capital.
+        Subclasses can model other costs (e.g. market impact growing with the trade size) by overriding this.
+        """
+        return np.abs(trades)*(self.commission + self.slippage)
+
+
+@dataclass
+class BacktestResult:
+    """
+    Result of Backtest.run. Per-symbol arrays are (..., symbols, time), portfolio arrays (..., time), metrics (...) with the
+    leading (parameter) axes of the signals.
+    """
+    positions: np.ndarray
+    trades: np.ndarray
+    fill_prices: np.ndarray
+    costs: np.ndarray
+    pnl: np.ndarray
+    returns: np.ndarray
+    equity: np.ndarray
+    total_return: np.ndarray
+    sharpe: np.ndarray
+    max_drawdown: np.ndarray
+    turnover: np.ndarray
+
+
+@dataclass
+class Sweep:
+    """
+    Result of Backtest.sweep: one row of table (the parameters, then the metrics) and one equity curve per parameter combination.
+    """
+    table: pd.DataFrame
+    equity: np.ndarray
+
+    def best(self, metric: str = 'Sharpe Ratio', n: int = 10) -> pd.DataFrame:
+        return self.table.nlargest(n, metric)
+
+
+class IndicatorCache:
+    """
+    Memoized BatchIndicators over one (symbols, time) panel: each indicator and period is computed once however many
+    parameter combinations of a sweep use it. Call the indicator by name, e.g. cache.SMA(20) or cache.RSI(14) (the values array).
+    """
+    def __init__(self, panel: np.ndarray):
+        self.panel = panel
+        self._values = {}
+
+    def __getattr__(self, name: str):
+        if name not in BatchIndicators.SUPPORTED:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.get(name, *args, **kwargs)
+
+    def get(self, name: str, *args, **kwargs):
+        key = (name, args, tuple(sorted(kwargs.items())))
+        if key not in self._values:
+            result = getattr(BatchIndicators, name)(self.panel, *args, **kwargs)
+            self._values[key] = result.values if isinstance(result, Line) else result
+        return self._values[key]
+
+
+class Backtest:
+    """
+    Backtests signals on the closes of a StockChart, a list of StockCharts (aligned, equal length) or a (symbols, time) array.
+
+    costs: commission and slippage model
+    lag: bars between the close a signal is decided on and the first bar whose return it earns, at least 1 (no lookahead).
+         The trade fills at close lag - 1 bars after the decision: with the default 1, at the decision close itself.
+    periods_per_year: bars per year for the annualized Sharpe ratio, 252 for daily bars
+    capital: starting equity
+    """
+    def __init__(self, prices, costs: Costs | None = None, lag: int = 1, periods_per_year: int = 252, capital: float = 1.0):
+        if lag < 1:
+            raise ValueError('lag must be at least 1, a signal cannot earn the return of the bar it is computed from')
+        if isinstance(prices, StockChart):
+            prices = prices.closes
+        elif isinstance(prices, (list, tuple)) and prices and isinstance(prices[0], StockChart):
+            prices = [chart.closes for chart in prices]
+        self.closes = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+        self.costs = costs or Costs()
+        self.lag = lag
+        self.periods_per_year = periods_per_year
+        self.capital = capital
+        # return of each bar from the previous close, 0 on the first bar
+        self.bar_returns = np.zeros_like(self.closes)
+        self.bar_returns[:, 1:] = Returns.calculate_returns(self.closes).values
+        self.indicators = IndicatorCache(self.closes)
+
+    @staticmethod
+    def signal(values) -> np.ndarray:
+        """
+        Converts an Indicators/BatchIndicators Line (None or NaN during warm-up) or array to a float array.
+        """
+        return np.asarray(values.values if isinstance(values, Line) else values, dtype=np.float64)
+
+    @staticmethod
+    def crossover(fast, slow, long_only: bool = False) -> np.ndarray:
+        """
+        Long while fast is above slow, short (or flat with long_only) while below, flat during warm-up.
+        """
+        fast, slow = Backtest.signal(fast), Backtest.signal(slow)
+        with np.errstate(invalid='ignore'):
+            position = np.sign(fast - slow)
+        if long_only:
+            position = np.maximum(position, 0.0)
+        return np.nan_to_num(position)
+
+    @staticmethod
+    def thresholds(indicator, lower: float, upper: float, long_only: bool = False) -> np.ndarray:
+        """
+        Mean reversion on an oscillator (e.g. RSI 30/70): enter long below lower, short (or flat with long_only) above upper,
+        and hold the position in between. The hold is a forward fill over the last crossing, no loop over the bars.
+        """
+        x = Backtest.signal(indicator)
+        with np.errstate(invalid='ignore'):
+            entries = np.where(x < lower, 1.0, np.where(x > upper, 0.0 if long_only else -1.0, np.nan))
+        index = np.where(np.isnan(entries), 0, np.arange(x.shape[-1]))
+        last = np.maximum.accumulate(index, axis=-1)
+        held = np.take_along_axis(entries, last, axis=-1)
+        return np.nan_to_num(held)
+
+    def run(self, signals) -> BacktestResult:
+        """
+        Backtests target positions broadcasting to (..., symbols, time).
+        """
+        signals = np.nan_to_num(self.signal(signals))
+        signals = np.broadcast_to(signals, signals.shape[:-2] + self.closes.shape)
+        positions = np.zeros(signals.shape)
+        positions[..., self.lag:] = signals[..., :-self.lag]
+        trades = np.diff(positions, axis=-1, prepend=0.0)
+        # trades decided on close t - lag fill at close t - 1 and earn from bar t on
+        reference = np.empty_like(self.closes)
+        reference[:, 0] = self.closes[:, 0]
+        reference[:, 1:] = self.closes[:, :-1]
+        costs = self.costs(trades, reference)
+        pnl = positions*self.bar_returns - costs
+        returns = pnl.mean(axis=-2)
+        equity = self.capital*np.cumprod(1 + returns, axis=-1)
+        std = returns.std(axis=-1, ddof=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = np.where(std > 0, returns.mean(axis=-1)/std*np.sqrt(self.periods_per_year), np.nan)
+        return BacktestResult(
+            positions=positions,
+            trades=trades,
+            fill_prices=self.costs.fill_prices(reference, trades),
+            costs=costs,
+            pnl=pnl,
+            returns=returns,
+            equity=equity,
+            total_return=equity[..., -1]/self.capital - 1,
+            sharpe=sharpe,
+            max_drawdown=Returns.drawdowns(returns.reshape(-1, returns.shape[-1]), from_returns=True).max_drawdown.reshape(returns.shape[:-1]),
+            turnover=np.abs(trades).sum(axis=-1).mean(axis=-1)
+        )
+
+    def sweep(self, strategy: Callable[..., np.ndarray], grid: dict[str, list], chunk_size: int = 256) -> Sweep:
+        """
+        Backtests strategy for every combination of the grid, chunk_size combinations per vectorized run.
+        strategy: called as strategy(self.indicators, **params), returns the (symbols, time) signal. Taking indicators from the
+        shared IndicatorCache computes each distinct indicator once for the whole sweep, e.g.
+        lambda ind, fast, slow: Backtest.crossover(ind.SMA(fast), ind.SMA(slow))
+        grid: parameter name -> values
+        """
+        names = list(grid)
+        combinations = list(itertools.product(*grid.values()))
+        equity = np.empty((len(combinations), self.closes.shape[1]))
+        metrics = {'Total Return': [], 'Sharpe Ratio': [], 'Max Drawdown': [], 'Turnover': []}
+        for start in range(0, len(combinations), chunk_size):
+            chunk = combinations[start:start + chunk_size]
+            result = self.run(np.stack([strategy(self.indicators, **dict(zip(names, params))) for params in chunk]))
+            equity[start:start + len(chunk)] = result.equity
+            for name, values in zip(metrics, (result.total_return, result.sharpe, result.max_drawdown, result.turnover)):
+                metrics[name].append(values)
+        table = pd.DataFrame(combinations, columns=names)
+        for name, values in metrics.items():
+            table[name] = np.concatenate(values) if values else []
+        return Sweep(table=table, equity=equity)
@@ -0,0 +1,175 @@
+import numpy as np
+from quantpyml.common import Line, check_period
+from quantpyml.models.indicators import BB
+
+# Vectorized counterparts of Indicators over a (symbols x time) panel. Rolling sums use cumulative sums, EMA/RSI
+# smoothing and WMA weights run as scipy.signal.lfilter filters along the time axis, so there is no per-element
+# Python work. Each row reproduces the talipp pipeline Indicators uses, with NaN where talipp returns None.
+# Tolerance against talipp: |batch - talipp| <= 1e-9 * max(1, |price scale|) for series up to ~1e6 bars
+# (the cumulative sums are taken on each row minus its first value to keep the round-off small).
+# scipy.signal is imported where it is used, it pulls in scipy.stats and takes most of a second to import.
+
+class BatchIndicators:
+    """
+    Indicators computed over 2-D arrays of shape (symbols, time), oldest bar first. 1-D input is treated as a single symbol
+    and gives 1-D output. Leading NaNs in a row (a symbol that starts trading later in the panel) push that row's warm-up back,
+    so every row matches running talipp on its own valid history. NaNs inside a row propagate forward.
+    """
+    SUPPORTED = ('SMA', 'EMA', 'HMA', 'BollingerBands', 'RSI')
+
+    @staticmethod
+    def _panel(series) -> tuple[np.ndarray, np.ndarray | None]:
+        """
+        Returns the panel as 2-D float64 with each row shifted left to start at its first valid value, plus the shifts (None if no row needed one).
+        """
+        x = np.atleast_2d(np.asarray(series, dtype=np.float64))
+        start = np.argmax(~np.isnan(x), axis=1)
+        if not start.any():
+            return x, None
+        T = x.shape[1]
+        idx = np.arange(T) + start[:, None]
+        aligned = np.take_along_axis(x, np.minimum(idx, T - 1), axis=1)
+        aligned[idx >= T] = np.nan
+        return aligned, start
+
+    @staticmethod
+    def _restore(values: np.ndarray, start: np.ndarray | None, ndim: int) -> np.ndarray:
+        """
+        Undoes the row shifts of _panel and returns the result with the input's number of dimensions.
+        """
+        if start is not None:
+            T = values.shape[1]
+            idx = np.arange(T) - start[:, None]
+            values = np.take_along_axis(values, np.maximum(idx, 0), axis=1)
+            values[idx < 0] = np.nan
+        return values if ndim > 1 else values[0]
+
+    @staticmethod
+    def _rolling_sum(x: np.ndarray, period: int) -> np.ndarray:
+        """
+        Sum over the trailing window via cumulative sums, NaN for the first period-1 bars. x must be (rows minus their first value) for precision.
+        """
+        out = np.full_like(x, np.nan)
+        if period > x.shape[1]:
+            return out
+        cs = np.cumsum(x, axis=1)
+        out[:, period - 1] = cs[:, period - 1]
+        out[:, period:] = cs[:, period:] - cs[:, :-period]
+        return out
+
+    @classmethod
+    def _sma(cls, x: np.ndarray, period: int) -> np.ndarray:
+        base = x[:, :1]
+        return cls._rolling_sum(x - base, period) / period + base
+
+    @classmethod
+    def _wma(cls, x: np.ndarray, period: int) -> np.ndarray:
+        from scipy.signal import lfilter
+        # FIR filter with weights period..1 on the newest..oldest bar of the window
+        weights = np.arange(period, 0, -1, dtype=np.float64) / (period * (period + 1) / 2.0)
+        out = lfilter(weights, [1.0], x, axis=1)
+        out[:, :period - 1] = np.nan
+        return out
+
+    @classmethod
+    def _ema(cls, x: np.ndarray, period: int) -> np.ndarray:
+        from scipy.signal import lfilter
+        out = np.full_like(x, np.nan)
+        if period > x.shape[1]:
+            return out
+        # seeded with the SMA of the first window, then y[t] = m*x[t] + (1 - m)*y[t-1]
+        mult = 2.0 / (period + 1.0)
+        seed = x[:, :period].mean(axis=1)
+        out[:, period - 1] = seed
+        out[:, period:] = lfilter([mult], [1.0, mult - 1.0], x[:, period:], axis=1, zi=((1.0 - mult) * seed)[:, None])[0]
+        return out
+
+    @classmethod
+    def SMA(cls, series: np.ndarray, period: int = 14) -> Line:
+        """
+        Simple Moving Average
+        https://www.investopedia.com/terms/s/sma.asp
+        """
+        check_period('SMA', period)
+        x, start = cls._panel(series)
+        return Line(period=period, values=cls._restore(cls._sma(x, period), start, np.ndim(series)))
+
+    @classmethod
+    def EMA(cls, series: np.ndarray, period: int = 14) -> Line:
+        """
+        Exponential Moving Average
+        https://www.investopedia.com/terms/e/ema.asp
+        """
+        check_period('EMA', period)
+        x, start = cls._panel(series)
+        return Line(period=period, values=cls._restore(cls._ema(x, period), start, np.ndim(series)))
+
+    @classmethod
+    def HMA(cls, series: np.ndarray, period: int = 14) -> Line:
+        """
+        Hull Moving Average
+        https://chartschool.stockcharts.com/table-of-contents/technical-indicators-and-overlays/technical-overlays/hull-moving-average-hma
+        """
+        check_period('HMA', period, 2)
+        x, start = cls._panel(series)
+        sqrt_period = int(np.sqrt(period))
+        hma = cls._wma(2.0 * cls._wma(x, period // 2) - cls._wma(x, period), sqrt_period)
+        # talipp only starts feeding the outer WMA once the inner one has sqrt(period) values, delaying the first output by sqrt(period) - 1 bars
+        hma[:, :period + 2 * sqrt_period - 3] = np.nan
+        return Line(period=period, values=cls._restore(hma, start, np.ndim(series)))
+
+    @classmethod
+    def BollingerBands(cls, series: np.ndarray, period: int = 14, stdev_multiplier: float = 2.0) -> BB:
+        """
+        Bollinger Bands
+        https://www.investopedia.com/terms/b/bollingerbands.asp
+        """
+        check_period('BollingerBands', period)
+        x, start = cls._panel(series)
+        centered = x - x[:, :1]
+        mean = cls._rolling_sum(centered, period) / period
+        mean_square = cls._rolling_sum(centered**2, period) / period
+        # population variance of the window, as talipp's StdDev
+        variance = np.maximum(mean_square - mean**2, 0.0)
+        # E[x^2] - E[x]^2 cancels catastrophically on near-flat windows, redo those (rare) windows with a two-pass variance
+        rows, ends = np.nonzero(variance <= 1e-6 * mean_square)
+        if len(rows):
+            windows = centered[rows[:, None], ends[:, None] - np.arange(period)]
+            variance[rows, ends] = windows.var(axis=1)
+        mid = mean + x[:, :1]
+        width = stdev_multiplier * np.sqrt(variance)
+        restore = lambda values: Line(period, cls._restore(values, start, np.ndim(series)))
+        return BB(
+            period=period,
+            stdev_multiplier=stdev_multiplier,
+            top=restore(mid + width),
+            mid=restore(mid),
+            bot=restore(mid - width)
+        )
+
+    @classmethod
+    def RSI(cls, series: np.ndarray, period: int = 14) -> Line:
+        """
+        Relative Strength Index
+        https://www.investopedia.com/terms/r/rsi.asp
+        """
+        check_period('RSI', period, 2)
+        from scipy.signal import lfilter
+        x, start = cls._panel(series)
+        out = np.full_like(x, np.nan)
+        if period < x.shape[1]:
+            change = np.diff(x, axis=1)
+            gain = np.maximum(change, 0.0)
+            loss = np.maximum(-change, 0.0)
+            # Wilder smoothing seeded, like talipp, with the mean of the first period-1 changes
+            a = [1.0, -(period - 1.0) / period]
+            avg = []
+            for moves in (gain, loss):
+                seed = moves[:, :period - 1].mean(axis=1)
+                avg.append(lfilter([1.0 / period], a, moves[:, period - 1:], axis=1, zi=(-a[1] * seed)[:, None])[0])
+            avg_gain, avg_loss = avg
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            out[:, period:] = np.where(avg_loss == 0, 100.0, rsi)
+            out[:, period:][np.isnan(avg_loss)] = np.nan
+        return Line(period=period, values=cls._restore(out, start, np.ndim(series)))
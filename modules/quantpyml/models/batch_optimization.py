@@ -0,0 +1,173 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from quantpyml.models.efficient_frontier import EfficientFrontier
+from quantpyml.models.qp import FactorCovariance, PortfolioConstraints
+from quantpyml.models.covariance import CovarianceEstimator
+
+# Many EfficientFrontier runs (rebalance dates x risk-free rates x weight constraints) fanned out over a process pool.
+# The returns (and a fixed covariance matrix) are copied once into shared memory and every worker maps them, so a task
+# only pickles its scenarios. Scenarios with the same estimation window run in the same task on one EfficientFrontier,
+# sharing its covariance and its cache of solutions.
+
+@dataclass
+class Scenario:
+    """
+    One optimization of a batch.
+
+    objective: 'max_sharpe', 'min_variance' or 'optimize' (needs target_return or target_variance)
+    start, end: the estimation window, returns[:, start:end] (a rebalance date uses the observations before it)
+    label: free-form tag copied to the result table, e.g. the rebalance date
+    """
+    objective: str = 'max_sharpe'
+    start: int | None = None
+    end: int | None = None
+    risk_free_rate: float = 0.0
+    weight_constraint: tuple = (0,1)
+    target_return: float | None = None
+    target_variance: float | None = None
+    constraints: PortfolioConstraints | None = None
+    label: object = None
+
+
+# per-process state of a worker: the mapped shared memory and the arrays viewing it
+_WORKER = {}
+
+def _share(array: np.ndarray) -> tuple[shared_memory.SharedMemory, tuple]:
+    """
+    Copies array into a new shared memory block, returns the block and the (name, shape, dtype) spec to attach to it.
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+def _attach(spec: tuple) -> np.ndarray:
+    name, shape, dtype = spec
+    # workers share the parent's resource tracker, the parent alone unlinks the block
+    block = shared_memory.SharedMemory(name=name)
+    _WORKER.setdefault('blocks', []).append(block)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    array.flags.writeable = False
+    return array
+
+def _init_worker(tickers, returns_spec, return_period, covariance, covariance_spec, backend):
+    _WORKER.update(tickers=tickers, returns=_attach(returns_spec), return_period=return_period, backend=backend,
+                   covariance=_attach(covariance_spec) if covariance_spec is not None else covariance)
+
+def _run(tasks: list[tuple[int, Scenario]]) -> list[tuple]:
+    """
+    Solves the scenarios of one estimation window, returns (index, success, Sharpe, mean, variance, stdev, weights, error) rows.
+    """
+    start, end = tasks[0][1].start, tasks[0][1].end
+    frontier = EfficientFrontier(_WORKER['tickers'], _WORKER['returns'][:, start:end], _WORKER['return_period'], _WORKER['covariance'], _WORKER['backend'])
+    rows = []
+    for index, scenario in tasks:
+        try:
+            if scenario.objective == 'max_sharpe':
+                result = frontier.max_sharpe(scenario.risk_free_rate, scenario.weight_constraint, scenario.constraints)
+            elif scenario.objective == 'min_variance':
+                result = frontier.min_variance(scenario.weight_constraint, scenario.risk_free_rate, scenario.constraints)
+            elif scenario.objective == 'optimize':
+                result = frontier.optimize(scenario.target_return, scenario.target_variance, scenario.risk_free_rate, scenario.weight_constraint, scenario.constraints)
+            else:
+                raise ValueError(f'Unknown objective {scenario.objective!r}')
+            success, weights, sharpe, mean, variance, stdev = result
+            rows.append((index, bool(success), float(sharpe), float(mean), float(variance), float(stdev), np.asarray(weights, dtype=np.float64), None))
+        except Exception as error:
+            # one failed scenario should not take down a whole batch, it is reported in the error column
+            rows.append((index, False, np.nan, np.nan, np.nan, np.nan, None, f'{type(error).__name__}: {error}'))
+    return rows
+
+
+class BatchOptimizer:
+    """
+    Runs many EfficientFrontier optimizations over one returns panel, in parallel, and collects them in one table. Never prints.
+    Parameters follow EfficientFrontier, the covariance (if given) applies to every window.
+    workers: worker processes, os.cpu_count() by default; 1 runs in this process
+    Each worker runs single-threaded Python but numpy may start a BLAS thread pool per process, set OMP_NUM_THREADS=1
+    (before numpy is imported) for large batches of small problems.
+    """
+    def __init__(self, tickers: list, returns, return_period: int, covariance: np.ndarray | FactorCovariance | CovarianceEstimator | None = None, backend: str = 'slsqp', workers: int | None = None):
+        self.tickers = list(tickers)
+        self.returns = np.ascontiguousarray(returns, dtype=np.float64)
+        self.return_period = return_period
+        self.covariance = covariance
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+
+    @staticmethod
+    def scenarios(objective: str = 'max_sharpe', windows: list[tuple] = ((None, None),), risk_free_rates: list[float] = (0.0,), weight_constraints: list[tuple] = ((0,1),), **kwargs) -> list[Scenario]:
+        """
+        Returns the grid of every window x risk-free rate x weight constraint, windows as (start, end) column slices.
+        kwargs: other Scenario fields, shared by the whole grid
+        """
+        return [Scenario(objective, start, end, rate, constraint, **kwargs)
+                for start, end in windows for rate in risk_free_rates for constraint in weight_constraints]
+
+    def _tasks(self, scenarios: list[Scenario]) -> list[list[tuple[int, Scenario]]]:
+        """
+        Groups the scenarios by estimation window, splitting large groups so there are about 4 tasks per worker.
+        """
+        groups = {}
+        for index, scenario in enumerate(scenarios):
+            groups.setdefault((scenario.start, scenario.end), []).append((index, scenario))
+        size = max(1, math.ceil(len(scenarios) / (4*self.workers)))
+        return [group[i:i + size] for group in groups.values() for i in range(0, len(group), size)]
+
+    def run(self, scenarios: list[Scenario]) -> pd.DataFrame:
+        """
+        Solves every scenario and returns one row per scenario, in input order: the scenario fields, success, error (None when
+        the optimization ran), Sharpe Ratio, Return, Variance and Standard Deviation, then one weight column per ticker.
+        """
+        tasks = self._tasks(scenarios)
+        if self.workers == 1 or len(tasks) == 1:
+            _WORKER.update(tickers=self.tickers, returns=self.returns, return_period=self.return_period, covariance=self.covariance, backend=self.backend)
+            try:
+                rows = [row for task in tasks for row in _run(task)]
+            finally:
+                _WORKER.clear()
+        else:
+            blocks = []
+            try:
+                block, returns_spec = _share(self.returns)
+                blocks.append(block)
+                covariance, covariance_spec = self.covariance, None
+                if isinstance(self.covariance, np.ndarray):
+                    block, covariance_spec = _share(np.ascontiguousarray(self.covariance, dtype=np.float64))
+                    blocks.append(block)
+                    covariance = None
+                initargs = (self.tickers, returns_spec, self.return_period, covariance, covariance_spec, self.backend)
+                with ProcessPoolExecutor(min(self.workers, len(tasks)), initializer=_init_worker, initargs=initargs) as pool:
+                    rows = [row for result in pool.map(_run, tasks) for row in result]
+            finally:
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+        return self._table(scenarios, sorted(rows, key=lambda row: row[0]))
+
+    def _table(self, scenarios: list[Scenario], rows: list[tuple]) -> pd.DataFrame:
+        weights = np.full((len(scenarios), len(self.tickers)), np.nan)
+        for index, *_, w, _ in rows:
+            if w is not None:
+                weights[index] = w
+        table = pd.DataFrame({
+            'Label': [s.label for s in scenarios],
+            'Objective': [s.objective for s in scenarios],
+            'Start': [s.start for s in scenarios],
+            'End': [s.end for s in scenarios],
+            'Risk Free Rate': [s.risk_free_rate for s in scenarios],
+            'Weight Constraint': [s.weight_constraint for s in scenarios],
+            'Target Return': [s.target_return for s in scenarios],
+            'Target Variance': [s.target_variance for s in scenarios],
+            'Success': [row[1] for row in rows],
+            'Error': [row[7] for row in rows],
+            'Sharpe Ratio': [row[2] for row in rows],
+            'Return': [row[3] for row in rows],
+            'Variance': [row[4] for row in rows],
+            'Standard Deviation': [row[5] for row in rows],
+        })
+        return pd.concat([table, pd.DataFrame(weights, columns=self.tickers)], axis=1)
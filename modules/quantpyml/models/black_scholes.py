@@ -1,6 +1,36 @@
 
-from scipy.stats import norm
+from dataclasses import dataclass
+from scipy.special import ndtr
 import numpy as np
+from quantpyml.utils import profiling
+
+@dataclass
+class OptionChain:
+    """
+    Prices and Greeks of calls and puts, one entry per contract (arrays broadcast from the inputs).
+    theta is per year (divide by 365 for per day), vega and rho are per unit (1.0 = 100%) change of vol and rate.
+    """
+    call: np.ndarray
+    put: np.ndarray
+    call_delta: np.ndarray
+    put_delta: np.ndarray
+    gamma: np.ndarray
+    vega: np.ndarray
+    call_theta: np.ndarray
+    put_theta: np.ndarray
+    call_rho: np.ndarray
+    put_rho: np.ndarray
+
+@dataclass
+class ImpliedVolatility:
+    """
+    Result of BlackScholes.implied_volatility, one entry per quote.
+    vol is NaN where the quote violates the no-arbitrage bounds (arbitrage) or the solver did not converge.
+    """
+    vol: np.ndarray
+    converged: np.ndarray
+    arbitrage: np.ndarray
+    iterations: np.ndarray
 
 class BlackScholes:
     def __init__(self, price, strike, expiration, vol, rate=0.03, div=0):
@@ -14,7 +44,7 @@ class BlackScholes:
     
     @staticmethod
     def N(x):
-        return norm.cdf(x)
+        return ndtr(x)
     
     @property
     def params(self):
@@ -32,10 +62,14 @@ class BlackScholes:
         return self.d1() - self.sigma*np.sqrt(self.T)
     
     def _call_value(self):
-        return self.S*np.exp(-self.q*self.T)*self.N(self.d1()) - self.K*np.exp(-self.r*self.T) * self.N(self.d2())
+        d1 = self.d1()
+        d2 = d1 - self.sigma*np.sqrt(self.T)
+        return self.S*np.exp(-self.q*self.T)*self.N(d1) - self.K*np.exp(-self.r*self.T) * self.N(d2)
                     
     def _put_value(self):
-        return self.K*np.exp(-self.r*self.T) * self.N(-self.d2()) - self.S*np.exp(-self.q*self.T)*self.N(-self.d1())
+        d1 = self.d1()
+        d2 = d1 - self.sigma*np.sqrt(self.T)
+        return self.K*np.exp(-self.r*self.T) * self.N(-d2) - self.S*np.exp(-self.q*self.T)*self.N(-d1)
     
     def price(self, type_: "call (C), put (P), or both (B)" = 'C'):
         if type_ == 'C':
@@ -47,3 +81,150 @@ class BlackScholes:
         else:
             raise ValueError('Unrecognized type')
 
+    def greeks(self, dtype=np.float64) -> OptionChain:
+        """
+        Prices and Greeks of this contract (or of every contract, if the parameters are arrays).
+        """
+        return self.chain(self.S, self.K, self.T*365, self.sigma, self.r, self.q, dtype=dtype)
+
+    @classmethod
+    @profiling.timed('black_scholes.chain')
+    def chain(cls, price, strike, expiration, vol, rate=0.03, div=0, dtype=np.float64) -> OptionChain:
+        """
+        Prices a whole option chain in one vectorized pass, without building an object per contract.
+        All parameters broadcast against each other (e.g. a column of strikes against a row of expirations).
+        d1, d2, the normal cdf/pdf terms and the discount factors are computed once and shared by every output.
+
+        price, strike: spot and strike prices
+        expiration: days to expiration
+        vol, rate, div: annualized volatility, risk-free rate and dividend yield
+        dtype: np.float64, or np.float32 for half the memory traffic at ~1e-6 relative precision
+        """
+        S, K, vol, r, q = (np.asarray(x, dtype=dtype) for x in (price, strike, vol, rate, div))
+        T = np.asarray(expiration, dtype=dtype) / 365
+
+        sqrt_T = np.sqrt(T)
+        vol_sqrt_T = vol*sqrt_T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            moneyness = np.log(S/K) + (r - q + vol**2/2)*T
+            # at expiry (or zero vol) d1 is +-inf and the prices collapse to the discounted intrinsic value
+            d1 = np.where(vol_sqrt_T > 0, moneyness / vol_sqrt_T, np.where(moneyness >= 0, np.inf, -np.inf)).astype(dtype, copy=False)
+        d2 = d1 - vol_sqrt_T
+
+        N_d1, N_d2, N_neg_d1, N_neg_d2 = ndtr(d1), ndtr(d2), ndtr(-d1), ndtr(-d2)
+        pdf_d1 = np.exp(-d1**2/2) / np.sqrt(2*np.pi, dtype=dtype)
+        dividend_discount = np.exp(-q*T)
+        spot = S*dividend_discount
+        discounted_strike = K*np.exp(-r*T)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gamma = np.where(vol_sqrt_T > 0, dividend_discount*pdf_d1 / (S*vol_sqrt_T), 0).astype(dtype, copy=False)
+            time_decay = np.where(sqrt_T > 0, -spot*pdf_d1*vol / (2*sqrt_T), 0).astype(dtype, copy=False)
+
+        return OptionChain(
+            call=spot*N_d1 - discounted_strike*N_d2,
+            put=discounted_strike*N_neg_d2 - spot*N_neg_d1,
+            call_delta=dividend_discount*N_d1,
+            put_delta=-dividend_discount*N_neg_d1,
+            gamma=gamma,
+            vega=spot*pdf_d1*sqrt_T,
+            call_theta=time_decay - r*discounted_strike*N_d2 + q*spot*N_d1,
+            put_theta=time_decay + r*discounted_strike*N_neg_d2 - q*spot*N_neg_d1,
+            call_rho=discounted_strike*T*N_d2,
+            put_rho=-discounted_strike*T*N_neg_d2
+        )
+
+    @staticmethod
+    def _black(F, K, w):
+        """
+        Undiscounted Black call price, its derivative and second derivative with respect to total volatility w = vol*sqrt(T).
+        """
+        d1 = np.log(F/K)/w + w/2
+        d2 = d1 - w
+        vega = F*np.exp(-d1**2/2) / np.sqrt(2*np.pi)
+        return F*ndtr(d1) - K*ndtr(d2), vega, vega*d1*d2/w
+
+    @classmethod
+    @profiling.timed('black_scholes.implied_volatility')
+    def implied_volatility(cls, option_price, price, strike, expiration, rate=0.03, div=0, type_: "call (C), put (P), or an array of them" = 'C', tol=1e-10, max_iter=100) -> ImpliedVolatility:
+        """
+        Implied volatilities of a whole chain of quotes, solved together.
+        Puts are mapped to calls by put-call parity and everything is solved on undiscounted forward prices in total volatility
+        w = vol*sqrt(T). Each contract starts from the Corrado-Miller approximation and takes Halley steps (Newton when Halley's
+        correction is unstable) inside a bracket that tightens every iteration, falling back to bisection when a step leaves it.
+        Converged contracts drop out of the iteration. Quotes below intrinsic value or above the forward are flagged as arbitrage.
+
+        option_price: market prices of the options
+        price, strike, expiration, rate, div: as BlackScholes.chain
+        tol: relative tolerance on the time value of the undiscounted price (or on the volatility bracket)
+        """
+        option_price, S, K, T, r, q = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (option_price, price, strike, expiration, rate, div)))
+        T = T / 365
+        types = np.asarray(type_)
+        if not np.isin(types, ('C', 'P')).all():
+            raise ValueError('Unrecognized type')
+        is_call = np.broadcast_to(types == 'C', option_price.shape)
+        F = S*np.exp((r - q)*T)
+        # undiscounted call price, puts through parity C - P = F - K
+        target = option_price*np.exp(r*T) + np.where(is_call, 0.0, F - K)
+        intrinsic = np.maximum(F - K, 0.0)
+
+        # solved on flat arrays (0-d inputs would make the masks numpy scalars), reshaped at the end
+        shape = option_price.shape
+        vol = np.full(option_price.size, np.nan)
+        iterations = np.zeros(option_price.size, dtype=int)
+        arbitrage = np.ravel(~((target >= intrinsic - tol*K) & (target < F)) | ~(T > 0))
+        at_intrinsic = ~arbitrage & np.ravel(target <= intrinsic + tol*K)
+        vol[at_intrinsic] = 0.0
+        converged = at_intrinsic.copy()
+
+        active = np.flatnonzero(~arbitrage & ~at_intrinsic)
+        F, K, c = F.ravel()[active], K.ravel()[active], target.ravel()[active]
+        # tolerance relative to the time value, the part of the price that carries the volatility information
+        atol = tol*(c - intrinsic.ravel()[active])
+
+        # Corrado-Miller initial guess
+        half_moneyness = (F - K)/2
+        spread = c - half_moneyness
+        w = np.sqrt(2*np.pi)/(F + K) * (spread + np.sqrt(np.maximum(spread**2 - 4*half_moneyness**2/np.pi, 0.0)))
+        w = np.maximum(w, 1e-4)
+        # bracket [lo, hi] on w, hi doubled until it prices above the quote
+        lo = np.zeros_like(w)
+        hi = np.maximum(2*w, 1.0)
+        for _ in range(16):
+            low = cls._black(F, K, hi)[0] < c
+            if not low.any():
+                break
+            lo = np.where(low, hi, lo)
+            hi = np.where(low, 2*hi, hi)
+        w = np.clip(w, lo, hi)
+
+        idx = np.arange(len(active))
+        for iteration in range(1, max_iter + 1):
+            if not len(idx):
+                break
+            value, vega, volga = cls._black(F, K, w)
+            f = value - c
+            done = (np.abs(f) <= atol) | (hi - lo <= tol*w)
+            if done.any():
+                finished = active[idx[done]]
+                vol[finished] = w[done] / np.sqrt(T.ravel()[finished])
+                converged[finished] = True
+                iterations[finished] = iteration
+                keep = ~done
+                idx, F, K, c, atol, w, lo, hi, f, vega, volga = (x[keep] for x in (idx, F, K, c, atol, w, lo, hi, f, vega, volga))
+                if not len(idx):
+                    break
+            lo = np.where(f < 0, w, lo)
+            hi = np.where(f > 0, w, hi)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = f/vega
+                halley_denominator = 1 - newton*volga/(2*vega)
+                step = np.where(halley_denominator > 0.5, newton/halley_denominator, newton)
+                candidate = w - step
+            # keep the step only if it stays strictly inside the bracket, otherwise bisect
+            inside = np.isfinite(candidate) & (candidate > lo) & (candidate < hi)
+            w = np.where(inside, candidate, (lo + hi)/2)
+        iterations[active[idx]] = max_iter
+
+        return ImpliedVolatility(vol=vol.reshape(shape), converged=converged.reshape(shape), arbitrage=arbitrage.reshape(shape), iterations=iterations.reshape(shape))
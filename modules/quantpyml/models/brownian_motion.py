@@ -1,6 +1,40 @@
 # implementation of arithmetic brownian motion
+from dataclasses import dataclass
+from typing import Iterator, TYPE_CHECKING
+import numpy as np
 import torch
 from torch.nn.functional import relu
+from quantpyml.utils import profiling
+
+if TYPE_CHECKING:
+    # qp pulls in scipy.sparse and scipy.linalg, CorrelatedBrownianMotion imports it when constructed
+    from quantpyml.models.qp import FactorCovariance
+
+BLOCK_PATHS = 1024 # paths per random stream, chunk sizes are rounded up to a multiple of this
+
+@dataclass
+class PathStatistics:
+    """
+    Per-path and cross-path statistics of a simulation, see BrownianMotion.path_statistics.
+    """
+    terminal: torch.Tensor
+    running_max: torch.Tensor
+    running_min: torch.Tensor
+    mean_path: torch.Tensor
+    quantiles: dict[float, float]
+
+@dataclass
+class PortfolioRisk:
+    """
+    Simulated portfolio PnL at the horizon, see CorrelatedBrownianMotion.portfolio.
+    var, cvar: confidence level -> value at risk and conditional value at risk (expected shortfall), as positive losses
+    max_drawdown: per path, the lowest portfolio value relative to its running peak minus one (as Returns.drawdowns), only with path=True
+    """
+    pnl: torch.Tensor
+    expected: float
+    var: dict[float, float]
+    cvar: dict[float, float]
+    max_drawdown: torch.Tensor | None = None
 
 class BrownianMotion:
     @staticmethod
@@ -12,6 +46,8 @@ class BrownianMotion:
         T: number of time steps
         N: number of simulations
         """
+        # torch allocations are invisible to tracemalloc, record the size of the path tensors instead
+        profiling.peak('brownian_motion.tensor_bytes', N*T*torch.get_default_dtype().itemsize)
         return torch.normal(torch.tensor(0), torch.sqrt(torch.tensor(dt)), size=(N, T))
 
     @staticmethod
@@ -31,6 +67,7 @@ class BrownianMotion:
         return drift*t + volatility*W
     
     @classmethod
+    @profiling.timed('brownian_motion.brownian_motion')
     def brownian_motion(cls, init_price: float=0, N=1, dt=1.0, T=365) -> list[torch.Tensor]:
         """
         A purely stochastic processs, equivalent to the Weiner process. Does not depend on the underlying return or volatility. The solution of the SDE modeling such an asset's returns is St = S0 + Wt.
@@ -48,6 +85,7 @@ class BrownianMotion:
         return timespan, price
 
     @classmethod
+    @profiling.timed('brownian_motion.arithmetic_brownian_motion')
     def arithmetic_brownian_motion(cls, init_price: float, mean_return: float, stdev_return: float, N=1, dt=1.0, T=365) -> list[torch.Tensor]:
         """
         A stochastic process that describes the evolution of an asset's price over time given drift and volatility. The price of the asset is expected to be normally distributed with a mean return and standard deviation of returns. The SDE that describes the modeled asset's returns is dS = mu*dt + sigma*dW, where dW is the Weiner process. The solution of this SDE is St = S0 + mu*t + sigma*Wt. https://en.wikipedia.org/wiki/Geometric_Brownian_motion
@@ -64,6 +102,7 @@ class BrownianMotion:
         return timespan, price
     
     @classmethod
+    @profiling.timed('brownian_motion.geometric_brownian_motion')
     def geometric_brownian_motion(cls, init_price: float, mean_return: float, stdev_return: float, N=1, dt=1.0, T=365) -> list[torch.Tensor]:
         """
         A stochastic process that describes the evolution of an asset's price over time given drift and voltility. The price of the asset is expected to be log-normally distributed with a mean return and standard deviation of returns. The SDE that describes the modeled asset's returns is dS = mu*S*dt + sigma*S*dW, where dW is the Weiner process. This SDE has the following solution for St (Price) by Itô's lemma: St = S0*exp((mu - sigma^2/2)*t + sigma*Wt). https://en.wikipedia.org/wiki/Geometric_Brownian_motion#Solving_the_SDE
@@ -79,3 +118,250 @@ class BrownianMotion:
         ito_process = BrownianMotion.ito_proces(dt, T, mean_return - stdev_return**2/2, stdev_return, N)
         price = relu(init_price*torch.exp(ito_process), inplace=True)
         return timespan, price
+
+    @staticmethod
+    def _block_generator(seed: int, block: int) -> torch.Generator:
+        """
+        Independent random stream for one block of BLOCK_PATHS paths, derived from the simulation seed and the block index.
+        """
+        state = np.random.SeedSequence(entropy=seed, spawn_key=(block,)).generate_state(1, dtype=np.uint64)[0]
+        return torch.Generator().manual_seed(int(state) & (2**63 - 1))
+
+    @classmethod
+    def normal_chunks(cls, N: int, T: int, chunk_size: int = 65536, seed: int | None = None) -> Iterator[torch.Tensor]:
+        """
+        Standard normals for N paths of T steps, yielded as (chunk_size, T) tensors (the last one may be shorter).
+        Normals are drawn from one random stream per block of BLOCK_PATHS paths, so a fixed seed gives the same numbers whatever the chunk size.
+
+        N: number of simulations
+        T: number of time steps
+        chunk_size: paths per yielded chunk (rounded up to a multiple of BLOCK_PATHS)
+        seed: random seed, None for a fresh one
+        """
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        blocks_per_chunk = max(1, -(-chunk_size // BLOCK_PATHS))
+        n_blocks = -(-N // BLOCK_PATHS)
+        for first_block in range(0, n_blocks, blocks_per_chunk):
+            blocks = range(first_block, min(first_block + blocks_per_chunk, n_blocks))
+            normals = torch.empty((len(blocks) * BLOCK_PATHS, T))
+            for i, block in enumerate(blocks):
+                torch.randn((BLOCK_PATHS, T), generator=cls._block_generator(seed, block), out=normals[i * BLOCK_PATHS:(i + 1) * BLOCK_PATHS])
+            profiling.peak('brownian_motion.chunk_bytes', normals.nbytes)
+            yield normals[:N - first_block * BLOCK_PATHS]
+
+    @staticmethod
+    def ito_process_from_normals(normals: torch.Tensor, dt: float, drift: float, volatility: float) -> torch.Tensor:
+        """
+        The Itô process of ito_proces driven by the given (N, T) standard normal increments instead of fresh ones. Overwrites normals.
+
+        normals: standard normal increments, one row per simulation
+        dt: time step size
+        drift: Drift coefficient (mean return)
+        volatility: Volatility coefficient (stdev of returns)
+        """
+        t = torch.cumsum(torch.ones(normals.shape[1]), dim=0)
+        # W = cumsum(sqrt(dt)*Z), X = drift*t + volatility*W
+        return normals.mul_(volatility * dt**0.5).cumsum_(dim=1).add_(drift * t)
+
+    @classmethod
+    def geometric_brownian_motion_from_normals(cls, init_price: float, mean_return: float, stdev_return: float, normals: torch.Tensor, dt=1.0) -> torch.Tensor:
+        """
+        Price paths of geometric_brownian_motion driven by the given (N, T) standard normal increments (e.g. antithetic or quasi-random ones). Overwrites normals.
+        """
+        ito_process = cls.ito_process_from_normals(normals, dt, mean_return - stdev_return**2/2, stdev_return)
+        return relu(ito_process.exp_().mul_(init_price), inplace=True)
+
+    @classmethod
+    def ito_process_chunks(cls, dt: float, T: int, drift: float, volatility: float, N: int, chunk_size: int = 65536, seed: int | None = None) -> Iterator[torch.Tensor]:
+        """
+        Same process as ito_proces, generated chunk_size paths at a time so peak memory stays at one (chunk_size, T) tensor.
+        Reproducible under a fixed seed regardless of chunk size (see normal_chunks).
+
+        dt: time step size
+        T: number of time steps
+        drift: Drift coefficient (mean return)
+        volatility: Volatility coefficient (stdev of returns)
+        N: number of simulations
+        chunk_size: paths per yielded chunk (rounded up to a multiple of BLOCK_PATHS)
+        seed: random seed, None for a fresh one
+        """
+        for normals in cls.normal_chunks(N, T, chunk_size, seed):
+            yield cls.ito_process_from_normals(normals, dt, drift, volatility)
+
+    @classmethod
+    def arithmetic_brownian_motion_chunks(cls, init_price: float, mean_return: float, stdev_return: float, N=1, dt=1.0, T=365, chunk_size: int = 65536, seed: int | None = None) -> Iterator[torch.Tensor]:
+        """
+        Price paths of arithmetic_brownian_motion, yielded chunk_size paths at a time (see ito_process_chunks).
+        """
+        for ito_process in cls.ito_process_chunks(dt, T, mean_return, stdev_return, N, chunk_size, seed):
+            yield relu(ito_process.add_(init_price), inplace=True)
+
+    @classmethod
+    def geometric_brownian_motion_chunks(cls, init_price: float, mean_return: float, stdev_return: float, N=1, dt=1.0, T=365, chunk_size: int = 65536, seed: int | None = None) -> Iterator[torch.Tensor]:
+        """
+        Price paths of geometric_brownian_motion, yielded chunk_size paths at a time (see ito_process_chunks).
+        """
+        for normals in cls.normal_chunks(N, T, chunk_size, seed):
+            yield cls.geometric_brownian_motion_from_normals(init_price, mean_return, stdev_return, normals, dt)
+
+    @classmethod
+    @profiling.timed('brownian_motion.path_statistics')
+    def path_statistics(cls, init_price: float, mean_return: float, stdev_return: float, N=1, dt=1.0, T=365, geometric: bool = True, quantiles: tuple = (0.01, 0.05, 0.5, 0.95, 0.99), chunk_size: int = 65536, seed: int | None = None) -> PathStatistics:
+        """
+        Simulates N paths chunk by chunk and keeps only their statistics: the terminal price, running max and min of every path,
+        the mean path, and quantiles of the terminal distribution. Memory is O(N + T + chunk_size*T) instead of O(N*T).
+
+        geometric: simulate geometric_brownian_motion paths, arithmetic_brownian_motion otherwise
+        quantiles: levels of the terminal distribution to report
+        """
+        chunks = cls.geometric_brownian_motion_chunks if geometric else cls.arithmetic_brownian_motion_chunks
+        terminal, running_max, running_min = torch.empty(N), torch.empty(N), torch.empty(N)
+        path_sum = torch.zeros(T, dtype=torch.float64)
+        start = 0
+        for paths in chunks(init_price, mean_return, stdev_return, N, dt, T, chunk_size, seed):
+            stop = start + len(paths)
+            terminal[start:stop] = paths[:, -1]
+            running_max[start:stop] = paths.amax(dim=1)
+            running_min[start:stop] = paths.amin(dim=1)
+            path_sum += paths.sum(dim=0, dtype=torch.float64)
+            start = stop
+        levels = np.quantile(terminal.numpy(), quantiles)
+        return PathStatistics(
+            terminal=terminal,
+            running_max=running_max,
+            running_min=running_min,
+            mean_path=(path_sum / N).to(terminal.dtype),
+            quantiles=dict(zip(quantiles, levels.tolist()))
+        )
+
+
+class CorrelatedBrownianMotion:
+    """
+    Joint geometric Brownian motion of several assets with correlated shocks, dS_i = mu_i*S_i*dt + S_i*dW_i with
+    Cov(dW) = covariance*dt. mean_returns and covariance are per unit of time (e.g. daily, as EfficientFrontier's COV).
+    The covariance is decomposed once into loadings L (covariance = L L' plus, for factor models, a diagonal) and every
+    shock is L z with z standard normal, so a step costs O(paths*assets*factors) rather than one loop per asset.
+
+    init_prices: (assets,) starting prices, 1 to work in growth of one unit
+    method: 'cholesky', 'eigen' (any positive semi-definite covariance) or 'factor' (top factors eigenvectors plus the
+            remaining diagonal as independent shocks). A FactorCovariance is always simulated through its own factors.
+    factors: number of factors kept by 'factor'
+    """
+    def __init__(self, init_prices, mean_returns, covariance: 'np.ndarray | FactorCovariance', method: str = 'cholesky', factors: int = 10, dt: float = 1.0):
+        dtype = torch.get_default_dtype()
+        self.mean_returns = np.asarray(mean_returns, dtype=np.float64)
+        n = len(self.mean_returns)
+        self.init_prices = torch.as_tensor(np.broadcast_to(np.asarray(init_prices, dtype=np.float64), (n,)).copy(), dtype=dtype)
+        self.dt = dt
+        self.specific = None
+        from quantpyml.models.qp import FactorCovariance
+        if isinstance(covariance, FactorCovariance):
+            variances = covariance.diagonal()
+            loadings = covariance.loadings @ np.linalg.cholesky(covariance.factor_cov)
+            self.specific = np.sqrt(covariance.specific)
+        else:
+            covariance = np.asarray(covariance, dtype=np.float64)
+            variances = np.diag(covariance)
+            if method == 'cholesky':
+                try:
+                    loadings = np.linalg.cholesky(covariance)
+                except np.linalg.LinAlgError:
+                    method = 'eigen'
+            if method in ('eigen', 'factor'):
+                eigenvalues, vectors = np.linalg.eigh(covariance)
+                eigenvalues = np.maximum(eigenvalues, 0.0)
+                if method == 'factor':
+                    eigenvalues, vectors = eigenvalues[-factors:], vectors[:, -factors:]
+                    # the variance the factors miss becomes independent specific noise
+                    self.specific = np.sqrt(np.maximum(variances - (vectors**2) @ eigenvalues, 0.0))
+                loadings = vectors * np.sqrt(eigenvalues)
+            elif method != 'cholesky':
+                raise ValueError(f'Unknown method {method!r}, expected cholesky, eigen or factor')
+        self.loadings = torch.as_tensor(loadings, dtype=dtype)
+        self.specific = None if self.specific is None else torch.as_tensor(self.specific, dtype=dtype)
+        # drift of the log prices, with the Ito correction
+        self.log_drift = torch.as_tensor(self.mean_returns - variances/2, dtype=dtype)
+
+    @property
+    def shocks_per_step(self) -> int:
+        return self.loadings.shape[1] + (0 if self.specific is None else len(self.specific))
+
+    def _log_returns(self, normals: torch.Tensor, dt: float) -> torch.Tensor:
+        """
+        Log returns over a step of length dt from (..., shocks_per_step) standard normals.
+        """
+        k = self.loadings.shape[1]
+        shocks = normals[..., :k] @ self.loadings.T
+        if self.specific is not None:
+            shocks += normals[..., k:] * self.specific
+        return shocks.mul_(dt**0.5).add_(self.log_drift*dt)
+
+    def terminal_prices(self, N: int, T: int, chunk_size: int = 65536, seed: int | None = None) -> Iterator[torch.Tensor]:
+        """
+        (chunk, assets) prices after T steps, yielded chunk_size paths at a time. The horizon is simulated in one exact step
+        (the sum of T independent normal increments is normal), so nothing of size T is ever allocated.
+        """
+        for normals in BrownianMotion.normal_chunks(N, self.shocks_per_step, chunk_size, seed):
+            yield self._log_returns(normals, self.dt*T).exp_().mul_(self.init_prices)
+
+    def _step_normals(self, paths: int, seed: int, chunk: int) -> Iterator[torch.Tensor]:
+        generator = BrownianMotion._block_generator(seed, chunk)
+        while True:
+            yield torch.randn((paths, self.shocks_per_step), generator=generator)
+
+    def paths(self, N: int, T: int, chunk_size: int = 1024, seed: int | None = None) -> Iterator[torch.Tensor]:
+        """
+        Full (chunk, T, assets) price paths, yielded chunk_size paths at a time. Only use this when the paths themselves are
+        needed, portfolio and terminal_prices never build the cube. Reproducible for a fixed seed and chunk_size.
+        """
+        seed = np.random.SeedSequence().entropy if seed is None else seed
+        for chunk, start in enumerate(range(0, N, chunk_size)):
+            m = min(chunk_size, N - start)
+            normals = self._step_normals(m, seed, chunk)
+            log_returns = torch.stack([self._log_returns(next(normals), self.dt) for _ in range(T)], dim=1)
+            yield log_returns.cumsum_(dim=1).exp_().mul_(self.init_prices)
+
+    @profiling.timed('correlated_brownian_motion.portfolio')
+    def portfolio(self, weights, N: int = 100_000, T: int = 1, capital: float = 1.0, levels: tuple = (0.95, 0.99), path: bool = False, chunk_size: int = 65536, seed: int | None = None) -> PortfolioRisk:
+        """
+        PnL distribution, VaR and CVaR of a buy and hold portfolio over T steps.
+
+        weights: (assets,) fractions of capital invested in each asset at the start (e.g. EfficientFrontier weights)
+        levels: confidence levels of VaR and CVaR
+        path: step through time to also get each path's maximum drawdown, memory O(chunk_size*assets) whatever T
+        """
+        weights = torch.as_tensor(np.asarray(weights, dtype=np.float64), dtype=self.init_prices.dtype)
+        pnl = torch.empty(N, dtype=torch.float64)
+        drawdown = torch.empty(N) if path else None
+        start = 0
+        if not path:
+            for prices in self.terminal_prices(N, T, chunk_size, seed):
+                # growth of every asset times the capital put in it, minus the capital
+                pnl[start:start + len(prices)] = capital*((prices/self.init_prices) @ weights - weights.sum()).double()
+                start += len(prices)
+        else:
+            seed = np.random.SeedSequence().entropy if seed is None else seed
+            for chunk, start in enumerate(range(0, N, chunk_size)):
+                m = min(chunk_size, N - start)
+                normals = self._step_normals(m, seed, chunk)
+                log_prices = torch.zeros((m, len(weights)))
+                value = torch.full((m,), float(weights.sum()))
+                peak, worst = value.clone(), torch.zeros(m)
+                for _ in range(T):
+                    log_prices += self._log_returns(next(normals), self.dt)
+                    value = torch.exp(log_prices) @ weights
+                    torch.maximum(peak, value, out=peak)
+                    torch.minimum(worst, value/peak - 1, out=worst)
+                pnl[start:start + m] = capital*(value - weights.sum()).double()
+                drawdown[start:start + m] = worst
+        losses = -pnl.numpy()
+        var = np.quantile(losses, levels)
+        cvar = [losses[losses >= v].mean() for v in var]
+        return PortfolioRisk(
+            pnl=pnl,
+            expected=float(pnl.mean()),
+            var=dict(zip(levels, var.tolist())),
+            cvar=dict(zip(levels, [float(c) for c in cvar])),
+            max_drawdown=drawdown
+        )
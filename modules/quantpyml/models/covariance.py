@@ -0,0 +1,300 @@
+import copy
+import hashlib
+from collections import OrderedDict, deque
+import numpy as np
+import scipy.linalg as sla
+from quantpyml.models.qp import FactorCovariance
+
+# Covariance estimators for EfficientFrontier. Returns are (assets, observations), oldest first, as EfficientFrontier takes them.
+# fit(returns) estimates from the last `window` observations; update(row) slides the window forward by one new observation
+# (one return per asset) in O(n^2), instead of the O(n^2 T) re-estimate a rolling backtest would otherwise pay every day.
+# Fitted states are cached per input window, keyed by a digest of the window's data, so refitting the same data is free.
+
+RESUM_EVERY = 1024 # rolling moments are recomputed exactly this often to keep floating point drift bounded
+
+class _WindowMoments:
+    """
+    Count, mean and co-moment matrix sum (x - mean)(x - mean)' of the observations in a sliding window, updated with Welford's method.
+    fourth: also track the raw sums of a = |x|^2 (sum a^2, sum a x, sum a) that Ledoit-Wolf needs.
+    Arrays are replaced rather than modified in place, so copies of the state can share them.
+    """
+    def __init__(self, window: int | None = None, fourth: bool = False):
+        self.window = window
+        self.fourth = fourth
+        self.rows = deque()
+        self.updates = 0
+
+    def fit(self, X: np.ndarray):
+        """
+        X: (observations, assets)
+        """
+        self.rows = deque(X) if self.window is not None else deque()
+        self.count = len(X)
+        self.mean = X.mean(axis=0)
+        centered = X - self.mean
+        self.m2 = centered.T @ centered
+        if self.fourth:
+            a = np.einsum('ij,ij->i', X, X)
+            self.a2, self.ax, self.a = float(a @ a), a @ X, float(a.sum())
+
+    def push(self, x: np.ndarray):
+        if self.window is not None:
+            if self.count == self.window:
+                self._remove(self.rows.popleft())
+            self.rows.append(x)
+        self._add(x)
+        self.updates += 1
+        if self.window is not None and self.updates % RESUM_EVERY == 0:
+            self.fit(np.array(self.rows))
+
+    def copy(self):
+        other = copy.copy(self)
+        other.rows = deque(self.rows)
+        return other
+
+    def _add(self, x: np.ndarray):
+        self.count += 1
+        delta = x - self.mean
+        self.mean = self.mean + delta / self.count
+        self.m2 = self.m2 + np.outer(delta, x - self.mean)
+        if self.fourth:
+            a = float(x @ x)
+            self.a2, self.ax, self.a = self.a2 + a*a, self.ax + a*x, self.a + a
+
+    def _remove(self, x: np.ndarray):
+        self.count -= 1
+        mean = self.mean - (x - self.mean) / self.count
+        self.m2 = self.m2 - np.outer(x - mean, x - self.mean)
+        self.mean = mean
+        if self.fourth:
+            a = float(x @ x)
+            self.a2, self.ax, self.a = self.a2 - a*a, self.ax - a*x, self.a - a
+
+
+class CovarianceEstimator:
+    """
+    Base class. Pass an estimator as EfficientFrontier(..., covariance=estimator), or use covariance directly after update.
+
+    window: number of most recent observations used (None for all of them)
+    cache_size: fitted windows kept, least recently used dropped first
+    """
+    def __init__(self, window: int | None = None, cache_size: int = 8):
+        self.window = window
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._covariance = None
+        self._fitted = False
+
+    @property
+    def params(self) -> tuple:
+        """
+        Parameters that change the estimate, part of the cache key.
+        """
+        return (self.window,)
+
+    @property
+    def covariance(self) -> np.ndarray | FactorCovariance:
+        """
+        The current estimate, computed on first access after a fit or update.
+        """
+        if self._covariance is None:
+            if not self._fitted:
+                raise ValueError('Estimator has not been fit')
+            self._covariance = self._estimate()
+        return self._covariance
+
+    def _observations(self, returns) -> np.ndarray:
+        """
+        Returns the (observations, assets) window of (assets, observations) returns.
+        """
+        returns = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+        if self.window is not None:
+            returns = returns[:, -self.window:]
+        return returns.T
+
+    def _key(self, X: np.ndarray) -> tuple:
+        digest = hashlib.blake2b(np.ascontiguousarray(X).view(np.uint8), digest_size=16).hexdigest()
+        return (type(self).__name__, self.params, X.shape, digest)
+
+    def _snapshot(self, state: dict) -> dict:
+        # arrays are only ever replaced, so sharing them is safe, the mutable containers are copied
+        return {k: v.copy() if isinstance(v, (deque, _WindowMoments)) else v for k, v in state.items() if k != '_cache'}
+
+    def fit(self, returns):
+        """
+        Estimates the covariance of (assets, observations) returns over the window. Returns self.
+        """
+        X = self._observations(returns)
+        key = self._key(X)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.__dict__.update(self._snapshot(self._cache[key]))
+            return self
+        self._fit(X)
+        self._fitted = True
+        self._covariance = self._estimate()
+        self._cache[key] = self._snapshot(self.__dict__)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return self
+
+    def update(self, row):
+        """
+        Adds one observation (one return per asset), dropping the oldest one once the window is full. Returns self.
+        """
+        if not self._fitted:
+            raise ValueError('Estimator has not been fit')
+        self._update(np.asarray(row, dtype=np.float64).ravel())
+        self._covariance = None
+        return self
+
+    def _fit(self, X: np.ndarray):
+        raise NotImplementedError
+
+    def _update(self, x: np.ndarray):
+        raise NotImplementedError
+
+    def _estimate(self):
+        raise NotImplementedError
+
+
+class SampleCovariance(CovarianceEstimator):
+    """
+    Sample covariance with the (T - 1) denominator, the same as np.cov.
+    """
+    def _fit(self, X: np.ndarray):
+        self.moments = _WindowMoments(self.window)
+        self.moments.fit(X)
+
+    def _update(self, x: np.ndarray):
+        self.moments.push(x)
+
+    def _estimate(self) -> np.ndarray:
+        return self.moments.m2 / (self.moments.count - 1)
+
+
+class LedoitWolfCovariance(SampleCovariance):
+    """
+    Ledoit-Wolf shrinkage of the (maximum likelihood) sample covariance towards a scaled identity, with the optimal intensity
+    of Ledoit & Wolf (2004), "A well-conditioned estimator for large-dimensional covariance matrices".
+    Stays invertible (and well conditioned) when there are fewer observations than assets. shrinkage holds the last intensity.
+    """
+    def _fit(self, X: np.ndarray):
+        self.moments = _WindowMoments(self.window, fourth=True)
+        self.moments.fit(X)
+
+    def _estimate(self) -> np.ndarray:
+        m = self.moments
+        T, n = m.count, len(m.mean)
+        S = m.m2 / T
+        trace = np.trace(S)
+        mu = trace / n
+        # sum over observations of |x - mean|^4, expanded in the raw moments the window tracks
+        c = float(m.mean @ m.mean)
+        fourth = m.a2 + 4*float(m.mean @ m.m2 @ m.mean) + T*c*c - 4*float(m.ax @ m.mean) + 2*c*m.a
+        squared_norm = float(np.sum(S*S))
+        beta = max((fourth/T - squared_norm) / (n*T), 0.0)
+        delta = (squared_norm - 2*mu*trace + n*mu**2) / n
+        self.shrinkage = 0.0 if beta == 0 else min(beta, delta) / delta
+        shrunk = (1 - self.shrinkage)*S
+        shrunk[np.diag_indices(n)] += self.shrinkage*mu
+        return shrunk
+
+
+class EWMACovariance(CovarianceEstimator):
+    """
+    Exponentially weighted covariance (RiskMetrics), observation t of T weighted decay^(T-1-t) and the weights normalized to sum to one.
+
+    decay: 0.94 is the RiskMetrics daily value
+    demean: subtract the weighted mean (RiskMetrics assumes zero mean returns)
+    window: optional truncation of the weights to the most recent observations
+    """
+    def __init__(self, decay: float = 0.94, demean: bool = True, window: int | None = None, cache_size: int = 8):
+        super().__init__(window, cache_size)
+        self.decay = decay
+        self.demean = demean
+
+    @property
+    def params(self) -> tuple:
+        return (self.window, self.decay, self.demean)
+
+    def _fit(self, X: np.ndarray):
+        weights = self.decay ** np.arange(len(X) - 1, -1, -1, dtype=np.float64)
+        self.rows = deque(X) if self.window is not None else deque()
+        self.count = len(X)
+        self.updates = 0
+        # weighted sums: total weight, sum w x and sum w x x'
+        self.weight = float(weights.sum())
+        self.first = weights @ X
+        self.second = (X.T * weights) @ X
+
+    def _update(self, x: np.ndarray):
+        self.weight = self.decay*self.weight + 1.0
+        self.first = self.decay*self.first + x
+        self.second = self.decay*self.second + np.outer(x, x)
+        self.count += 1
+        if self.window is None:
+            return
+        self.rows.append(x)
+        if self.count > self.window:
+            # the oldest observation reached weight decay^window, take it out
+            dropped = self.rows.popleft()
+            fade = self.decay**self.window
+            self.count -= 1
+            self.weight -= fade
+            self.first = self.first - fade*dropped
+            self.second = self.second - fade*np.outer(dropped, dropped)
+        self.updates += 1
+        if self.updates % RESUM_EVERY == 0:
+            self._fit(np.array(self.rows))
+
+    def _estimate(self) -> np.ndarray:
+        covariance = self.second / self.weight
+        if self.demean:
+            mean = self.first / self.weight
+            covariance = covariance - np.outer(mean, mean)
+        return covariance
+
+
+class PCAFactorCovariance(SampleCovariance):
+    """
+    Statistical factor model: the top factors principal components of the sample covariance as loadings, their eigenvalues
+    as the factor variances and the remaining diagonal as specific variances. Returns a FactorCovariance.
+    update refreshes the principal subspace with a few warm-started subspace iterations, O(n^2 factors), instead of a full eigendecomposition.
+
+    factors: number of principal components kept
+    min_specific: floor on the specific variances, relative to the average variance
+    """
+    def __init__(self, factors: int = 5, window: int | None = None, cache_size: int = 8, min_specific: float = 1e-4, subspace_iterations: int = 2):
+        super().__init__(window, cache_size)
+        self.factors = factors
+        self.min_specific = min_specific
+        self.subspace_iterations = subspace_iterations
+        self.components = None
+
+    @property
+    def params(self) -> tuple:
+        return (self.window, self.factors, self.min_specific)
+
+    def _fit(self, X: np.ndarray):
+        super()._fit(X)
+        self.components = None
+
+    def _estimate(self) -> FactorCovariance:
+        S = super()._estimate()
+        n = len(S)
+        k = min(self.factors, n)
+        if self.components is None:
+            eigenvalues, vectors = sla.eigh(S, subset_by_index=[n - k, n - 1])
+        else:
+            # subspace iteration from the previous components, then Rayleigh-Ritz on the k-dimensional subspace
+            vectors = self.components
+            for _ in range(self.subspace_iterations):
+                vectors, _ = np.linalg.qr(S @ vectors)
+            eigenvalues, rotation = np.linalg.eigh(vectors.T @ S @ vectors)
+            vectors = vectors @ rotation
+        self.components = vectors
+        eigenvalues = np.maximum(eigenvalues, 0.0)
+        diagonal = np.diag(S)
+        specific = np.maximum(diagonal - (vectors**2) @ eigenvalues, self.min_specific*diagonal.mean())
+        return FactorCovariance(loadings=vectors, factor_cov=np.diag(eigenvalues), specific=specific)
@@ -1,8 +1,27 @@
 
+from dataclasses import dataclass
 import numpy as np
-import matplotlib.pyplot as plt
 import scipy.optimize as spo
-import pandas as pd
+from quantpyml.models.qp import FactorCovariance, PortfolioConstraints, PortfolioQP
+from quantpyml.models.covariance import CovarianceEstimator
+from quantpyml.utils.returns import Returns
+from quantpyml.utils import profiling
+
+@dataclass
+class Frontier:
+    """
+    Efficient frontier traced by EfficientFrontier.frontier, one entry per target return.
+    min_variance and max_sharpe hold the (status, weights, Sharpe ratio, mean, variance, stdev) tuples of the two reference portfolios.
+    """
+    target_returns: np.ndarray
+    returns: np.ndarray
+    stds: np.ndarray
+    variances: np.ndarray
+    sharpes: np.ndarray
+    weights: np.ndarray
+    success: np.ndarray
+    min_variance: tuple
+    max_sharpe: tuple
 
 ### Markowitz portfolio optimization
 class EfficientFrontier:
@@ -11,89 +30,255 @@ class EfficientFrontier:
     Reference: https://ocw.mit.edu/courses/18-s096-topics-in-mathematics-with-applications-in-finance-fall-2013/resources/mit18_s096f13_lecnote14/
     Returns: Must have at least 2 assets each with at least 2 returns listed.
     Return period: >= 2, 12 for monthly, 52 for weekly, 252 for yearly.
+    Covariance: the sample covariance of the returns by default, or a given (n, n) matrix or FactorCovariance (low-rank plus diagonal, never formed as n x n),
+    or a CovarianceEstimator (Ledoit-Wolf, EWMA, PCA factors, ...) fit to the returns. It is estimated on first use, not in the constructor.
+    The returns are not copied, do not modify them while the optimizer is in use.
+    Backend: 'slsqp' (scipy.optimize.minimize), or 'qp' for the convex QP solver of quantpyml.models.qp, which scales to thousands of assets.
+    Constraints (PortfolioConstraints: sectors, turnover, cardinality) always go through the QP backend.
     """
-    def __init__(self, tickers: list, returns: list, return_period: int):
+    def __init__(self, tickers: list, returns: list, return_period: int, covariance: np.ndarray | FactorCovariance | CovarianceEstimator | None = None, backend: str = 'slsqp'):
+        if backend not in ('slsqp', 'qp'):
+            raise ValueError(f'Unknown backend {backend!r}, expected slsqp or qp')
         self.TICKERS = tickers
         self.UNIFORM_WEIGHTS = np.ones(len(returns)) / len(returns)
-        self.RETURNS = np.asarray(returns).copy()
+        self.RETURNS = np.asarray(returns)
         self.FREQUENCY = return_period
-        self.COV = np.cov(self.RETURNS)
+        self._covariance = covariance
+        self._cov = None
+        self.BACKEND = backend
+        # expected return per unit weight, _mean(w) == w @ MU
+        self.MU = self.RETURNS.sum(axis=1)*self.FREQUENCY
+        self._solutions = {}
+        self._qp = None
+
+    @classmethod
+    def from_prices(cls, tickers: list, prices, return_period: int, period: int = 1, log: bool = False, **kwargs) -> 'EfficientFrontier':
+        """
+        Builds the optimizer from prices instead of returns, computed with Returns.calculate_returns (without overlap for period > 1).
+        prices: a list of StockCharts or Lines of equal length, or an (assets, time) array
+        kwargs: covariance and backend, as the constructor
+        """
+        returns = Returns.calculate_returns(prices, period, log=log, overlapping=period == 1).values
+        return cls(tickers, np.atleast_2d(returns), return_period, **kwargs)
+
+    @property
+    def COV(self) -> np.ndarray | FactorCovariance:
+        """
+        Covariance of the returns, estimated on first access.
+        """
+        if self._cov is None:
+            if self._covariance is None:
+                self._cov = np.cov(self.RETURNS)
+            elif isinstance(self._covariance, CovarianceEstimator):
+                self._cov = self._covariance.fit(self.RETURNS).covariance
+            else:
+                self._cov = self._covariance
+        return self._cov
     
     def _neg_sharpe_ratio(self, weights: list, risk_free_rate: float = 0.0):
         """
         Returns the Sharpe ratio of the portfolio.
         """
-        expected_return = np.sum(np.dot(weights, self.RETURNS))*self.FREQUENCY
-        standard_deviation = np.sqrt(np.dot(weights, np.dot(self.COV, weights)))*np.sqrt(self.FREQUENCY)
+        expected_return = np.dot(weights, self.MU)
+        standard_deviation = np.sqrt(np.dot(weights, self.COV @ weights))*np.sqrt(self.FREQUENCY)
         return - ((expected_return - risk_free_rate) / standard_deviation)
+
+    def _neg_sharpe_ratio_grad(self, weights: list, risk_free_rate: float = 0.0):
+        """
+        Returns the gradient of _neg_sharpe_ratio with respect to the weights.
+        """
+        cov_weights = self.COV @ weights
+        standard_deviation = np.sqrt(np.dot(weights, cov_weights)*self.FREQUENCY)
+        excess_return = np.dot(weights, self.MU) - risk_free_rate
+        return -self.MU/standard_deviation + excess_return*self.FREQUENCY*cov_weights/standard_deviation**3
     
     def _mean(self, weights: list):
         """
         Returns the expected return of the portfolio.
         """
-        return np.sum(np.dot(weights, self.RETURNS))*self.FREQUENCY
+        return np.dot(weights, self.MU)
     
     def _variance(self, weights: list):
         """
         Returns the variance of the portfolio.
         """
-        return np.dot(weights.T, np.dot(self.COV, weights))
+        return np.dot(weights.T, self.COV @ weights)
+
+    def _variance_grad(self, weights: list):
+        """
+        Returns the gradient of the variance with respect to the weights.
+        """
+        return 2*(self.COV @ weights)
+
+    @property
+    def _variance_scale(self) -> float:
+        """
+        1/average asset variance. Daily variances are tiny next to SLSQP's default tolerance, which then stops before the optimum,
+        so variance objectives are solved in units of the average asset variance.
+        """
+        return 1/np.mean(self.COV.diagonal())
+
+    def _scaled_variance(self, weights: list):
+        return self._variance(weights)*self._variance_scale
+
+    def _scaled_variance_grad(self, weights: list):
+        return self._variance_grad(weights)*self._variance_scale
 
     def _sd(self, weights: list):
         """
         Returns the standard deviation of the portfolio.
         """
-        return np.sqrt(np.dot(weights, np.dot(self.COV, weights)))*np.sqrt(self.FREQUENCY)
+        return np.sqrt(np.dot(weights, self.COV @ weights))*np.sqrt(self.FREQUENCY)
+
+    def _portfolio(self, success, weights: np.ndarray, risk_free_rate: float = 0.0):
+        """
+        Returns the (status, weights, Sharpe ratio, mean, variance, stdev) tuple of a portfolio.
+        """
+        return success, weights, -self._neg_sharpe_ratio(weights, risk_free_rate), self._mean(weights), self._variance(weights), self._sd(weights)
+
+    @staticmethod
+    def _unconstrained(weight_constraint) -> bool:
+        """
+        True if the weights are not bounded (None, or (None/-inf, None/inf)), in which case the optimal portfolios have closed forms.
+        """
+        return weight_constraint is None or (weight_constraint[0] in (None, -np.inf) and weight_constraint[1] in (None, np.inf))
+
+    def _solve_cov(self, b):
+        """
+        Returns COV^-1 b.
+        """
+        return self.COV.solve(b) if isinstance(self.COV, FactorCovariance) else np.linalg.solve(self.COV, b)
+
+    @staticmethod
+    def _minimize(*args, **kwargs):
+        """
+        scipy.optimize.minimize, counting the solver's iterations and evaluations when profiling.
+        """
+        result = spo.minimize(*args, **kwargs)
+        if profiling.active():
+            profiling.count('efficient_frontier.minimize_solves')
+            profiling.count('efficient_frontier.minimize_iterations', getattr(result, 'nit', 0))
+            profiling.count('efficient_frontier.minimize_evaluations', getattr(result, 'nfev', 0))
+            profiling.count('efficient_frontier.minimize_gradient_evaluations', getattr(result, 'njev', 0))
+        return result
+
+    # tolerance of the variance solves, which are scaled to order 1 (see _variance_scale); SLSQP's default 1e-6 stops short of
+    # the optimum there. The Sharpe objective is much larger and keeps the default, it cannot decrease by 1e-10 relative.
+    VARIANCE_OPTIONS = {'ftol': 1e-10, 'maxiter': 500}
+
+    def _cached(self, key):
+        """
+        A cached solution, with a copy of its weights so the caller cannot modify the cache.
+        """
+        success, weights, *statistics = self._solutions[key]
+        return (success, weights.copy(), *statistics)
+
+    def _use_qp(self, constraints) -> bool:
+        """
+        True if the problem goes through the QP backend (created on first use).
+        """
+        if self.BACKEND != 'qp' and constraints is None:
+            return False
+        if self._qp is None:
+            self._qp = PortfolioQP(self.COV, self.MU)
+        return True
+
+    def _budget_constraint(self):
+        return {'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: np.ones_like(x)}
 
     # Return Maximization
-    def max_sharpe(self, risk_free_rate: float = 0.0, weight_constraint: tuple = (0,1)):
+    @profiling.timed('efficient_frontier.max_sharpe')
+    def max_sharpe(self, risk_free_rate: float = 0.0, weight_constraint: tuple = (0,1), constraints: PortfolioConstraints | None = None):
         """
         Returns the optimal portfolio weights and the corresponding Sharpe ratio.
         Use the negative Sharpe ratio as the objective function to be minimized.
+        Unbounded weights use the closed-form tangency portfolio. Results are cached per risk-free rate and weight constraint.
+        The QP backend solves the equivalent convex QP instead (see PortfolioQP).
         """
+        key = ('max_sharpe', risk_free_rate, None if weight_constraint is None else tuple(weight_constraint))
+        if constraints is None and key in self._solutions:
+            return self._cached(key)
+        if constraints is None and self._unconstrained(weight_constraint):
+            # tangency portfolio: w proportional to COV^-1 (MU - rf)
+            direction = self._solve_cov(self.MU - risk_free_rate)
+            self._solutions[key] = self._portfolio(bool(direction.sum() > 0), direction/direction.sum(), risk_free_rate)
+            return self._cached(key)
+        if self._use_qp(constraints):
+            weights, result = self._qp.max_sharpe(risk_free_rate, weight_constraint, constraints)
+            portfolio = self._portfolio(result.success, weights, risk_free_rate)
+            if constraints is None:
+                self._solutions[key] = portfolio
+                return self._cached(key)
+            return portfolio
         init_weights = self.UNIFORM_WEIGHTS
         method='SLSQP'
         bounds=[weight_constraint] * len(self.RETURNS)
-        constraints={'type': 'eq', 'fun': lambda x: np.sum(x) - 1}
+        constraints=self._budget_constraint()
         args = (risk_free_rate)
         # minimize the negative Sharpe ratio
-        result = spo.minimize(self._neg_sharpe_ratio, init_weights, method=method, bounds=bounds, constraints=constraints, args=args)
+        result = self._minimize(self._neg_sharpe_ratio, init_weights, jac=self._neg_sharpe_ratio_grad, method=method, bounds=bounds, constraints=constraints, args=args)
         # status, weights, Sharpe ratio, mean, variance, stdev
-        return result.success, result.x, -self._neg_sharpe_ratio(result.x, risk_free_rate), self._mean(result.x), self._variance(result.x), self._sd(result.x)
+        self._solutions[key] = self._portfolio(result.success, result.x, risk_free_rate)
+        return self._cached(key)
         
     # Risk Minimization
-    def min_variance(self, weight_constraint: tuple = (0,1), risk_free_rate: float = 0.0):
+    @profiling.timed('efficient_frontier.min_variance')
+    def min_variance(self, weight_constraint: tuple = (0,1), risk_free_rate: float = 0.0, constraints: PortfolioConstraints | None = None):
         """
         Returns the optimal portfolio weights and the corresponding variance.
         Use the variance as the objective function to be minimized.
+        Unbounded weights use the closed form COV^-1 1 / (1' COV^-1 1). Results are cached per weight constraint and risk-free rate.
         """
+        key = ('min_variance', risk_free_rate, None if weight_constraint is None else tuple(weight_constraint))
+        if constraints is None and key in self._solutions:
+            return self._cached(key)
+        if constraints is None and self._unconstrained(weight_constraint):
+            direction = self._solve_cov(np.ones(len(self.RETURNS)))
+            self._solutions[key] = self._portfolio(True, direction/direction.sum(), risk_free_rate)
+            return self._cached(key)
+        if self._use_qp(constraints):
+            weights, result = self._qp.min_variance(weight_constraint, constraints)
+            portfolio = self._portfolio(result.success, weights, risk_free_rate)
+            if constraints is None:
+                self._solutions[key] = portfolio
+                return self._cached(key)
+            return portfolio
         # minimize the variance
         init_weights = self.UNIFORM_WEIGHTS
         method='SLSQP'
         bounds=[weight_constraint] * len(self.RETURNS)
         # , 'type': 'eq', 'fun': lambda x: np.dot(x, self.RETURNS) - target_return
-        constraints={'type': 'eq', 'fun': lambda x: np.sum(x) - 1}
-        result = spo.minimize(self._variance, init_weights, method=method, bounds=bounds, constraints=constraints)
+        constraints=self._budget_constraint()
+        result = self._minimize(self._scaled_variance, init_weights, jac=self._scaled_variance_grad, method=method, bounds=bounds, constraints=constraints, options=self.VARIANCE_OPTIONS)
         # status, weights, Sharpe, mean:return, variance, stdev
-        return result.success, result.x, -self._neg_sharpe_ratio(result.x, risk_free_rate), self._mean(result.x), self._variance(result.x), self._sd(result.x)
+        self._solutions[key] = self._portfolio(result.success, result.x, risk_free_rate)
+        return self._cached(key)
 
     # Optimize a portfolio given a target return or a target variance
-    def optimize(self, target_return: float = None, target_variance: float = None, risk_free_rate: float = 0.0, weight_constraint: tuple = (0,1)):
+    @profiling.timed('efficient_frontier.optimize')
+    def optimize(self, target_return: float = None, target_variance: float = None, risk_free_rate: float = 0.0, weight_constraint: tuple = (0,1), constraints: PortfolioConstraints | None = None):
         """
         Returns the optimal portfolio weights and the corresponding Sharpe ratio.
         Use the negative Sharpe ratio as the objective function to be minimized.
+        The QP backend supports target_return only (the minimum variance portfolio at that return, which has the best Sharpe ratio there).
         """
+        if self._use_qp(constraints):
+            if target_return is None or target_variance is not None:
+                raise ValueError("The QP backend needs a target return (a target variance is not a convex QP).")
+            weights, result = self._qp.min_variance(weight_constraint, constraints, target_return=target_return)
+            return self._portfolio(result.success, weights, risk_free_rate)
         # minimize the negative Sharpe ratio
         init_weights = self.UNIFORM_WEIGHTS
         method='SLSQP'
-        bounds=[weight_constraint] * len(self.RETURNS)
+        bounds=None if self._unconstrained(weight_constraint) else [weight_constraint] * len(self.RETURNS)
         if target_return is not None:
-            constraints=({'type': 'eq', 'fun': lambda x: self._mean(x) - target_return}, {'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
+            constraints=({'type': 'eq', 'fun': lambda x: self._mean(x) - target_return, 'jac': lambda x: self.MU}, self._budget_constraint())
             args = (risk_free_rate)
-            result = spo.minimize(self._neg_sharpe_ratio, init_weights, method=method, bounds=bounds, constraints=constraints, args=args)
+            result = self._minimize(self._neg_sharpe_ratio, init_weights, jac=self._neg_sharpe_ratio_grad, method=method, bounds=bounds, constraints=constraints, args=args)
         elif target_variance is not None:
-            constraints=({'type': 'eq', 'fun': lambda x: self._variance(x) - target_variance}, {'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
-            result = spo.minimize(self._variance, init_weights, method=method, bounds=bounds, constraints=constraints)
+            scale = self._variance_scale
+            constraints=({'type': 'eq', 'fun': lambda x: self._scaled_variance(x) - target_variance*scale, 'jac': self._scaled_variance_grad}, self._budget_constraint())
+            result = self._minimize(self._scaled_variance, init_weights, jac=self._scaled_variance_grad, method=method, bounds=bounds, constraints=constraints, options=self.VARIANCE_OPTIONS)
         else:
             raise ValueError("Must provide either a target return or a target variance, but not both.")
         
@@ -101,14 +286,16 @@ class EfficientFrontier:
         return result.success, result.x, -self._neg_sharpe_ratio(result.x, risk_free_rate), self._mean(result.x), self._variance(result.x), self._sd(result.x)
     
     # Create a summary table of optimal portfolios, weights, Sharpe ratios, means, and variances
-    def summary(self, risk_free_rate: float = 0.0, weight_constraint: tuple = (0,1)):
+    def summary(self, risk_free_rate: float = 0.0, weight_constraint: tuple = (0,1), quiet: bool = False):
         """
         Returns a summary table of optimal portfolios, weights, Sharpe ratios, means, and variances.
+        quiet: return the tables without printing them
         """
         # opt portfolios
         min_variance = self.min_variance(weight_constraint, risk_free_rate)
         max_sharpe = self.max_sharpe(risk_free_rate, weight_constraint)
         # summary table
+        import pandas as pd
         max_sharpe_df = pd.DataFrame(columns=['Tickers', 'Weights'])
         min_var_df = pd.DataFrame(columns=['Tickers', 'Weights'])
         summary_df = pd.DataFrame(columns=['Portfolio', 'Weights', 'Sharpe Ratio', 'Return', 'Variance', 'Standard Deviation'])
@@ -116,14 +303,16 @@ class EfficientFrontier:
         max_sharpe_df['Tickers'] = self.TICKERS
         max_sharpe_df['Weights'] = max_sharpe[1].round(4)
         max_sharpe_df = max_sharpe_df.set_index('Tickers')
-        print("Max Sharpe:")
-        print(max_sharpe_df)
+        if not quiet:
+            print("Max Sharpe:")
+            print(max_sharpe_df)
         # min variance
         min_var_df['Tickers'] = self.TICKERS
         min_var_df['Weights'] = min_variance[1].round(4)
         min_var_df = min_var_df.set_index('Tickers')
-        print("Min Variance:")
-        print(min_var_df)
+        if not quiet:
+            print("Min Variance:")
+            print(min_var_df)
         # summary
         summary_df['Portfolio'] = ['Max Sharpe', 'Min Variance']
         summary_df['Weights'] = [dict(zip(self.TICKERS, max_sharpe[1].round(4))),dict(zip(self.TICKERS, min_variance[1].round(4)))]
@@ -132,28 +321,80 @@ class EfficientFrontier:
         summary_df['Variance'] = [max_sharpe[4].round(4), min_variance[4].round(4)]
         summary_df['Standard Deviation'] = [max_sharpe[5].round(4), min_variance[5].round(4)]
         summary_df = summary_df.set_index('Portfolio')
-        print("Summary:")
-        print(summary_df)
+        if not quiet:
+            print("Summary:")
+            print(summary_df)
         return summary_df, max_sharpe_df, min_var_df
 
 
 
+    # Trace the efficient frontier
+    @profiling.timed('efficient_frontier.frontier')
+    def frontier(self, risk_free_rate: float = 0.0, weight_constraint: tuple = (0,1), points: int = 25, constraints: PortfolioConstraints | None = None) -> Frontier:
+        """
+        Returns the minimum variance portfolios for points target returns from (min variance mean - stdev) to the max Sharpe mean.
+        Unbounded weights use the closed-form two-fund solution for all targets at once. Otherwise each SLSQP solve
+        (with analytic gradients) starts from the previous target's weights, which are already close to optimal.
+        The QP backend warm starts each solve from the previous target's solution in the same way.
+        """
+        min_variance = self.min_variance(weight_constraint, risk_free_rate, constraints)
+        max_sharpe = self.max_sharpe(risk_free_rate, weight_constraint, constraints)
+        target_returns = np.linspace(min_variance[3] - min_variance[5], max_sharpe[3], points)
+
+        if constraints is None and self._unconstrained(weight_constraint):
+            # every frontier portfolio is COV^-1 [1 MU] A^-1 [1 target]', a combination of two funds
+            funds = self._solve_cov(np.column_stack((np.ones(len(self.RETURNS)), self.MU)))
+            A = np.column_stack((np.ones(len(self.RETURNS)), self.MU)).T @ funds
+            weights = (funds @ np.linalg.solve(A, np.vstack((np.ones(points), target_returns)))).T
+            success = np.ones(points, dtype=bool)
+        elif self._use_qp(constraints):
+            weights = np.empty((points, len(self.RETURNS)))
+            success = np.empty(points, dtype=bool)
+            result = None
+            for i, target_return in enumerate(target_returns):
+                weights[i], result = self._qp.min_variance(weight_constraint, constraints, target_return=target_return, warm_start=result)
+                success[i] = result.success
+        else:
+            weights = np.empty((points, len(self.RETURNS)))
+            success = np.empty(points, dtype=bool)
+            bounds = [weight_constraint] * len(self.RETURNS)
+            init_weights = min_variance[1]
+            for i, target_return in enumerate(target_returns):
+                constraints = ({'type': 'eq', 'fun': lambda x, t=target_return: self._mean(x) - t, 'jac': lambda x: self.MU}, self._budget_constraint())
+                result = self._minimize(self._scaled_variance, init_weights, jac=self._scaled_variance_grad, method='SLSQP', bounds=bounds, constraints=constraints, options=self.VARIANCE_OPTIONS)
+                weights[i], success[i] = result.x, result.success
+                init_weights = result.x
+
+        variances = np.sum(weights * (self.COV @ weights.T).T, axis=1)
+        returns = weights @ self.MU
+        stds = np.sqrt(variances*self.FREQUENCY)
+        return Frontier(
+            target_returns=target_returns,
+            returns=returns,
+            stds=stds,
+            variances=variances,
+            sharpes=(returns - risk_free_rate)/stds,
+            weights=weights,
+            success=success,
+            min_variance=min_variance,
+            max_sharpe=max_sharpe
+        )
+
     # Plot the efficient frontier
-    def efficient_frontier(self, risk_free_rate: float = 0.0, weight_constraint: tuple = (0,1)):
+    def efficient_frontier(self, risk_free_rate: float = 0.0, weight_constraint: tuple = (0,1), frontier: Frontier | None = None):
         """
         Plots the efficient frontier.
         Iterates through optimal portfolios from min_variance to max_sharpe.
+        frontier: a precomputed result of frontier(), computed here if not given
         """
-        returns = []
-        stds = []
-        min_var_x = self.min_variance(weight_constraint, risk_free_rate)[1]
-        max_sharpe_x = self.max_sharpe(risk_free_rate, weight_constraint)[1]
-        target_returns = np.linspace(self._mean(min_var_x) - self._sd(min_var_x), self._mean(max_sharpe_x), 25)
-        for target_return in target_returns:
-            opt = self.optimize(target_return=target_return, risk_free_rate=risk_free_rate, weight_constraint=weight_constraint)
-            # append the means and stds as a percentage to 2 decimal places
-            returns.append(opt[3])
-            stds.append(opt[5])
+        if frontier is None:
+            frontier = self.frontier(risk_free_rate, weight_constraint)
+        returns = frontier.returns
+        stds = frontier.stds
+        _, _, max_sharpe_ratio, max_sharpe_mean, _, max_sharpe_sd = frontier.max_sharpe
+        _, _, _, min_variance_mean, _, min_variance_sd = frontier.min_variance
+        # matplotlib is only imported to plot
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(12,8))
         plt.scatter(stds, returns, marker='o')
         plt.grid(True)
@@ -163,17 +404,17 @@ class EfficientFrontier:
         # plot efficient frontier
         plt.plot(stds, returns,  color='black')
         # plot the best possible CAL as y= risk-free rate + (sharpe ratio * standard deviation of portfolio)
-        plt.plot(np.linspace(min(stds)-np.std(stds), max(stds)+np.std(stds)), risk_free_rate + (self.max_sharpe(risk_free_rate, weight_constraint)[2] * np.linspace(min(stds) - np.std(stds), max(stds)+np.std(stds))), color='r', label='Capital Allocation Line (CAL)')
+        plt.plot(np.linspace(min(stds)-np.std(stds), max(stds)+np.std(stds)), risk_free_rate + (max_sharpe_ratio * np.linspace(min(stds) - np.std(stds), max(stds)+np.std(stds))), color='r', label='Capital Allocation Line (CAL)')
         # plot the min variance as a vertical dashed black line
-        plt.axvline(x=self._sd(self.min_variance(weight_constraint, risk_free_rate)[1]), color='g', linestyle='--', label='Min Variance')
+        plt.axvline(x=min_variance_sd, color='g', linestyle='--', label='Min Variance')
         # plot the max sharpe ratio as a horizontal dashed black line
-        plt.axhline(y=self._mean(self.max_sharpe(risk_free_rate, weight_constraint)[1]), color='r', linestyle='--', label='Max Sharpe')
+        plt.axhline(y=max_sharpe_mean, color='r', linestyle='--', label='Max Sharpe')
         # shift the plot to center on the efficient frontier
         plt.xlim([min(stds) - np.std(stds), max(stds) + np.std(stds)])
         plt.ylim([min(returns)-np.std(returns), max(returns)+np.std(returns)])
          # Plot and label the max Sharpe portfolio and the min variance portfolio and show their values
-        plt.scatter(self._sd(self.max_sharpe(risk_free_rate, weight_constraint)[1]), self._mean(self.max_sharpe(risk_free_rate, weight_constraint)[1]),  marker='o', s=150, color='r',  label='Max Sharpe')
-        plt.scatter(self._sd(self.min_variance(weight_constraint, risk_free_rate)[1]), self._mean(self.min_variance(weight_constraint, risk_free_rate)[1]),  marker='o', s=150, color='g', label='Min Variance')
+        plt.scatter(max_sharpe_sd, max_sharpe_mean,  marker='o', s=150, color='r',  label='Max Sharpe')
+        plt.scatter(min_variance_sd, min_variance_mean,  marker='o', s=150, color='g', label='Min Variance')
         
         plt.legend()
         plt.show()
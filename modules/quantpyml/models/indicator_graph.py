@@ -0,0 +1,244 @@
+from collections import OrderedDict
+import numpy as np
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
+from quantpyml.common import Line, StockChart, check_period
+from quantpyml.models.indicators import BB, Ichimoku
+from quantpyml.models.batch_indicators import BatchIndicators
+
+# Indicators requested together on a StockChart are decomposed into a graph of intermediate arrays (a column, its rolling
+# sums, rolling variance, WMAs, rolling highs/lows, ...). A node is identified by a hashable key such as
+# ('sum', ('column', 'closes'), 20), so SMA(20) and BollingerBands(20) reach the same rolling sum node, and HMA(20) the
+# same WMA(10) as a WMA(10) overlay. Every node is evaluated once and memoized in an LRU keyed by the chart's identity and
+# version, so redrawing a dashboard, or adding an overlay, only computes what is new. Appending a bar bumps the chart's
+# version and the next request recomputes. The formulas are those of BatchIndicators (NaN where talipp returns None).
+
+class IndicatorGraph:
+    """
+    Evaluates indicator requests on a StockChart through a shared, memoized graph of intermediates.
+    A request is the indicator's name, alone for its default parameters or in a tuple with the arguments of the Indicators
+    method of the same name, e.g. 'RSI', ('SMA', 20), ('BollingerBands', 20, 2.0), ('Ichimoku', 26, 9, 26, 52, 26).
+
+    max_bytes: memory budget of the memoized arrays, least recently used dropped first
+    source: column the single-series indicators read ('opens', 'highs', 'lows', 'closes' or 'volume')
+    """
+    SUPPORTED = ('SMA', 'EMA', 'WMA', 'HMA', 'BollingerBands', 'RSI', 'Ichimoku')
+
+    def __init__(self, max_bytes: int = 64 << 20, source: str = 'closes'):
+        self.max_bytes = max_bytes
+        self.source = source
+        # (id(chart), version, node) -> (chart, values), the chart is kept so its id cannot be reused while cached
+        self._values = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._values.clear()
+        self.nbytes = 0
+
+    # nodes
+
+    @staticmethod
+    def _dependencies(node: tuple) -> tuple:
+        kind, *params = node
+        if kind == 'column':
+            return ()
+        if kind == 'centered':
+            return (('column', params[0]),)
+        if kind == 'sum':
+            return (('centered', params[0]),)
+        if kind == 'sum_sq':
+            return (('centered', params[0]),)
+        if kind == 'mean':
+            return (('sum', *params), ('column', params[0]))
+        if kind == 'variance':
+            return (('sum', *params), ('sum_sq', *params), ('centered', params[0]))
+        if kind in ('wma', 'ema', 'shift', 'max', 'min', 'rsi'):
+            return (params[0],)
+        if kind == 'hma_difference':
+            source, period = params
+            return (('wma', source, period // 2), ('wma', source, period))
+        if kind == 'hma':
+            source, period = params
+            return (('wma', ('hma_difference', source, period), int(np.sqrt(period))),)
+        if kind == 'midpoint':
+            return (('max', ('column', 'highs'), params[0]), ('min', ('column', 'lows'), params[0]))
+        if kind == 'average':
+            return tuple(params)
+        raise KeyError(f'Unknown node {node}')
+
+    @staticmethod
+    def _evaluate(node: tuple, chart: StockChart, inputs: list[np.ndarray]) -> np.ndarray:
+        """
+        Values of a node (a 1-D array as long as the chart) from the values of its dependencies.
+        """
+        kind, *params = node
+        row = lambda x: x[None, :]
+        if kind == 'column':
+            return getattr(chart, params[0])
+        if kind == 'centered':
+            # rolling sums are taken on the series minus its first value, as BatchIndicators, to keep the round-off small
+            x, = inputs
+            return x - x[:1]
+        if kind == 'sum':
+            return BatchIndicators._rolling_sum(row(inputs[0]), params[1])[0]
+        if kind == 'sum_sq':
+            return BatchIndicators._rolling_sum(row(inputs[0]**2), params[1])[0]
+        if kind == 'mean':
+            total, x = inputs
+            return total/params[1] + x[:1]
+        if kind == 'variance':
+            # population variance of the window, with the two-pass fix of BatchIndicators.BollingerBands on near-flat windows
+            total, total_sq, centered = inputs
+            period = params[1]
+            mean, mean_square = total/period, total_sq/period
+            variance = np.maximum(mean_square - mean**2, 0.0)
+            ends = np.flatnonzero(variance <= 1e-6 * mean_square)
+            if len(ends):
+                variance[ends] = centered[ends[:, None] - np.arange(period)].var(axis=1)
+            return variance
+        if kind == 'wma':
+            return BatchIndicators._wma(row(inputs[0]), params[1])[0]
+        if kind == 'ema':
+            return BatchIndicators._ema(row(inputs[0]), params[1])[0]
+        if kind == 'rsi':
+            return BatchIndicators.RSI(inputs[0], params[1]).values
+        if kind == 'hma_difference':
+            half, full = inputs
+            return 2.0*half - full
+        if kind == 'hma':
+            # talipp delays the first output until the inner WMA has sqrt(period) values
+            hma = inputs[0].copy()
+            period = params[1]
+            hma[:period + 2*int(np.sqrt(period)) - 3] = np.nan
+            return hma
+        if kind in ('max', 'min'):
+            # trailing window ending at each bar, NaN until the window is full
+            x, period = inputs[0], params[1]
+            extreme = (maximum_filter1d if kind == 'max' else minimum_filter1d)(x, period, origin=(period - 1)//2, mode='nearest')
+            extreme[:period - 1] = np.nan
+            return extreme
+        if kind == 'midpoint':
+            high, low = inputs
+            return (high + low)/2
+        if kind == 'average':
+            return sum(inputs)/len(inputs)
+        if kind == 'shift':
+            x, bars = inputs[0], params[1]
+            shifted = np.full_like(x, np.nan)
+            shifted[bars:] = x[:len(x) - bars]
+            return shifted
+        raise KeyError(f'Unknown node {node}')
+
+    def _value(self, chart: StockChart, node: tuple, computed: dict) -> np.ndarray:
+        """
+        Values of a node, from this evaluation, the LRU, or computed after its dependencies.
+        """
+        if node in computed:
+            return computed[node]
+        key = (id(chart), chart.version, len(chart), node)
+        cached = self._values.get(key)
+        if cached is not None and cached[0] is chart:
+            self._values.move_to_end(key)
+            self.hits += 1
+            values = cached[1]
+        else:
+            self.misses += 1
+            values = self._evaluate(node, chart, [self._value(chart, dependency, computed) for dependency in self._dependencies(node)])
+            # chart columns are views owned by the chart, only derived arrays count against the budget
+            if node[0] != 'column':
+                self._store(key, chart, values)
+        computed[node] = values
+        return values
+
+    def _store(self, key: tuple, chart: StockChart, values: np.ndarray):
+        if key in self._values:
+            self.nbytes -= self._values.pop(key)[1].nbytes
+        self._values[key] = (chart, values)
+        self.nbytes += values.nbytes
+        while self.nbytes > self.max_bytes and len(self._values) > 1:
+            self.nbytes -= self._values.popitem(last=False)[1][1].nbytes
+
+    # requests
+
+    @staticmethod
+    def _parse(request) -> tuple[str, tuple]:
+        name, *args = (request,) if isinstance(request, str) else request
+        if name not in IndicatorGraph.SUPPORTED:
+            raise ValueError(f'Unsupported indicator {name}, expected one of {IndicatorGraph.SUPPORTED}')
+        return name, tuple(args)
+
+    def _outputs(self, request) -> dict[str, tuple]:
+        """
+        The nodes a request reads its result from.
+        """
+        name, args = self._parse(request)
+        source = ('column', self.source)
+        if name == 'Ichimoku':
+            kijun, tenkan, chikou, senkou_fast, senkou_slow = args + (26, 9, 26, 52, 26)[len(args):]
+            for period in (kijun, tenkan, chikou, senkou_fast):
+                check_period(name, period)
+            base, conversion = ('midpoint', kijun), ('midpoint', tenkan)
+            # same displacements as StreamingIchimoku
+            return {
+                'base': base,
+                'conversion': conversion,
+                'lag': ('column', 'closes'),
+                'cloud_fast': ('shift', ('average', base, conversion), senkou_slow),
+                'cloud_slow': ('shift', ('midpoint', senkou_fast), senkou_slow + 1)
+            }
+        period = check_period(name, args[0] if args else 14, 2 if name in ('HMA', 'RSI') else 1)
+        if name == 'SMA':
+            return {'values': ('mean', self.source, period)}
+        if name == 'BollingerBands':
+            return {'mid': ('mean', self.source, period), 'variance': ('variance', self.source, period)}
+        kind = {'EMA': 'ema', 'WMA': 'wma', 'HMA': 'hma', 'RSI': 'rsi'}[name]
+        return {'values': (kind, source, period)}
+
+    def plan(self, requests: list) -> list[tuple]:
+        """
+        Every distinct node the requests need, dependencies first (the graph evaluate runs, before the memoized ones are skipped).
+        """
+        order, seen = [], set()
+        def visit(node):
+            if node in seen:
+                return
+            seen.add(node)
+            for dependency in self._dependencies(node):
+                visit(dependency)
+            order.append(node)
+        for request in requests:
+            for node in self._outputs(request).values():
+                visit(node)
+        return order
+
+    def evaluate(self, chart: StockChart, requests: list) -> dict:
+        """
+        Returns {request: result} for every request, results as the Indicators methods return them (Line, BB or Ichimoku)
+        with NaN during warm-up.
+        """
+        computed = {}
+        results = {}
+        for request in requests:
+            name, args = self._parse(request)
+            values = {field: self._value(chart, node, computed) for field, node in self._outputs(request).items()}
+            if name == 'Ichimoku':
+                kijun, tenkan, chikou, senkou_fast, senkou_slow = args + (26, 9, 26, 52, 26)[len(args):]
+                lag = values['lag'].copy()
+                lag[:chikou - 1] = np.nan
+                results[request] = Ichimoku(
+                    base=Line(period=kijun, values=values['base']),
+                    conversion=Line(period=tenkan, values=values['conversion']),
+                    lag=Line(period=chikou, values=lag),
+                    cloud_fast=Line(period=senkou_fast, values=values['cloud_fast']),
+                    cloud_slow=Line(period=senkou_slow, values=values['cloud_slow'])
+                )
+            elif name == 'BollingerBands':
+                period = args[0] if args else 14
+                stdev_multiplier = args[1] if len(args) > 1 else 2.0
+                width = stdev_multiplier*np.sqrt(values['variance'])
+                mid = values['mid']
+                results[request] = BB(period=period, stdev_multiplier=stdev_multiplier, top=Line(period, mid + width), mid=Line(period, mid), bot=Line(period, mid - width))
+            else:
+                results[request] = Line(period=args[0] if args else 14, values=values['values'])
+        return results
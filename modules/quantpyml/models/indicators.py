@@ -3,6 +3,7 @@ from talipp.ohlcv import OHLCVFactory
 from talipp.indicator_util import composite_to_lists
 from dataclasses import dataclass
 from quantpyml.common import Line, StockChart
+from quantpyml.utils import profiling
 
 # Using talipp indicators: https://nardew.github.io/talipp/latest/indicator-catalogue/
 # this file maps the talipp indicators to the quantpyml indicators
@@ -37,6 +38,7 @@ class Indicators:
         return OHLCVFactory.from_dict(ohlcv)
     
     @classmethod
+    @profiling.timed('indicators.SMA')
     def SMA(cls, series: list[float], period: int = 14) -> Line:
         """
         Simple Moving Average
@@ -46,6 +48,7 @@ class Indicators:
         return Line(period=period, values=sma)
 
     @classmethod
+    @profiling.timed('indicators.EMA')
     def EMA(cls, series: list[float], period: int = 14) -> Line:
         """
         Exponential Moving Average
@@ -55,6 +58,7 @@ class Indicators:
         return Line(period=period, values=ema)
 
     @classmethod
+    @profiling.timed('indicators.HMA')
     def HMA(cls, series: list[float], period: int = 14) -> Line:
         """
         Hull Moving Average
@@ -64,6 +68,7 @@ class Indicators:
         return Line(period=period, values=hma)
 
     @classmethod
+    @profiling.timed('indicators.BollingerBands')
     def BollingerBands(cls, series: list[float], period: int = 14, stdev_multiplier: float = 2.0) -> BB:
         """
         Bollinger Bands
@@ -80,6 +85,7 @@ class Indicators:
         )   
 
     @classmethod
+    @profiling.timed('indicators.RSI')
     def RSI(cls, series: list[float], period: int = 14) -> Line:
         """
         Relative Strength Index
@@ -89,6 +95,7 @@ class Indicators:
         return Line(period=period, values=rsi)
 
     @classmethod
+    @profiling.timed('indicators.Ichimoku')
     def Ichimoku(cls, series: list[float], kijun_period: int = 26, tenkan_period: int = 9, chikou_period: int = 26, senkou_fast_period: int = 52, senkou_slow_period: int = 26) -> Ichimoku:
         """
         Ichimoku Cloud
@@ -0,0 +1,159 @@
+import math
+from dataclasses import dataclass
+from typing import Callable, Iterator
+import numpy as np
+import torch
+from torch.quasirandom import SobolEngine
+from quantpyml.models.brownian_motion import BrownianMotion
+from quantpyml.models.black_scholes import BlackScholes
+
+@dataclass
+class MonteCarloPrice:
+    price: float
+    standard_error: float
+    paths: int
+
+class MonteCarlo:
+    """
+    Monte Carlo option pricer on risk-neutral BrownianMotion GBM paths, monitored once per step.
+    Parameters follow BlackScholes: expiration in days, annualized vol, rate and dividend yield.
+
+    steps: monitoring steps over the life of the option, one per day of expiration by default
+    paths: number of simulated paths (pairs count twice with antithetic)
+    antithetic: pair every path with its mirror image (Z, -Z) and average the pair
+    control_variate: regress on the European option with the same strike, whose BlackScholes price is known exactly
+    sobol: scrambled Sobol normals assigned to the steps with a Brownian bridge, so the first dimensions drive the coarse path shape
+    replications: independent Sobol scrambles, the standard error of a quasi-random price comes from the spread between them
+    """
+    def __init__(self, price, expiration, vol, rate=0.03, div=0, steps: int | None = None, paths: int = 100_000, antithetic: bool = False, control_variate: bool = False, sobol: bool = False, replications: int = 16, seed: int | None = None, chunk_size: int = 65536):
+        self.S = price
+        self.expiration = expiration
+        self.T = expiration/365
+        self.sigma = vol
+        self.r = rate
+        self.q = div
+        self.steps = steps or max(1, round(expiration))
+        self.paths = paths
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.sobol = sobol
+        self.replications = replications if sobol else 1
+        self.seed = np.random.SeedSequence().entropy if seed is None else seed
+        self.chunk_size = chunk_size
+
+    def _bridge(self, normals: torch.Tensor) -> torch.Tensor:
+        """
+        Maps (N, steps) normals, most important dimension first, to Brownian increments with a Brownian bridge:
+        column 0 sets the terminal value, the next ones the midpoints of ever finer intervals.
+        """
+        n = self.steps
+        W = torch.zeros((normals.shape[0], n + 1), dtype=normals.dtype)
+        W[:, n] = math.sqrt(n) * normals[:, 0]
+        k = 1
+        intervals = [(0, n)]
+        while intervals:
+            left, right = intervals.pop(0)
+            if right - left < 2:
+                continue
+            j = (left + right) // 2
+            W[:, j] = ((right - j) * W[:, left] + (j - left) * W[:, right]) / (right - left) + math.sqrt((j - left) * (right - j) / (right - left)) * normals[:, k]
+            k += 1
+            intervals += [(left, j), (j, right)]
+        return torch.diff(W, dim=1)
+
+    def _normal_chunks(self, n: int, replication: int) -> Iterator[torch.Tensor]:
+        if not self.sobol:
+            yield from BrownianMotion.normal_chunks(n, self.steps, self.chunk_size, self.seed)
+            return
+        engine = SobolEngine(self.steps, scramble=True, seed=int(np.random.SeedSequence(self.seed, spawn_key=(replication,)).generate_state(1)[0]))
+        for start in range(0, n, self.chunk_size):
+            uniforms = engine.draw(min(self.chunk_size, n - start), dtype=torch.float64).clamp_(1e-12, 1 - 1e-12)
+            yield self._bridge(torch.special.ndtri(uniforms)).to(torch.get_default_dtype())
+
+    def _estimate(self, payoff: Callable[[torch.Tensor], torch.Tensor], control_strike: float, type_: str) -> MonteCarloPrice:
+        discount = math.exp(-self.r*self.T)
+        dt = self.T/self.steps
+        mean_return = (self.r - self.q)*dt
+        stdev_return = self.sigma*math.sqrt(dt)
+        sign = 1.0 if type_ == 'C' else -1.0
+        control_price = float(BlackScholes(self.S, control_strike, self.expiration, self.sigma, self.r, self.q).price(type_))
+
+        per_replication = self.paths // self.replications
+        draws = per_replication // 2 if self.antithetic else per_replication
+        estimates, variances, samples = [], [], 0
+        for replication in range(self.replications):
+            # float64 running sums of y (payoff), x (control) and their products
+            sums = torch.zeros(5, dtype=torch.float64)
+            for normals in self._normal_chunks(draws, replication):
+                y = x = 0.0
+                pair = (normals.neg(), normals) if self.antithetic else (normals,)
+                for z in pair:
+                    paths = BrownianMotion.geometric_brownian_motion_from_normals(self.S, mean_return, stdev_return, z)
+                    y = y + discount*payoff(paths).double()
+                    x = x + discount*torch.clamp(sign*(paths[:, -1] - control_strike), min=0).double()
+                y, x = y/len(pair), x/len(pair)
+                sums += torch.stack((y.sum(), x.sum(), (y*y).sum(), (x*x).sum(), (x*y).sum()))
+            n = draws
+            samples += n*len(pair)
+            mean_y, mean_x, mean_yy, mean_xx, mean_xy = (sums/n).tolist()
+            var_y = (mean_yy - mean_y**2)*n/(n - 1)
+            if self.control_variate:
+                var_x = (mean_xx - mean_x**2)*n/(n - 1)
+                cov = (mean_xy - mean_x*mean_y)*n/(n - 1)
+                beta = cov/var_x if var_x > 0 else 0.0
+                estimates.append(mean_y - beta*(mean_x - control_price))
+                variances.append(max(var_y - beta*cov, 0.0))
+            else:
+                estimates.append(mean_y)
+                variances.append(max(var_y, 0.0))
+
+        if self.replications > 1:
+            price = float(np.mean(estimates))
+            standard_error = float(np.std(estimates, ddof=1)/math.sqrt(self.replications))
+        else:
+            price = estimates[0]
+            standard_error = math.sqrt(variances[0]/draws)
+        return MonteCarloPrice(price=price, standard_error=standard_error, paths=samples)
+
+    def european(self, strike, type_: "call (C) or put (P)" = 'C') -> MonteCarloPrice:
+        """
+        European option, converges to BlackScholes.price (exactly, with control_variate).
+        """
+        sign = 1.0 if type_ == 'C' else -1.0
+        return self._estimate(lambda paths: torch.clamp(sign*(paths[:, -1] - strike), min=0), strike, type_)
+
+    def asian(self, strike, type_: "call (C) or put (P)" = 'C') -> MonteCarloPrice:
+        """
+        Fixed strike Asian option on the arithmetic average of the monitored prices.
+        """
+        sign = 1.0 if type_ == 'C' else -1.0
+        return self._estimate(lambda paths: torch.clamp(sign*(paths.mean(dim=1) - strike), min=0), strike, type_)
+
+    def barrier(self, strike, barrier, type_: "call (C) or put (P)" = 'C', kind: "up-and-out, up-and-in, down-and-out or down-and-in" = 'up-and-out') -> MonteCarloPrice:
+        """
+        Knock-out or knock-in European option with a discretely monitored barrier (the spot counts as a monitoring point).
+        """
+        direction, knock = {'up-and-out': (1, False), 'up-and-in': (1, True), 'down-and-out': (-1, False), 'down-and-in': (-1, True)}[kind]
+        sign = 1.0 if type_ == 'C' else -1.0
+
+        def payoff(paths):
+            if direction > 0:
+                hit = torch.clamp(paths.amax(dim=1), min=self.S) >= barrier
+            else:
+                hit = torch.clamp(paths.amin(dim=1), max=self.S) <= barrier
+            alive = hit if knock else ~hit
+            return torch.clamp(sign*(paths[:, -1] - strike), min=0)*alive
+        return self._estimate(payoff, strike, type_)
+
+    def lookback(self, strike=None, type_: "call (C) or put (P)" = 'C') -> MonteCarloPrice:
+        """
+        Lookback option on the extreme of the monitored prices (the spot included).
+        strike: None for a floating strike (call pays S_T - min, put pays max - S_T), otherwise fixed strike (call pays max - K, put pays K - min)
+        """
+        def payoff(paths):
+            high = torch.clamp(paths.amax(dim=1), min=self.S)
+            low = torch.clamp(paths.amin(dim=1), max=self.S)
+            if strike is None:
+                return paths[:, -1] - low if type_ == 'C' else high - paths[:, -1]
+            return torch.clamp(high - strike, min=0) if type_ == 'C' else torch.clamp(strike - low, min=0)
+        return self._estimate(payoff, self.S if strike is None else strike, type_)
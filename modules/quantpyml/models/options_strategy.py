@@ -0,0 +1,213 @@
+from dataclasses import dataclass, replace
+import numpy as np
+from quantpyml.models.black_scholes import BlackScholes
+
+# Multi-leg option positions valued over a whole scenario grid at once. The grid axes (underlying price, days from now,
+# volatility shift) and the legs are broadcast against each other as (prices, days, vol shifts, legs) and priced in one
+# BlackScholes.chain call, then the legs are collapsed with a dot product against their quantities. Nothing is built per
+# grid point, a 200 x 60 x 10 grid of a four-leg strategy is a few million array entries.
+
+@dataclass
+class Leg:
+    """
+    One leg of an options strategy.
+    type_: 'C' call, 'P' put or 'S' the underlying itself (strike and expiration ignored)
+    expiration: days to expiration from today
+    quantity: contracts (or shares), negative when short
+    premium: entry price per contract, BlackScholes at today's price and the leg's vol when None
+    vol: annualized volatility of this leg (e.g. from the skew), the strategy's vol when None
+    """
+    type_: str
+    strike: float
+    expiration: float
+    quantity: float = 1.0
+    premium: float | None = None
+    vol: float | None = None
+
+    def __post_init__(self):
+        if self.type_ not in ('C', 'P', 'S'):
+            raise ValueError(f'Unrecognized leg type {self.type_!r}, expected C, P or S')
+
+
+@dataclass
+class StrategySurface:
+    """
+    Result of OptionsStrategy.surface, arrays shaped (prices, days, vol shifts). Greeks follow BlackScholes.chain conventions
+    (theta per year, vega and rho per unit change of vol and rate) and are summed over the legs, times their quantities.
+    """
+    prices: np.ndarray
+    days: np.ndarray
+    vol_shifts: np.ndarray
+    value: np.ndarray
+    pnl: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    vega: np.ndarray
+    theta: np.ndarray
+    rho: np.ndarray
+
+
+class OptionsStrategy:
+    """
+    A position of several legs on one underlying.
+
+    price: current price of the underlying
+    vol: annualized volatility, for the legs without their own
+    rate, div: annualized risk-free rate and dividend yield
+    """
+    def __init__(self, price: float, legs: list[Leg], vol: float, rate: float = 0.03, div: float = 0, name: str = ''):
+        self.price = price
+        self.vol = vol
+        self.rate = rate
+        self.div = div
+        self.name = name
+        self.legs = list(legs)
+        # leg parameters as arrays, broadcast on the last axis of the grid
+        self._type = np.array([leg.type_ for leg in self.legs])
+        self._quantity = np.array([leg.quantity for leg in self.legs], dtype=np.float64)
+        self._strike = np.array([price if leg.type_ == 'S' else leg.strike for leg in self.legs], dtype=np.float64)
+        self._expiration = np.array([0.0 if leg.type_ == 'S' else leg.expiration for leg in self.legs], dtype=np.float64)
+        self._vol = np.array([vol if leg.vol is None else leg.vol for leg in self.legs], dtype=np.float64)
+        entry = BlackScholes.chain(price, self._strike, self._expiration, self._vol, rate, div)
+        self.premiums = np.array([
+            leg.premium if leg.premium is not None else price if leg.type_ == 'S' else (call if leg.type_ == 'C' else put)
+            for leg, call, put in zip(self.legs, entry.call, entry.put)
+        ], dtype=np.float64)
+
+    def __repr__(self):
+        legs = ', '.join(f'{leg.quantity:+g} {leg.type_}' + ('' if leg.type_ == 'S' else f' {leg.strike:g} {leg.expiration:g}d') for leg in self.legs)
+        return f'OptionsStrategy({self.name or "custom"}: {legs})'
+
+    @property
+    def cost(self) -> float:
+        """
+        Net premium paid to open the position (negative for a net credit).
+        """
+        return float(self.premiums @ self._quantity)
+
+    @property
+    def expiration(self) -> float:
+        """
+        Days to the first expiration, where the position stops being what it was built as.
+        """
+        options = self._expiration[self._type != 'S']
+        return float(options.min()) if len(options) else 0.0
+
+    def surface(self, prices, days=0.0, vol_shifts=0.0, dtype=np.float64) -> StrategySurface:
+        """
+        Value, PnL and Greeks of the whole position at every (price, day, vol shift) of the grid.
+
+        prices: underlying prices
+        days: days from today, legs past their expiration are worth their intrinsic value
+        vol_shifts: added to every leg's vol (0.05 = 5 vol points up)
+        dtype: as BlackScholes.chain
+        """
+        prices, days, vol_shifts = (np.atleast_1d(np.asarray(x, dtype=dtype)) for x in (prices, days, vol_shifts))
+        S = prices[:, None, None, None]
+        remaining = np.maximum(self._expiration - days[:, None], 0)[None, :, None, :]
+        vol = np.maximum(self._vol + vol_shifts[:, None], 0)[None, None, :, :]
+        chain = BlackScholes.chain(S, self._strike, remaining, vol, self.rate, self.div, dtype=dtype)
+
+        is_call, is_put, is_stock = (self._type == t for t in ('C', 'P', 'S'))
+        call_quantity, put_quantity = self._quantity*is_call, self._quantity*is_put
+        stock = float(self._quantity[is_stock].sum())
+        # every leg gets a call and a put from the chain, the quantity vectors pick the one it holds
+        combine = lambda call, put: call @ call_quantity.astype(dtype) + put @ put_quantity.astype(dtype)
+        both = lambda greek: greek @ (call_quantity + put_quantity).astype(dtype)
+        value = combine(chain.call, chain.put) + stock*prices[:, None, None]
+        return StrategySurface(
+            prices=prices,
+            days=days,
+            vol_shifts=vol_shifts,
+            value=value,
+            pnl=value - self.cost,
+            delta=combine(chain.call_delta, chain.put_delta) + stock,
+            gamma=both(chain.gamma),
+            vega=both(chain.vega),
+            theta=combine(chain.call_theta, chain.put_theta),
+            rho=combine(chain.call_rho, chain.put_rho)
+        )
+
+    def payoff(self, prices) -> np.ndarray:
+        """
+        PnL at the first expiration for each underlying price (the usual strategy chart).
+        """
+        return self.surface(prices, self.expiration).pnl[:, 0, 0]
+
+    def breakevens(self, prices) -> np.ndarray:
+        """
+        Underlying prices where the PnL at the first expiration crosses zero, interpolated on the sorted prices grid.
+        """
+        prices = np.sort(np.asarray(prices, dtype=np.float64))
+        pnl = self.payoff(prices)
+        crossing = np.flatnonzero(np.sign(pnl[:-1]) * np.sign(pnl[1:]) < 0)
+        a, b = pnl[crossing], pnl[crossing + 1]
+        return prices[crossing] + (prices[crossing + 1] - prices[crossing]) * a/(a - b)
+
+    # preset strategies as conventionally built: straddles, strangles, butterflies and condors long (a net debit), iron condors
+    # and iron butterflies short (a net credit), back ratios as their docstring. short=True flips every quantity
+
+    @classmethod
+    def _preset(cls, name: str, price: float, vol: float, legs: list[Leg], short: bool, quantity: float, **kwargs) -> 'OptionsStrategy':
+        sign = -quantity if short else quantity
+        return cls(price, [replace(leg, quantity=leg.quantity*sign) for leg in legs], vol, name=name, **kwargs)
+
+    @classmethod
+    def straddle(cls, price: float, vol: float, expiration: float, strike: float | None = None, short: bool = False, quantity: float = 1, **kwargs) -> 'OptionsStrategy':
+        """
+        Call and put at the same strike (at the money by default).
+        kwargs: rate and div
+        """
+        strike = price if strike is None else strike
+        return cls._preset('straddle', price, vol, [Leg('C', strike, expiration), Leg('P', strike, expiration)], short, quantity, **kwargs)
+
+    @classmethod
+    def strangle(cls, price: float, vol: float, expiration: float, put_strike: float, call_strike: float, short: bool = False, quantity: float = 1, **kwargs) -> 'OptionsStrategy':
+        """
+        Out of the money put and call.
+        """
+        return cls._preset('strangle', price, vol, [Leg('P', put_strike, expiration), Leg('C', call_strike, expiration)], short, quantity, **kwargs)
+
+    @classmethod
+    def butterfly(cls, price: float, vol: float, expiration: float, lower: float, middle: float, upper: float, type_: str = 'C', short: bool = False, quantity: float = 1, **kwargs) -> 'OptionsStrategy':
+        """
+        Long the wings, short two of the body, all calls or all puts.
+        """
+        legs = [Leg(type_, lower, expiration), Leg(type_, middle, expiration, -2), Leg(type_, upper, expiration)]
+        return cls._preset('butterfly', price, vol, legs, short, quantity, **kwargs)
+
+    @classmethod
+    def condor(cls, price: float, vol: float, expiration: float, strikes: tuple[float, float, float, float], type_: str = 'C', short: bool = False, quantity: float = 1, **kwargs) -> 'OptionsStrategy':
+        """
+        Long the outer strikes, short the inner strikes (ascending), all calls or all puts.
+        """
+        k1, k2, k3, k4 = strikes
+        legs = [Leg(type_, k1, expiration), Leg(type_, k2, expiration, -1), Leg(type_, k3, expiration, -1), Leg(type_, k4, expiration)]
+        return cls._preset('condor', price, vol, legs, short, quantity, **kwargs)
+
+    @classmethod
+    def iron_condor(cls, price: float, vol: float, expiration: float, strikes: tuple[float, float, float, float], short: bool = False, quantity: float = 1, **kwargs) -> 'OptionsStrategy':
+        """
+        Short put spread below and short call spread above the price (ascending strikes), a net credit.
+        short=True buys both spreads instead.
+        """
+        k1, k2, k3, k4 = strikes
+        legs = [Leg('P', k1, expiration), Leg('P', k2, expiration, -1), Leg('C', k3, expiration, -1), Leg('C', k4, expiration)]
+        return cls._preset('iron condor', price, vol, legs, short, quantity, **kwargs)
+
+    @classmethod
+    def iron_butterfly(cls, price: float, vol: float, expiration: float, lower: float, middle: float, upper: float, short: bool = False, quantity: float = 1, **kwargs) -> 'OptionsStrategy':
+        """
+        Short straddle at middle protected by a long put at lower and a long call at upper, a net credit.
+        """
+        legs = [Leg('P', lower, expiration), Leg('P', middle, expiration, -1), Leg('C', middle, expiration, -1), Leg('C', upper, expiration)]
+        return cls._preset('iron butterfly', price, vol, legs, short, quantity, **kwargs)
+
+    @classmethod
+    def back_ratio(cls, price: float, vol: float, expiration: float, short_strike: float, long_strike: float, type_: str = 'C', ratio: tuple[float, float] = (1, 2), short: bool = False, quantity: float = 1, **kwargs) -> 'OptionsStrategy':
+        """
+        Back ratio spread: sell ratio[0] options at short_strike and buy ratio[1] further out of the money at long_strike.
+        Calls profit from a rally, puts from a selloff.
+        """
+        legs = [Leg(type_, short_strike, expiration, -ratio[0]), Leg(type_, long_strike, expiration, ratio[1])]
+        return cls._preset(f'{"call" if type_ == "C" else "put"} back ratio', price, vol, legs, short, quantity, **kwargs)
@@ -0,0 +1,470 @@
+from dataclasses import dataclass
+import numpy as np
+import scipy.linalg as sla
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from quantpyml.utils import profiling
+
+# Convex quadratic programming backend of EfficientFrontier for large universes (thousands of assets), where SLSQP's
+# dense quasi-Newton updates become the bottleneck. QPSolver is an ADMM solver (the OSQP splitting) whose only heavy
+# step is a factorization done once per problem; PortfolioQP maps the portfolio problems onto it, including the max
+# Sharpe problem through its homogeneous reformulation. A FactorCovariance is handled by lifting the factor exposures
+# into extra variables, so the n x n covariance is never formed and the KKT system stays sparse.
+
+@dataclass
+class FactorCovariance:
+    """
+    Low-rank plus diagonal covariance B F B' + diag(D) of n assets on k factors, never formed as an n x n matrix.
+    Supports cov @ x, x @ cov, diagonal() and solve(b) in O(n k^2), so EfficientFrontier can use it in place of a dense matrix.
+
+    loadings: (n, k) factor exposures B
+    factor_cov: (k, k) factor covariance F
+    specific: (n,) specific (idiosyncratic) variances D, must be positive
+    """
+    loadings: np.ndarray
+    factor_cov: np.ndarray
+    specific: np.ndarray
+
+    def __post_init__(self):
+        self.loadings = np.atleast_2d(np.asarray(self.loadings, dtype=np.float64))
+        self.factor_cov = np.atleast_2d(np.asarray(self.factor_cov, dtype=np.float64))
+        self.specific = np.asarray(self.specific, dtype=np.float64)
+        n, k = self.loadings.shape
+        if self.factor_cov.shape != (k, k) or self.specific.shape != (n,):
+            raise ValueError(f'Expected factor_cov of shape {(k, k)} and specific of shape {(n,)}')
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        n = len(self.specific)
+        return n, n
+
+    def __matmul__(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        return self.loadings @ (self.factor_cov @ (self.loadings.T @ x)) + (self.specific * x.T).T
+
+    def __rmatmul__(self, x):
+        return (self @ np.asarray(x, dtype=np.float64).T).T
+
+    def diagonal(self) -> np.ndarray:
+        return np.einsum('ij,jk,ik->i', self.loadings, self.factor_cov, self.loadings) + self.specific
+
+    def solve(self, b) -> np.ndarray:
+        """
+        Returns COV^-1 b by the Woodbury identity, (B F B' + D)^-1 = D^-1 - D^-1 B (I + F B' D^-1 B)^-1 F B' D^-1.
+        """
+        b = np.asarray(b, dtype=np.float64)
+        scaled = self.loadings / self.specific[:, None]
+        inner = np.eye(self.factor_cov.shape[0]) + self.factor_cov @ (self.loadings.T @ scaled)
+        d_inv_b = (b.T / self.specific).T
+        return d_inv_b - scaled @ np.linalg.solve(inner, self.factor_cov @ (self.loadings.T @ d_inv_b))
+
+    def dense(self) -> np.ndarray:
+        """
+        Returns the full n x n matrix, only sensible for small universes.
+        """
+        return self.loadings @ self.factor_cov @ self.loadings.T + np.diag(self.specific)
+
+
+@dataclass
+class PortfolioConstraints:
+    """
+    Constraints of the QP backend on top of the budget and the per-asset weight_constraint.
+
+    sectors: (n,) sector label of every asset, with sector_bounds {label: (min, max)} on the total weight of each sector (None for no limit)
+    current_weights, max_turnover: sum |w - current_weights| <= max_turnover
+    max_assets: cardinality limit, relaxed: the continuous problem is solved first, then re-solved with only its max_assets largest positions allowed
+    """
+    sectors: np.ndarray | None = None
+    sector_bounds: dict | None = None
+    current_weights: np.ndarray | None = None
+    max_turnover: float | None = None
+    max_assets: int | None = None
+
+
+@dataclass
+class QPResult:
+    """
+    Solution of QPSolver.solve. status is 'solved', 'infeasible' or 'max_iter' (tolerances not reached, x is the last iterate).
+    y holds the constraint multipliers, usable with x to warm start a related problem.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    status: str
+    iterations: int
+    objective: float
+
+    @property
+    def success(self) -> bool:
+        return self.status == 'solved'
+
+
+class QPSolver:
+    """
+    ADMM solver for the convex QP
+        minimize 1/2 x'Px + q'x  subject to  l <= Ax <= u
+    with the OSQP splitting: every iteration is one solve with a matrix factorized up front (and again only when rho adapts),
+    a projection onto the bounds and a multiplier update. Sparse P factorizes the sparse quasi-definite KKT system, dense P
+    the reduced system P + sigma I + A' rho A by Cholesky. The problem is Ruiz-equilibrated first and equality rows get a
+    1000x stiffer rho. ADMM only needs to identify the active constraints: polish then runs an active set refinement on
+    the equality-constrained KKT systems, which ends with a solution accurate to round-off, usually long before ADMM would.
+
+    rho, sigma, alpha: ADMM step size, x regularization and over-relaxation
+    eps_abs, eps_rel: tolerances on the primal (Ax - z) and dual (Px + q + A'y) residuals, in infinity norm
+    check_every: iterations between convergence checks and rho updates
+    polish: refine the ADMM iterates on their active set (kept only if it meets the tolerances with multipliers of the right sign)
+    """
+    def __init__(self, rho: float = 0.1, sigma: float = 1e-6, alpha: float = 1.6, eps_abs: float = 1e-5, eps_rel: float = 1e-5, max_iter: int = 20000, check_every: int = 25, adaptive_rho: bool = True, polish: bool = True):
+        self.rho = rho
+        self.sigma = sigma
+        self.alpha = alpha
+        self.eps_abs = eps_abs
+        self.eps_rel = eps_rel
+        self.max_iter = max_iter
+        self.check_every = check_every
+        self.adaptive_rho = adaptive_rho
+        self.polish = polish
+
+    @staticmethod
+    def _factorize(P, A, rho: np.ndarray, sigma: float):
+        """
+        Factorizes [[P + sigma I, A'], [A, -diag(1/rho)]] and returns solve(rhs_x, z, y) -> (x~, z~), the linear step of an ADMM iteration.
+        """
+        n = A.shape[1]
+        if sp.issparse(P):
+            kkt = sp.bmat([[P + sigma*sp.eye(n), A.T], [A, -sp.diags(1/rho)]], format='csc')
+            lu = spla.splu(kkt, permc_spec='MMD_AT_PLUS_A')
+
+            def solve(rhs_x, z, y):
+                solution = lu.solve(np.concatenate((rhs_x, z - y/rho)))
+                return solution[:n], z + (solution[n:] - y)/rho
+        else:
+            reduced = P + sigma*np.eye(n) + (A.T @ sp.diags(rho) @ A).toarray()
+            factor = sla.cho_factor(reduced)
+
+            def solve(rhs_x, z, y):
+                x = sla.cho_solve(factor, rhs_x + A.T @ (rho*z - y))
+                return x, A @ x
+        return solve
+
+    def _rho_vector(self, rho: float, l: np.ndarray, u: np.ndarray) -> np.ndarray:
+        return np.where(np.isinf(l) & np.isinf(u), 1e-6, np.where(l == u, 1e3*rho, rho))
+
+    @staticmethod
+    def _equilibrate(P, q, A, iterations: int = 10):
+        """
+        Modified Ruiz equilibration of the KKT matrix [[P, A'], [A, 0]] plus a cost scaling, as OSQP.
+        Returns the scaled P, q, A with the variable scaling D, constraint scaling E and cost scaling c
+        (x = D x_scaled, A_scaled = E A D, objective_scaled = c objective).
+        """
+        n, m = len(q), A.shape[0]
+        D, E, c = np.ones(n), np.ones(m), 1.0
+        dense = not sp.issparse(P)
+        column_norm = lambda M: (np.abs(M).max(axis=0) if dense else np.asarray(abs(M).max(axis=0).todense()).ravel()) if M.shape[0] else np.zeros(M.shape[1])
+        for _ in range(iterations):
+            x_norm = np.maximum(column_norm(P), np.asarray(abs(A).max(axis=0).todense()).ravel() if m else 0.0)
+            z_norm = np.asarray(abs(A).max(axis=1).todense()).ravel()
+            d = 1/np.sqrt(np.clip(np.where(x_norm > 0, x_norm, 1.0), 1e-4, 1e4))
+            e = 1/np.sqrt(np.clip(np.where(z_norm > 0, z_norm, 1.0), 1e-4, 1e4))
+            P = d[:, None]*P*d[None, :] if dense else sp.diags(d) @ P @ sp.diags(d)
+            q = d*q
+            A = sp.diags(e) @ A @ sp.diags(d)
+            D, E = D*d, E*e
+            gamma = 1/np.clip(max(np.mean(column_norm(P)), np.abs(q).max(initial=0.0)), 1e-4, 1e4)
+            P, q, c = gamma*P, gamma*q, gamma*c
+        return P, q, sp.csr_matrix(A), D, E, c
+
+    def _polish(self, P, q, A, l, u, z, y, delta: float = 1e-7, refinements: int = 5, active_set_iterations: int = 25):
+        """
+        Primal-dual active set refinement started from the active set guessed by ADMM (lower bound where y < 0, upper where y > 0).
+        Each pass solves the KKT system of the active rows, regularized by delta and corrected by iterative refinement, then drops
+        active rows whose multiplier has the wrong sign and adds inactive rows the solution violates, until the set is stable.
+        Returns the polished (x, z, y), or None if a solve failed.
+        """
+        equality = l == u
+        lower = (z - l < -y) | equality
+        upper = (u - z < y) & ~lower
+        for _ in range(active_set_iterations):
+            active = np.flatnonzero(lower | upper)
+            A_active = A[active]
+            b = np.where(lower, l, u)[active]
+            try:
+                linear_step = self._factorize(P, A_active, np.full(len(active), 1/delta), delta)
+            except (np.linalg.LinAlgError, RuntimeError):
+                return None
+            x, y_active = np.zeros(len(q)), np.zeros(len(active))
+            for _ in range(refinements + 1):
+                # correction from the residuals of the unregularized KKT system
+                rhs_x = -q - P @ x - A_active.T @ y_active
+                rhs_y = b - A_active @ x
+                dx, dz = linear_step(rhs_x, rhs_y, np.zeros(len(active)))
+                x, y_active = x + dx, y_active + (dz - rhs_y)/delta
+            if not np.all(np.isfinite(x)):
+                return None
+            y = np.zeros(len(l))
+            y[active] = y_active
+            Ax = A @ x
+            slack = 1e-9*np.maximum(1, np.abs(Ax))
+            sign_slack = 1e-12*np.abs(y).max(initial=1.0)
+            free = ~lower & ~upper
+            drop_lower = lower & ~equality & (y > sign_slack)
+            drop_upper = upper & (y < -sign_slack)
+            add_lower = free & (Ax < l - slack)
+            add_upper = free & (Ax > u + slack)
+            if not (drop_lower.any() or drop_upper.any() or add_lower.any() or add_upper.any()):
+                break
+            lower = (lower & ~drop_lower) | add_lower
+            upper = (upper & ~drop_upper) | add_upper
+        return x, np.clip(Ax, l, u), y
+
+    @profiling.timed('qp.solve')
+    def solve(self, P, q, A, l, u, x0: np.ndarray | None = None, y0: np.ndarray | None = None) -> QPResult:
+        """
+        P: (n, n) positive semidefinite, numpy array or scipy.sparse matrix
+        q: (n,) linear term
+        A: (m, n) constraint matrix (converted to scipy.sparse), l, u: (m,) bounds, +-inf for one-sided rows
+        x0, y0: warm start
+        Returns status 'infeasible' when the multipliers diverge along a certificate of primal infeasibility.
+        """
+        P_original = P if sp.issparse(P) else np.asarray(P, dtype=np.float64)
+        q_original = np.asarray(q, dtype=np.float64)
+        A_original = sp.csr_matrix(A, dtype=np.float64)
+        P, q, A, D, E, c = self._equilibrate(sp.csc_matrix(P_original) if sp.issparse(P_original) else P_original, q_original, A_original)
+        l = np.asarray(l, dtype=np.float64)*E
+        u = np.asarray(u, dtype=np.float64)*E
+
+        n, m = len(q), A.shape[0]
+        x = np.zeros(n) if x0 is None else np.asarray(x0, dtype=np.float64)/D
+        z = np.clip(A @ x, l, u)
+        y = np.zeros(m) if y0 is None else c*np.asarray(y0, dtype=np.float64)/E
+        rho = self.rho
+        rho_vec = self._rho_vector(rho, l, u)
+        linear_step = self._factorize(P, A, rho_vec, self.sigma)
+        AT = A.T.tocsr()
+        norm = lambda v: np.abs(v).max(initial=0.0)
+
+        def residuals(x, z, y):
+            # primal and dual residuals of the unscaled problem, and the tolerances they are held to
+            Ax, Px, ATy = A @ x, P @ x, AT @ y
+            primal_tolerance = self.eps_abs + self.eps_rel*max(norm(Ax/E), norm(z/E))
+            dual_tolerance = self.eps_abs + self.eps_rel*max(norm(Px/D), norm(ATy/D), norm(q/D))/c
+            return norm((Ax - z)/E), norm((Px + q + ATy)/D)/c, primal_tolerance, dual_tolerance
+
+        def try_polish(x, z, y):
+            polished = self._polish(P, q, A, l, u, z, y)
+            if polished is None:
+                return None
+            x_p, z_p, y_p = polished
+            Ax = A @ x_p
+            # multipliers of the wrong sign on inactive rows mean the active set guess was wrong
+            slack = 1e-9*np.maximum(1, np.abs(np.clip(Ax, -1e300, 1e300)))
+            wrong_sign = np.where(Ax - l > slack, np.maximum(-y_p, 0), 0) + np.where(u - Ax > slack, np.maximum(y_p, 0), 0)
+            primal_residual, dual_residual, primal_tolerance, dual_tolerance = residuals(x_p, z_p, y_p)
+            if primal_residual <= primal_tolerance and dual_residual <= dual_tolerance and norm(E*wrong_sign)/c <= dual_tolerance:
+                return polished
+            return None
+
+        status, iteration = 'max_iter', self.max_iter
+        attempted, next_polish, polish_gap = None, 0, self.check_every
+        for iteration in range(1, self.max_iter + 1):
+            x_tilde, z_tilde = linear_step(self.sigma*x - q, z, y)
+            x = self.alpha*x_tilde + (1 - self.alpha)*x
+            z_relaxed = self.alpha*z_tilde + (1 - self.alpha)*z
+            z_next = np.clip(z_relaxed + y/rho_vec, l, u)
+            y_step = rho_vec*(z_relaxed - z_next)
+            y = y + y_step
+            z = z_next
+            if iteration % self.check_every and iteration != self.max_iter:
+                continue
+            primal_residual, dual_residual, primal_tolerance, dual_tolerance = residuals(x, z, y)
+            if primal_residual <= primal_tolerance and dual_residual <= dual_tolerance:
+                status = 'solved'
+                break
+            # the last multiplier step is a certificate of infeasibility when A'dy ~ 0 and u'dy+ + l'dy- < 0
+            dy = E*y_step
+            if norm(dy) > 0:
+                support = np.sum(u[dy > 0]/E[dy > 0]*dy[dy > 0]) + np.sum(l[dy < 0]/E[dy < 0]*dy[dy < 0])
+                if norm((AT @ y_step)/D) <= 1e-6*norm(dy) and support < -1e-6*norm(dy):
+                    status = 'infeasible'
+                    break
+            if self.polish:
+                # the active set refinement usually finishes long before ADMM's residuals converge, try it when the guess
+                # has changed, backing off exponentially after each failure since every attempt costs factorizations
+                active = np.packbits(np.concatenate((z - l < -y, u - z < y)))
+                if iteration >= next_polish and (attempted is None or not np.array_equal(attempted, active)):
+                    attempted = active
+                    polished = try_polish(x, z, y)
+                    if polished is not None:
+                        (x, z, y), status = polished, 'solved'
+                        break
+                    polish_gap *= 2
+                    next_polish = iteration + polish_gap
+            if self.adaptive_rho:
+                # balance the relative residuals of the scaled problem, refactorizing only on a large change
+                Ax, Px, ATy = A @ x, P @ x, AT @ y
+                ratio = np.sqrt((norm(Ax - z)/max(norm(Ax), norm(z), 1e-30)) / max(norm(Px + q + ATy)/max(norm(Px), norm(ATy), norm(q), 1e-30), 1e-30))
+                new_rho = float(np.clip(rho*ratio, 1e-6, 1e6))
+                if new_rho > 5*rho or new_rho < rho/5:
+                    rho = new_rho
+                    rho_vec = self._rho_vector(rho, l, u)
+                    linear_step = self._factorize(P, A, rho_vec, self.sigma)
+
+        if self.polish and status == 'solved':
+            # tighten a converged solution to round-off
+            polished = try_polish(x, z, y)
+            if polished is not None:
+                x, z, y = polished
+
+        x, y = D*x, E*y/c
+        objective = float(0.5*x @ (P_original @ x) + q_original @ x)
+        profiling.count('qp.iterations', iteration)
+        return QPResult(x=x, y=y, status=status, iterations=iteration, objective=objective)
+
+
+class PortfolioQP:
+    """
+    The EfficientFrontier problems as convex QPs for QPSolver.
+
+    Minimum variance (optionally at a target return) is the QP min w'COV w over the budget, bound and extra constraints.
+    Max Sharpe uses the homogeneous reformulation: with y = kappa w, kappa > 0, maximizing (mu - rf)'w / sqrt(w'COV w) is
+    min y'COV y subject to (mu - rf)'y = 1 and every constraint on w multiplied through by kappa (1'y = kappa, lo kappa <= y <= hi kappa, ...),
+    which is convex, and w = y / kappa. It requires a portfolio with positive excess return to exist.
+
+    cov: (n, n) covariance array or FactorCovariance
+    mu: (n,) expected return per unit weight
+    """
+    def __init__(self, cov, mu, solver: QPSolver | None = None):
+        self.cov = cov
+        self.mu = np.asarray(mu, dtype=np.float64)
+        self.solver = solver or QPSolver()
+        self.n = len(self.mu)
+        # the objective is solved in units of the average asset variance
+        diagonal = cov.diagonal() if isinstance(cov, FactorCovariance) else np.diag(cov)
+        self.scale = 1/np.mean(diagonal)
+
+    def _problem(self, weight_constraint, constraints: PortfolioConstraints | None, homogeneous: bool, target_return=None, risk_free_rate: float = 0.0, excluded=None):
+        """
+        Returns (P, q, A, l, u) over the variables [w (or y), kappa (homogeneous only), turnover slacks t, factor exposures f].
+        """
+        n = self.n
+        constraints = constraints or PortfolioConstraints()
+        turnover = constraints.max_turnover is not None
+        factor = isinstance(self.cov, FactorCovariance)
+        k = self.cov.factor_cov.shape[0] if factor else 0
+        kappa = n if homogeneous else None
+        t0 = n + homogeneous
+        f0 = t0 + (n if turnover else 0)
+        size = f0 + k
+
+        rows, lower, upper = [], [], []
+
+        def add(block, l, u):
+            # block: (r, size) row block, l and u broadcast to r rows
+            block = sp.csr_matrix(block)
+            rows.append(block)
+            lower.append(np.broadcast_to(np.asarray(l, dtype=np.float64), (block.shape[0],)))
+            upper.append(np.broadcast_to(np.asarray(u, dtype=np.float64), (block.shape[0],)))
+
+        def on(columns, start=0, width=None):
+            # places a (r, width) block at column offset start of a (r, size) row block
+            columns = sp.csr_matrix(columns)
+            width = columns.shape[1] if width is None else width
+            return sp.hstack([sp.csr_matrix((columns.shape[0], start)), columns, sp.csr_matrix((columns.shape[0], size - start - width))])
+
+        def with_kappa(block, coefficient):
+            # block on w plus coefficient * kappa in the homogeneous problem
+            block = sp.csr_matrix(block)
+            return on(block) + on(sp.csr_matrix(np.asarray(coefficient, dtype=np.float64).reshape(-1, 1)), kappa, 1)
+
+        lo, hi = (None, None) if weight_constraint is None else weight_constraint
+        lo = np.broadcast_to(np.asarray(-np.inf if lo is None else lo, dtype=np.float64), (n,))
+        hi = np.broadcast_to(np.asarray(np.inf if hi is None else hi, dtype=np.float64), (n,))
+        identity = sp.eye(n, format='csr')
+        if not homogeneous:
+            add(on(identity), lo, hi)
+            add(on(np.ones((1, n))), 1.0, 1.0)
+            if target_return is not None:
+                add(on(self.mu[None, :]), target_return, target_return)
+        else:
+            for bound, l, u in ((lo, 0.0, np.inf), (hi, -np.inf, 0.0)):
+                finite = np.flatnonzero(np.isfinite(bound))
+                if len(finite):
+                    add(with_kappa(identity[finite], -bound[finite]), l, u)
+            add(with_kappa(np.ones((1, n)), -1.0), 0.0, 0.0)
+            add(on(self.mu[None, :] - risk_free_rate), 1.0, 1.0)
+            add(on(np.ones((1, 1)), kappa, 1), 0.0, np.inf)
+        if excluded is not None and len(excluded):
+            add(on(identity[excluded]), 0.0, 0.0)
+
+        if constraints.sectors is not None and constraints.sector_bounds:
+            sectors = np.asarray(constraints.sectors)
+            for label, (sector_lo, sector_hi) in constraints.sector_bounds.items():
+                member = (sectors == label).astype(np.float64)[None, :]
+                sector_lo = -np.inf if sector_lo is None else sector_lo
+                sector_hi = np.inf if sector_hi is None else sector_hi
+                if not homogeneous:
+                    add(on(member), sector_lo, sector_hi)
+                    continue
+                if np.isfinite(sector_lo):
+                    add(with_kappa(member, -sector_lo), 0.0, np.inf)
+                if np.isfinite(sector_hi):
+                    add(with_kappa(member, -sector_hi), -np.inf, 0.0)
+
+        if turnover:
+            # t >= |w - current|, 1't <= max_turnover (all multiplied by kappa in the homogeneous problem)
+            current = np.broadcast_to(np.asarray(0.0 if constraints.current_weights is None else constraints.current_weights, dtype=np.float64), (n,))
+            slack = on(identity, t0, n)
+            if not homogeneous:
+                add(on(identity) - slack, -np.inf, current)
+                add(on(identity) + slack, current, np.inf)
+                add(on(np.ones((1, n)), t0, n), -np.inf, constraints.max_turnover)
+            else:
+                add(with_kappa(identity, -current) - slack, -np.inf, 0.0)
+                add(with_kappa(identity, -current) + slack, 0.0, np.inf)
+                add(on(np.ones((1, n)), t0, n) + on(np.array([[-constraints.max_turnover]]), kappa, 1), -np.inf, 0.0)
+
+        if factor:
+            # factor exposures f = B'w as variables, w'COV w = f'F f + w'Dw
+            add(on(self.cov.loadings.T) - on(sp.eye(k), f0, k), 0.0, 0.0)
+            P = sp.block_diag([sp.diags(2*self.scale*self.cov.specific), sp.csr_matrix((f0 - n, f0 - n)), 2*self.scale*self.cov.factor_cov], format='csc')
+        else:
+            P = np.zeros((size, size))
+            P[:n, :n] = 2*self.scale*np.asarray(self.cov)
+        return P, np.zeros(size), sp.vstack(rows, format='csr'), np.concatenate(lower), np.concatenate(upper)
+
+    def _solve(self, weight_constraint, constraints, homogeneous: bool, target_return=None, risk_free_rate: float = 0.0, warm_start: QPResult | None = None) -> tuple[np.ndarray, QPResult]:
+        def run(excluded, warm_start):
+            problem = self._problem(weight_constraint, constraints, homogeneous, target_return, risk_free_rate, excluded)
+            x0 = y0 = None
+            if warm_start is not None and len(warm_start.x) == len(problem[1]):
+                x0 = warm_start.x
+                y0 = warm_start.y if len(warm_start.y) == len(problem[3]) else None
+            result = self.solver.solve(*problem, x0=x0, y0=y0)
+            if not homogeneous:
+                return result.x[:self.n].copy(), result
+            kappa = result.x[self.n]
+            if not kappa > 0:
+                result.status = 'infeasible'
+                return np.full(self.n, np.nan), result
+            return result.x[:self.n]/kappa, result
+
+        weights, result = run(None, warm_start)
+        max_assets = constraints.max_assets if constraints is not None else None
+        if max_assets is not None and np.count_nonzero(np.abs(weights) > 1e-8) > max_assets:
+            # cardinality relaxation: keep the max_assets largest positions of the continuous solution and re-solve
+            excluded = np.sort(np.argsort(-np.abs(weights))[max_assets:])
+            weights, result = run(excluded, None)
+            weights[excluded] = 0.0
+        return weights, result
+
+    def min_variance(self, weight_constraint: tuple = (0,1), constraints: PortfolioConstraints | None = None, target_return: float | None = None, warm_start: QPResult | None = None) -> tuple[np.ndarray, QPResult]:
+        """
+        Returns the weights and solver result of the minimum variance portfolio, at target_return if given.
+        warm_start: the result of a related solve (e.g. the previous point of a frontier)
+        """
+        return self._solve(weight_constraint, constraints, False, target_return=target_return, warm_start=warm_start)
+
+    def max_sharpe(self, risk_free_rate: float = 0.0, weight_constraint: tuple = (0,1), constraints: PortfolioConstraints | None = None) -> tuple[np.ndarray, QPResult]:
+        """
+        Returns the weights and solver result of the maximum Sharpe ratio portfolio.
+        """
+        return self._solve(weight_constraint, constraints, True, risk_free_rate=risk_free_rate)
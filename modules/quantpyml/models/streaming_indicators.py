@@ -0,0 +1,308 @@
+import copy
+import math
+from collections import deque
+from dataclasses import dataclass
+from quantpyml.common import Bar, check_period
+
+# Stateful counterparts of Indicators: every update(bar) costs O(1) (amortized) instead of a rerun over the whole history.
+# Each one follows the talipp formulas Indicators uses, so feeding a series bar by bar reproduces the Indicators output.
+# Attach them to a live StockChart with chart.attach(indicator) to have every appended bar pushed through them.
+
+RESUM_EVERY = 1024 # running sums are recomputed exactly this often to keep floating point drift bounded
+
+class StreamingIndicator:
+    """
+    Base class. update accepts a number or a Bar (reading the source field), returns the latest value and stores it in value.
+    value is None during warm-up, like the None entries of the talipp output.
+    """
+    def __init__(self, source: str = 'close'):
+        self.source = source
+        self.value = None
+
+    def update(self, bar: Bar | float):
+        x = getattr(bar, self.source) if isinstance(bar, Bar) else bar
+        self.value = self._update(float(x))
+        return self.value
+
+    def _update(self, x: float):
+        raise NotImplementedError
+
+    def snapshot(self) -> dict:
+        """
+        Returns a copy of the full internal state, to be restored with restore.
+        """
+        return copy.deepcopy(self.__dict__)
+
+    def restore(self, state: dict):
+        self.__dict__.update(copy.deepcopy(state))
+        return self
+
+
+class _RollingWindow:
+    """
+    Fixed-size window with a running sum.
+    """
+    def __init__(self, period: int):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.sum = 0.0
+        self.updates = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.period
+
+    def push(self, x: float) -> float | None:
+        """
+        Adds x and returns the value that fell out of the window, if any.
+        """
+        dropped = self.values[0] if self.full else None
+        self.values.append(x)
+        self.sum += x - (dropped or 0.0)
+        self.updates += 1
+        if self.updates % RESUM_EVERY == 0:
+            self.sum = math.fsum(self.values)
+        return dropped
+
+
+class _RollingExtreme:
+    """
+    Rolling max (or min) over the last period values with a monotonic deque, O(1) amortized per push.
+    """
+    def __init__(self, period: int, largest: bool = True):
+        self.period = period
+        self.sign = 1.0 if largest else -1.0
+        self.candidates = deque()
+        self.count = 0
+
+    def push(self, x: float):
+        key = self.sign * x
+        while self.candidates and self.candidates[-1][1] <= key:
+            self.candidates.pop()
+        self.candidates.append((self.count, key))
+        self.count += 1
+        if self.candidates[0][0] <= self.count - 1 - self.period:
+            self.candidates.popleft()
+
+    @property
+    def value(self) -> float:
+        return self.sign * self.candidates[0][1]
+
+
+class StreamingSMA(StreamingIndicator):
+    """
+    Simple Moving Average
+    https://www.investopedia.com/terms/s/sma.asp
+    """
+    def __init__(self, period: int = 14, source: str = 'close'):
+        super().__init__(source)
+        self.period = check_period('SMA', period)
+        self.window = _RollingWindow(period)
+
+    def _update(self, x: float):
+        self.window.push(x)
+        return self.window.sum / self.period if self.window.full else None
+
+
+class StreamingEMA(StreamingIndicator):
+    """
+    Exponential Moving Average
+    https://www.investopedia.com/terms/e/ema.asp
+    """
+    def __init__(self, period: int = 14, source: str = 'close'):
+        super().__init__(source)
+        self.period = check_period('EMA', period)
+        self.mult = 2.0 / (period + 1.0)
+        self.seed = _RollingWindow(period)
+
+    def _update(self, x: float):
+        if self.value is not None:
+            return self.mult * x + (1.0 - self.mult) * self.value
+        # seeded with the SMA of the first period values
+        self.seed.push(x)
+        return self.seed.sum / self.period if self.seed.full else None
+
+
+class StreamingWMA(StreamingIndicator):
+    """
+    Weighted Moving Average, the building block of the HMA.
+    """
+    def __init__(self, period: int = 14, source: str = 'close'):
+        super().__init__(source)
+        self.period = check_period('WMA', period)
+        self.denominator = period * (period + 1) / 2.0
+        self.window = _RollingWindow(period)
+        self.numerator = 0.0
+
+    def _update(self, x: float):
+        previous_sum = self.window.sum
+        was_full = self.window.full
+        self.window.push(x)
+        if not self.window.full:
+            return None
+        if not was_full or self.window.updates % RESUM_EVERY == 0:
+            self.numerator = math.fsum(w * v for w, v in enumerate(self.window.values, start=1))
+        else:
+            # every weight drops by one and the new value enters with the full weight
+            self.numerator += self.period * x - previous_sum
+        return self.numerator / self.denominator
+
+
+class StreamingHMA(StreamingIndicator):
+    """
+    Hull Moving Average
+    https://chartschool.stockcharts.com/table-of-contents/technical-indicators-and-overlays/technical-overlays/hull-moving-average-hma
+    """
+    def __init__(self, period: int = 14, source: str = 'close'):
+        super().__init__(source)
+        self.period = check_period('HMA', period, 2)
+        self.wma = StreamingWMA(period)
+        self.wma2 = StreamingWMA(int(period / 2))
+        self.hma = StreamingWMA(int(math.sqrt(period)))
+        self.valid_wma = 0
+
+    def _update(self, x: float):
+        wma = self.wma.update(x)
+        wma2 = self.wma2.update(x)
+        if wma is None:
+            return None
+        # talipp waits for sqrt(period) values of the slow WMA before feeding the outer one
+        self.valid_wma += 1
+        if self.valid_wma < self.hma.period:
+            return None
+        return self.hma.update(2.0 * wma2 - wma)
+
+
+class StreamingRSI(StreamingIndicator):
+    """
+    Relative Strength Index
+    https://www.investopedia.com/terms/r/rsi.asp
+    """
+    def __init__(self, period: int = 14, source: str = 'close'):
+        super().__init__(source)
+        self.period = check_period('RSI', period, 2)
+        self.previous = None
+        self.initial_changes = []
+        self.avg_gain = None
+        self.avg_loss = None
+
+    def _update(self, x: float):
+        previous, self.previous = self.previous, x
+        if previous is None:
+            return None
+        change = x - previous
+        if self.avg_gain is None:
+            if len(self.initial_changes) < self.period - 1:
+                self.initial_changes.append(change)
+                return None
+            # seeded with the mean gain/loss of the first period-1 changes, as talipp
+            self.avg_gain = sum(c for c in self.initial_changes if c > 0) / (self.period - 1)
+            self.avg_loss = sum(-c for c in self.initial_changes if c < 0) / (self.period - 1)
+            self.initial_changes = []
+        self.avg_gain = (self.avg_gain * (self.period - 1) + max(change, 0.0)) / self.period
+        self.avg_loss = (self.avg_loss * (self.period - 1) + max(-change, 0.0)) / self.period
+        if self.avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+
+@dataclass
+class BBValue:
+    top: float
+    mid: float
+    bot: float
+
+
+class StreamingBollingerBands(StreamingIndicator):
+    """
+    Bollinger Bands
+    https://www.investopedia.com/terms/b/bollingerbands.asp
+    """
+    def __init__(self, period: int = 14, stdev_multiplier: float = 2.0, source: str = 'close'):
+        super().__init__(source)
+        self.period = check_period('BollingerBands', period)
+        self.stdev_multiplier = stdev_multiplier
+        self.window = _RollingWindow(period)
+        self.mean = 0.0
+        self.m2 = 0.0 # sum of squared deviations from the mean over the window
+
+    def _update(self, x: float):
+        dropped = self.window.push(x)
+        if not self.window.full:
+            return None
+        if dropped is None or self.window.updates % RESUM_EVERY == 0:
+            self.mean = self.window.sum / self.period
+            self.m2 = math.fsum((v - self.mean)**2 for v in self.window.values)
+        else:
+            # sliding-window Welford update
+            mean = self.mean + (x - dropped) / self.period
+            self.m2 += (x - dropped) * (x - mean + dropped - self.mean)
+            self.mean = mean
+            # the update cancels badly on near-flat windows, recompute those exactly
+            if self.m2 <= 1e-6 * self.period * self.mean**2:
+                self.m2 = math.fsum((v - self.mean)**2 for v in self.window.values)
+        width = self.stdev_multiplier * math.sqrt(max(self.m2, 0.0) / self.period)
+        return BBValue(top=self.mean + width, mid=self.mean, bot=self.mean - width)
+
+
+@dataclass
+class IchimokuValue:
+    base: float | None
+    conversion: float | None
+    lag: float | None
+    cloud_fast: float | None
+    cloud_slow: float | None
+
+
+class StreamingIchimoku(StreamingIndicator):
+    """
+    Ichimoku Cloud, takes Bars. Parameters as Indicators.Ichimoku.
+    https://www.investopedia.com/terms/i/ichimoku-cloud.asp
+    """
+    def __init__(self, kijun_period: int = 26, tenkan_period: int = 9, chikou_period: int = 26, senkou_fast_period: int = 52, senkou_slow_period: int = 26):
+        super().__init__(source=None)
+        self.kijun_period = kijun_period
+        self.tenkan_period = tenkan_period
+        self.chikou_period = chikou_period
+        self.cloud_period = senkou_fast_period # window of the slow leading span
+        self.lookup = senkou_slow_period # displacement of the leading spans
+        self.count = 0
+        self.kijun = (_RollingExtreme(kijun_period), _RollingExtreme(kijun_period, largest=False))
+        self.tenkan = (_RollingExtreme(tenkan_period), _RollingExtreme(tenkan_period, largest=False))
+        self.cloud = (_RollingExtreme(self.cloud_period), _RollingExtreme(self.cloud_period, largest=False))
+        # bars and lines delayed by lookup + 1 bars for the leading spans
+        self.delayed_bars = deque(maxlen=self.lookup + 1)
+        self.base_history = deque(maxlen=self.lookup + 1)
+        self.conversion_history = deque(maxlen=self.lookup + 1)
+
+    def update(self, bar: Bar):
+        self.value = self._update(bar)
+        return self.value
+
+    def _update(self, bar: Bar):
+        self.count += 1
+        for extremes in (self.kijun, self.tenkan):
+            extremes[0].push(bar.high)
+            extremes[1].push(bar.low)
+
+        base = conversion = lag = cloud_fast = cloud_slow = None
+        if self.count >= self.kijun_period:
+            base = (self.kijun[0].value + self.kijun[1].value) / 2.0
+            self.base_history.append(base)
+        if self.count >= self.tenkan_period:
+            conversion = (self.tenkan[0].value + self.tenkan[1].value) / 2.0
+            self.conversion_history.append(conversion)
+        if self.count >= self.chikou_period:
+            lag = bar.close
+        if len(self.base_history) > self.lookup and len(self.conversion_history) > self.lookup:
+            cloud_fast = (self.base_history[0] + self.conversion_history[0]) / 2.0
+
+        if len(self.delayed_bars) == self.delayed_bars.maxlen:
+            high, low = self.delayed_bars[0]
+            self.cloud[0].push(high)
+            self.cloud[1].push(low)
+        self.delayed_bars.append((bar.high, bar.low))
+        if self.count >= self.cloud_period + self.lookup + 1:
+            cloud_slow = (self.cloud[0].value + self.cloud[1].value) / 2.0
+
+        return IchimokuValue(base, conversion, lag, cloud_fast, cloud_slow)
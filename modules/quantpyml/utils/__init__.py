@@ -0,0 +1,4 @@
+from .returns import Returns, Drawdowns
+from .profiling import Profiler, JSONLinesSink
+
+__all__ = ['Returns', 'Drawdowns', 'Profiler', 'JSONLinesSink']
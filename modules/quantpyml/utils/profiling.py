@@ -0,0 +1,261 @@
+import atexit
+import functools
+import json
+import math
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+# Instrumentation of the hot paths (Market requests, Indicators, EfficientFrontier solves, BrownianMotion simulations,
+# BlackScholes chains). Instrumented code calls the functions of this module, which record into the active Profiler
+# and return immediately when there is none: a disabled call costs one global lookup and an `is None` check, with no
+# timing, locking or allocation. Profile a block with `with Profiler() as profiler:`, or a whole job by setting
+# QUANTPYML_PROFILE to a file path, which profiles from import to exit and appends the report to that file as one JSON line.
+
+_profiler = None
+# started profilers, the last one is _profiler
+_stack = []
+_stack_lock = threading.Lock()
+
+# latency histogram buckets, powers of two from 1 microsecond to about 9.5 hours
+BUCKETS = tuple(2.0**k*1e-6 for k in range(36))
+
+@dataclass
+class Histogram:
+    """
+    Latencies of one instrumented call, counts[i] calls took at most BUCKETS[i] seconds (and more than BUCKETS[i - 1]).
+    """
+    calls: int = 0
+    total: float = 0.0
+    min: float = math.inf
+    max: float = 0.0
+    counts: list[int] = field(default_factory=lambda: [0]*(len(BUCKETS) + 1))
+
+    def add(self, seconds: float):
+        self.calls += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        # index of the first bucket bound >= seconds
+        index = 0 if seconds <= BUCKETS[0] else min(len(BUCKETS), math.ceil(math.log2(seconds/BUCKETS[0])))
+        self.counts[index] += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q quantile, capped at the largest latency seen.
+        """
+        rank, seen = q*self.calls, 0
+        for bound, count in zip(BUCKETS + (math.inf,), self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            'calls': self.calls,
+            'total': self.total,
+            'mean': self.total/self.calls if self.calls else 0.0,
+            'min': self.min if self.calls else 0.0,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'histogram': {('inf' if math.isinf(bound) else f'{bound:.6g}'): count for bound, count in zip(BUCKETS + (math.inf,), self.counts) if count},
+        }
+
+
+class Profiler:
+    """
+    Collects the instrumentation of everything run while it is active, from every thread. Use as a context manager
+    (or start/stop); profilers nest, the last one started records alone until it stops and the one started before it
+    resumes. Profilers may stop in any order, a stopped profiler never stays active.
+
+    trace_memory: also record the peak traced allocation (numpy arrays and Python objects, see tracemalloc) of every timed call.
+                  tracemalloc slows allocation-heavy code down noticeably, leave it off to measure latencies.
+    sink: called with the report when the profiler stops, e.g. JSONLinesSink(path)
+    """
+    def __init__(self, trace_memory: bool = False, sink=None):
+        self.trace_memory = trace_memory
+        self.sink = sink
+        self.counters = {}
+        self.timings = {}
+        self.peaks = {}
+        self.started = None
+        self.stopped = None
+        self._lock = threading.Lock()
+        self._traced_here = False
+        self._frames = threading.local()
+
+    def start(self) -> 'Profiler':
+        global _profiler
+        with _stack_lock:
+            _stack.append(self)
+            _profiler = self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._traced_here = True
+        self.started = time.time()
+        return self
+
+    def stop(self) -> 'Profiler':
+        global _profiler
+        self.stopped = time.time()
+        with _stack_lock:
+            if self in _stack:
+                _stack.remove(self)
+            _profiler = _stack[-1] if _stack else None
+        if self._traced_here:
+            tracemalloc.stop()
+            self._traced_here = False
+        if self.sink is not None:
+            self.sink(self.report())
+        return self
+
+    def __enter__(self) -> 'Profiler':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, name: str, value: float):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.timings.get(name)
+            if histogram is None:
+                histogram = self.timings[name] = Histogram()
+            histogram.add(seconds)
+
+    def _peak(self, name: str, nbytes: int):
+        with self._lock:
+            self.peaks[name] = max(self.peaks.get(name, 0), nbytes)
+
+    def _enter_frame(self):
+        """
+        Starts measuring the peak allocation of a timed call. Nested timed calls reset tracemalloc's peak, so the peak
+        each one saw is folded back into the frames around it.
+        """
+        frames = self._frames.__dict__.setdefault('stack', [])
+        current, peak = tracemalloc.get_traced_memory()
+        if frames:
+            frames[-1][1] = max(frames[-1][1], peak)
+        tracemalloc.reset_peak()
+        frames.append([current, current])
+
+    def _exit_frame(self) -> int:
+        frames = self._frames.stack
+        base, peak = frames.pop()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        if frames:
+            frames[-1][1] = max(frames[-1][1], peak)
+        return peak - base
+
+    def report(self) -> dict:
+        """
+        Structured report: counters, latency summaries (seconds) and peak sizes (bytes) by name.
+        """
+        with self._lock:
+            return {
+                'started': self.started,
+                'duration': ((self.stopped or time.time()) - self.started) if self.started else 0.0,
+                'pid': os.getpid(),
+                'counters': dict(self.counters),
+                'timings': {name: histogram.summary() for name, histogram in self.timings.items()},
+                'peaks': dict(self.peaks),
+            }
+
+    def format(self) -> str:
+        """
+        The report as a plain text table.
+        """
+        report = self.report()
+        lines = [f'{"timing":<48} {"calls":>8} {"total s":>10} {"mean ms":>10} {"p50 ms":>10} {"p99 ms":>10} {"max ms":>10}']
+        for name, t in sorted(report['timings'].items(), key=lambda item: -item[1]['total']):
+            lines.append(f'{name:<48} {t["calls"]:>8} {t["total"]:>10.4f} {t["mean"]*1e3:>10.3f} {t["p50"]*1e3:>10.3f} {t["p99"]*1e3:>10.3f} {t["max"]*1e3:>10.3f}')
+        if report['counters']:
+            lines.append(f'\n{"counter":<48} {"value":>12}')
+            lines.extend(f'{name:<48} {value:>12g}' for name, value in sorted(report['counters'].items()))
+        if report['peaks']:
+            lines.append(f'\n{"peak":<48} {"MiB":>12}')
+            lines.extend(f'{name:<48} {value/2**20:>12.2f}' for name, value in sorted(report['peaks'].items()))
+        return '\n'.join(lines)
+
+    def to_json(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=1)
+
+
+class JSONLinesSink:
+    """
+    Local metrics sink: appends every report it receives to a file as one JSON line, for a collector to tail or a
+    notebook to load with pandas.read_json(path, lines=True).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, report: dict):
+        line = json.dumps(report)
+        with self._lock, open(self.path, 'a') as f:
+            f.write(line + '\n')
+
+
+# instrumentation, no-ops without an active profiler
+
+def active() -> bool:
+    return _profiler is not None
+
+def count(name: str, value: float = 1):
+    """
+    Adds value to a counter (calls, bytes fetched, cache hits, solver iterations, ...).
+    """
+    if _profiler is not None:
+        _profiler._count(name, value)
+
+def observe(name: str, seconds: float):
+    """
+    Records one latency in a histogram.
+    """
+    if _profiler is not None:
+        _profiler._observe(name, seconds)
+
+def peak(name: str, nbytes: int):
+    """
+    Keeps the largest size seen (e.g. the bytes of the tensors a simulation allocates, which tracemalloc does not see).
+    """
+    if _profiler is not None:
+        _profiler._peak(name, nbytes)
+
+def timed(name: str):
+    """
+    Decorator recording the latency of every call under name (and its peak traced allocation with trace_memory).
+    Put it below @classmethod/@staticmethod.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return function(*args, **kwargs)
+            memory = profiler.trace_memory and tracemalloc.is_tracing()
+            if memory:
+                profiler._enter_frame()
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler._observe(name, time.perf_counter() - start)
+                if memory:
+                    profiler._peak(name, profiler._exit_frame())
+        return wrapper
+    return decorator
+
+
+if os.environ.get('QUANTPYML_PROFILE'):
+    # profile the whole process, the report is written when the interpreter exits
+    atexit.register(Profiler(sink=JSONLinesSink(os.environ['QUANTPYML_PROFILE'])).start().stop)
@@ -1,14 +1,169 @@
+from dataclasses import dataclass, replace
+import numpy as np
 from quantpyml.common import StockChart
 from quantpyml.common import Line
 
+# Vectorized returns and risk statistics. Every function takes a Line, a StockChart (its closes), a 1-D array or a 2-D
+# (assets, time) array, oldest first, or a list of Lines/StockCharts of equal length stacked as the rows of a panel.
+# 1-D input gives 1-D output. Rolling windows use cumulative sums and EWMA filters run as scipy.signal.lfilter, so
+# everything is O(n) with no per-element Python work. The (assets, time) output feeds EfficientFrontier directly.
+# scipy.signal is imported on first use, it is slow to import (it pulls in scipy.stats).
+
+@dataclass
+class Drawdowns:
+    """
+    Result of Returns.drawdowns, arrays shaped like the prices (max_drawdown has one entry per row).
+    drawdown: price relative to the running peak minus one (0 at a new high, -0.25 at 25% below it)
+    duration: bars since the running peak
+    """
+    drawdown: np.ndarray
+    duration: np.ndarray
+    max_drawdown: np.ndarray | float
+
+
 class Returns:
+    @staticmethod
+    def _panel(series) -> tuple[np.ndarray, int]:
+        """
+        Returns the input as a 2-D float64 (rows, time) array, not copied when it already is one, and the input's number of dimensions.
+        """
+        if isinstance(series, (list, tuple)) and series and isinstance(series[0], (Line, StockChart)):
+            rows = [Returns._panel(s)[0][0] for s in series]
+            if len({len(row) for row in rows}) > 1:
+                raise ValueError('All series of a panel must have the same length')
+            return np.vstack(rows), 2
+        if isinstance(series, StockChart):
+            series = series.closes
+        elif isinstance(series, Line):
+            series = series.values
+        x = np.asarray(series, dtype=np.float64)
+        return np.atleast_2d(x), x.ndim
+
+    @staticmethod
+    def _rolling_moments(x: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rolling mean and sample variance (window - 1 denominator) over the trailing window, NaN for the first window-1 entries
+        and for every window containing a NaN (as pandas rolling with the default min_periods).
+        Window sums are differences of cumulative sums, computed in place to keep the temporaries to a minimum.
+        """
+        mean, variance = np.full_like(x, np.nan), np.full_like(x, np.nan)
+        if window > x.shape[1]:
+            return mean, variance
+        missing = np.isnan(x)
+        # shifting each row by its first valid value keeps the cumulative sums small, the variance does not change
+        shift = np.take_along_axis(x, np.argmax(~missing, axis=1)[:, None], axis=1)
+        np.nan_to_num(shift, copy=False)
+        centered = x - shift
+        # NaNs enter the sums as zeros, so one missing value only affects the windows that contain it
+        centered[missing] = 0.0
+        sums = np.zeros((2, x.shape[0], x.shape[1] + 1))
+        np.cumsum(centered, axis=1, out=sums[0, :, 1:])
+        np.cumsum(np.multiply(centered, centered, out=centered), axis=1, out=sums[1, :, 1:])
+        s1, s2 = sums[:, :, window:] - sums[:, :, :-window]
+        if missing.any():
+            counts = np.zeros((x.shape[0], x.shape[1] + 1))
+            np.cumsum(missing, axis=1, out=counts[:, 1:])
+            incomplete = (counts[:, window:] - counts[:, :-window]) > 0
+            s1[incomplete] = np.nan
+            s2[incomplete] = np.nan
+        s1 /= window
+        s2 -= window*s1*s1
+        np.maximum(s2, 0.0, out=s2)
+        s2 /= window - 1
+        mean[:, window - 1:] = s1 + shift
+        variance[:, window - 1:] = s2
+        return mean, variance
+
+    @staticmethod
+    def _restore(values: np.ndarray, ndim: int) -> np.ndarray:
+        return values if ndim > 1 else values[0]
+
     @classmethod
-    def calculate_returns(cls, series: Line | list[float], period: int = 1) -> Line:
-        pass
+    def calculate_returns(cls, series: Line | list[float], period: int = 1, log: bool = False, overlapping: bool = True) -> Line:
+        """
+        Returns over period bars, p[t]/p[t - period] - 1 (or log(p[t]/p[t - period])), period fewer entries than the prices.
+        overlapping: a return at every bar; False gives one return per block of period bars (ending at the last bar), e.g. weekly returns from daily prices
+        """
+        x, ndim = cls._panel(series)
+        if overlapping:
+            start, end = x[:, :-period], x[:, period:]
+        else:
+            sampled = x[:, (x.shape[1] - 1) % period::period]
+            start, end = sampled[:, :-1], sampled[:, 1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.log(end/start) if log else end/start - 1
+        return Line(period=period, values=cls._restore(returns, ndim))
 
+    @classmethod
+    def calculate_returns_chart(cls, prices: StockChart | list[float]) -> StockChart:
+        """
+        Returns a chart of one-bar returns: each bar's open, high, low and close relative to the previous close, minus one.
+        Volume and metadata are kept, the first bar is dropped. A plain price series gives a chart with every price column equal.
+        """
+        if not isinstance(prices, StockChart):
+            closes = np.asarray(prices.values if isinstance(prices, Line) else prices, dtype=np.float64)
+            prices = StockChart('', '', '', '', '', '', '', timestamp=np.arange(len(closes)).astype('datetime64[ns]'), volume=np.zeros(len(closes)),
+                                opens=closes, highs=closes, lows=closes, closes=closes)
+        previous = prices.closes[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            columns = {name: getattr(prices, name)[1:]/previous - 1 for name in ('opens', 'highs', 'lows', 'closes')}
+        return replace(prices[1:], **columns)
+
+    @classmethod
+    def rolling_volatility(cls, returns: Line | list[float], window: int = 20, periods_per_year: int | None = None) -> Line:
+        """
+        Standard deviation of the returns over a trailing window (sample, as pandas rolling().std()), NaN for the first window-1 entries.
+        periods_per_year: annualize by sqrt(periods_per_year), e.g. 252 for daily returns
+        """
+        x, ndim = cls._panel(returns)
+        volatility = np.sqrt(cls._rolling_moments(x, window)[1])
+        if periods_per_year is not None:
+            volatility *= np.sqrt(periods_per_year)
+        return Line(period=window, values=cls._restore(volatility, ndim))
+
+    @classmethod
+    def ewma_volatility(cls, returns: Line | list[float], decay: float = 0.94, periods_per_year: int | None = None) -> Line:
+        """
+        RiskMetrics volatility, var[t] = decay*var[t - 1] + (1 - decay)*r[t]^2 (zero mean), seeded with the first squared return.
+        Same as pandas ewm(alpha=1 - decay, adjust=False).mean() of the squared returns.
+        """
+        from scipy.signal import lfilter
+        x, ndim = cls._panel(returns)
+        squared = x*x
+        variance = lfilter([1 - decay], [1, -decay], squared, axis=1, zi=decay*squared[:, :1])[0]
+        volatility = np.sqrt(variance)
+        if periods_per_year is not None:
+            volatility *= np.sqrt(periods_per_year)
+        return Line(period=None, values=cls._restore(volatility, ndim))
+
+    @classmethod
+    def rolling_sharpe(cls, returns: Line | list[float], window: int = 252, risk_free_rate: float = 0.0, periods_per_year: int = 252) -> Line:
+        """
+        Annualized Sharpe ratio over a trailing window, sqrt(periods_per_year) * mean(r - rf) / std(r), NaN for the first window-1 entries.
+        risk_free_rate: annual rate, spread evenly over the periods of a year
+        """
+        x, ndim = cls._panel(returns)
+        mean, variance = cls._rolling_moments(x, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = (mean - risk_free_rate/periods_per_year)/np.sqrt(variance)*np.sqrt(periods_per_year)
+        return Line(period=window, values=cls._restore(sharpe, ndim))
 
     @classmethod
-    def calculate_returns_chart(cls, prices: list[float]) -> StockChart:
-        pass
-    
-    
\ No newline at end of file
+    def drawdowns(cls, series: Line | list[float], from_returns: bool = False, log: bool = False) -> Drawdowns:
+        """
+        Drawdowns from the running peak of a price series.
+        from_returns: the input is simple (or log, with log=True) returns, compounded into a price path starting at 1 (one entry longer)
+        """
+        x, ndim = cls._panel(series)
+        if from_returns:
+            growth = np.cumsum(x, axis=1) if log else np.cumsum(np.log1p(x), axis=1)
+            x = np.exp(np.concatenate((np.zeros((len(x), 1)), growth), axis=1))
+        peak = np.maximum.accumulate(x, axis=1)
+        drawdown = x/peak - 1
+        index = np.broadcast_to(np.arange(x.shape[1]), x.shape)
+        peak_index = np.maximum.accumulate(np.where(x >= peak, index, 0), axis=1)
+        return Drawdowns(
+            drawdown=cls._restore(drawdown, ndim),
+            duration=cls._restore(index - peak_index, ndim),
+            max_drawdown=cls._restore(drawdown.min(axis=1), ndim)
+        )
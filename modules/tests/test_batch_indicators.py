@@ -0,0 +1,11 @@
+import numpy as np
+import pytest
+from quantpyml.models import BatchIndicators
+
+@pytest.mark.parametrize('name, period', [('SMA', 0), ('EMA', 0), ('BollingerBands', 0), ('HMA', 1), ('RSI', 1)])
+def test_rejects_short_periods(name, period):
+    with pytest.raises(ValueError, match=f'{name} period'):
+        getattr(BatchIndicators, name)(np.arange(50.0), period)
+
+def test_smallest_hma_period():
+    assert np.isfinite(BatchIndicators.HMA(np.arange(50.0), 2).values).any()
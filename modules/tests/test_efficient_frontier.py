@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from quantpyml.models import EfficientFrontier
+
+@pytest.fixture
+def frontier():
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.0005, 0.01, (10, 252)) + rng.normal(0, 0.005, 252)
+    return EfficientFrontier([f'A{i}' for i in range(10)], returns, 252)
+
+def test_max_sharpe_succeeds(frontier):
+    success, weights, *_ = frontier.max_sharpe()
+    assert success
+    assert weights.sum() == pytest.approx(1.0)
+
+def test_min_variance_matches_qp(frontier):
+    qp = EfficientFrontier(frontier.TICKERS, frontier.RETURNS, 252, backend='qp')
+    assert frontier.min_variance()[0]
+    assert frontier.min_variance()[4] == pytest.approx(qp.min_variance()[4], rel=1e-6)
+
+def test_cached_weights_are_copies(frontier):
+    weights = frontier.min_variance()[1]
+    expected = weights.copy()
+    weights[:] = 0
+    assert np.array_equal(frontier.min_variance()[1], expected)
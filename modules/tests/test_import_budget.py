@@ -0,0 +1,10 @@
+import pytest
+from benchmarks.imports import BUDGETS, check
+
+# The import time budget of benchmarks/imports.py, every statement in a fresh interpreter.
+
+@pytest.mark.parametrize('budget', BUDGETS, ids=[budget.statement for budget in BUDGETS])
+def test_import_budget(budget):
+    result = check(budget)
+    assert not result.loaded, f'{budget.statement} imports {", ".join(result.loaded)}'
+    assert result.passed, f'{budget.statement} took {result.seconds*1e3:.1f} ms, over its {budget.seconds*1e3:.0f} ms budget'
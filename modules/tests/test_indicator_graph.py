@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+from quantpyml.models import BatchIndicators, IndicatorGraph
+from benchmarks.data import stock_chart
+
+@pytest.mark.parametrize('request_', [('SMA', 0), ('EMA', 0), ('WMA', 0), ('BollingerBands', 0), ('HMA', 1), ('RSI', 1), ('Ichimoku', 0)])
+def test_rejects_short_periods(request_):
+    with pytest.raises(ValueError, match='period must be at least'):
+        IndicatorGraph().evaluate(stock_chart(100), [request_])
+
+def test_matches_batch_indicators():
+    chart = stock_chart(500)
+    results = IndicatorGraph().evaluate(chart, [('SMA', 20), ('HMA', 2)])
+    sma, hma = results[('SMA', 20)], results[('HMA', 2)]
+    np.testing.assert_allclose(sma.values, BatchIndicators.SMA(chart.closes, 20).values, equal_nan=True)
+    np.testing.assert_allclose(hma.values, BatchIndicators.HMA(chart.closes, 2).values, equal_nan=True)
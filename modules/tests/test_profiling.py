@@ -0,0 +1,44 @@
+import threading
+from quantpyml.utils import profiling
+from quantpyml.utils.profiling import Profiler
+
+def test_disabled_without_profiler():
+    assert not profiling.active()
+    profiling.count('calls')
+
+def test_nested_profilers_record_alone():
+    with Profiler() as outer:
+        profiling.count('calls')
+        with Profiler() as inner:
+            profiling.count('calls')
+        profiling.count('calls')
+    assert outer.counters == {'calls': 2}
+    assert inner.counters == {'calls': 1}
+    assert not profiling.active()
+
+def test_profilers_stopped_out_of_order():
+    a, b = Profiler().start(), Profiler().start()
+    a.stop()
+    profiling.count('calls')
+    b.stop()
+    assert not profiling.active()
+    assert a.counters == {} and b.counters == {'calls': 1}
+
+def test_profilers_in_threads():
+    # both profilers are active at once and stop in whichever order the threads finish
+    started = threading.Barrier(2)
+    def profile():
+        with Profiler():
+            started.wait()
+    threads = [threading.Thread(target=profile) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not profiling.active()
+
+def test_timed_records_latency():
+    function = profiling.timed('function')(lambda x: x + 1)
+    with Profiler() as profiler:
+        assert function(1) == 2
+    assert profiler.report()['timings']['function']['calls'] == 1
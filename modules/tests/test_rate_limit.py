@@ -0,0 +1,13 @@
+import pytest
+from quantpyml.clients.rate_limit import TokenBucket
+
+def test_per_minute_holds_a_whole_token():
+    bucket = TokenBucket.per_minute(0.5)
+    assert bucket.capacity == 1.0
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+@pytest.mark.parametrize('requests', [0, -1])
+def test_rejects_non_positive_rates(requests):
+    with pytest.raises(ValueError):
+        TokenBucket.per_minute(requests)
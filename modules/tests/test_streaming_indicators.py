@@ -0,0 +1,7 @@
+import pytest
+from quantpyml.models import StreamingSMA, StreamingEMA, StreamingWMA, StreamingHMA, StreamingRSI, StreamingBollingerBands
+
+@pytest.mark.parametrize('indicator, period', [(StreamingSMA, 0), (StreamingEMA, 0), (StreamingWMA, 0), (StreamingHMA, 1), (StreamingRSI, 1), (StreamingBollingerBands, 0)])
+def test_rejects_short_periods(indicator, period):
+    with pytest.raises(ValueError, match='period must be at least'):
+        indicator(period)